@@ -1,27 +1,90 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from src.teste_consulta import consultar_proposicao_completa
+from src import autocompletar, busca_textual, cliente_http, politicas, telemetria
+from src.eventos import consultar_sse
+from src.lote import MAX_ITENS_LOTE, consultar_lote_ndjson
+from src.referencia import referencia
+from src.teste_consulta import consultar_proposicao_estruturada_async
 import logging
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="izileg")
 
 # Configura templates e arquivos estáticos
 templates = Jinja2Templates(directory="public/templates")
-app.mount("/static", StaticFiles(directory="public/static"), name="static")
+# Os arquivos estáticos são servidos pela rota /static do vercel.json; sem
+# check_dir=False, a falta de public/static impede a importação do app
+app.mount("/static", StaticFiles(directory="public/static", check_dir=False), name="static")
+
+# Árvore das chamadas à API e métricas de cada requisição (src/telemetria.py)
+app.middleware("http")(telemetria.medir_requisicao)
+
+@app.on_event("startup")
+async def carregar_referencia():
+    # Deputados, órgãos e o índice textual são carregados em segundo plano, sem atrasar o início
+    referencia.iniciar()
+    busca_textual.iniciar()
+    autocompletar.iniciar()
+
+@app.on_event("shutdown")
+async def fechar_conexoes():
+    referencia.parar()
+    await cliente_http.fechar_async()
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
+
+@app.get("/status/cache")
+async def status_cache():
+    return cliente_http.cache_api.estatisticas()
+
+@app.get("/status/politicas")
+async def status_politicas():
+    # Tentativas, hedges e estado do circuito de cada endpoint da API
+    return politicas.estatisticas()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metricas():
+    # Latência e erros das requisições e das chamadas à API, no formato do Prometheus
+    return PlainTextResponse(telemetria.metricas_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Rota síncrona: roda em uma thread, sem bloquear o event loop enquanto o índice carrega
+@app.get("/busca")
+def busca(q: str, limite: int = 10):
+    # Busca por termos nas ementas e temas, só no índice local
+    resultados = busca_textual.buscar_texto(q, max(1, min(limite, busca_textual.MAX_RESULTADOS)))
+    return {"status": "success", "data": resultados}
+
+@app.get("/autocomplete")
+async def autocomplete(q: str, limite: int = autocompletar.MAX_SUGESTOES):
+    # Sugestões de identificador enquanto o usuário digita; nunca consulta a API
+    sugestoes = autocompletar.sugerir(q, max(1, min(limite, autocompletar.MAX_SUGESTOES)))
+    return {"status": "success", "data": sugestoes}
+
+@app.post("/consulta/batch")
+async def consulta_lote(identificadores: list[str] = Body(..., embed=True)):
+    if len(identificadores) > MAX_ITENS_LOTE:
+        return JSONResponse({"status": "error", "message": f"Máximo de {MAX_ITENS_LOTE} proposições por lote"},
+                            status_code=413)
+    # Cada resultado é enviado como uma linha JSON assim que fica pronto
+    return StreamingResponse(consultar_lote_ndjson(identificadores), media_type="application/x-ndjson")
+
+@app.get("/consulta/stream/{pl:path}")
+async def consulta_stream(pl: str):
+    # Envia cabeçalho, órgão, autores e tramitação conforme ficam prontos
+    return StreamingResponse(consultar_sse(pl), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.get("/consulta/{pl:path}")
 async def consulta(pl: str):
     try:
-        print(f"Consultando proposição: {pl}")  # Debug
-        resultado = consultar_proposicao_completa(pl)
-        print(f"Resultado: {resultado[:200]}...")  # Debug
-        return {"status": "success", "data": resultado}
+        resultado = await consultar_proposicao_estruturada_async(pl)
+        return JSONResponse({"status": "success", "data": resultado.para_dict()})
     except Exception as e:
-        print(f"Erro: {str(e)}")  # Debug
+        logger.error("Erro ao consultar %s: %s", pl, e)
+        telemetria.marcar_erro(e)
         return {"status": "error", "message": str(e)} 
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Respostas sintéticas da API da Câmara para o servidor de replay
+(benchmarks/replay.py), no formato das gravadas: algumas proposições com
+detalhes, autores, tramitações, órgão e deputados, as buscas por tipo e
+os arquivos anuais de proposições e temas. Sempre as mesmas (semente fixa).
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode
+
+PREFIXO_API = '/api/v2'
+PREFIXO_ARQUIVOS = '/arquivos'
+URL_API = 'https://dadosabertos.camara.leg.br/api/v2'
+
+# Os mesmos tipos de src/teste_consulta.py, consultados na busca só por número
+TIPOS = ['PL', 'PLP', 'PEC', 'MPV', 'PDL', 'PRC', 'REQ', 'INC', 'RIC', 'PDC']
+
+# (id, sigla, número, ano, autores, tramitações)
+PROPOSICOES = [
+    (2256735, 'PL', 2630, 2020, 3, 150),
+    (2196833, 'PEC', 45, 2019, 40, 300),
+    (2355510, 'MPV', 1172, 2023, 1, 40),
+]
+
+ORGAOS = [
+    ('PLEN', 'Plenário', 'Plenário'),
+    ('CCJC', 'Comissão de Constituição e Justiça e de Cidadania', 'Comissão Permanente'),
+    ('CFT', 'Comissão de Finanças e Tributação', 'Comissão Permanente'),
+    ('MESA', 'Mesa Diretora da Câmara dos Deputados', 'Mesa Diretora'),
+]
+
+PARTIDOS = ['PT', 'PL', 'UNIÃO', 'PP', 'MDB', 'PSD', 'REPUBLICANOS', 'PSB', 'PDT', 'PSOL']
+UFS = ['SP', 'RJ', 'MG', 'BA', 'RS', 'PR', 'PE', 'CE', 'PA', 'SC']
+TEMAS = [(40, 'Economia'), (46, 'Educação'), (56, 'Saúde'), (57, 'Direitos Humanos e Minorias'),
+         (62, 'Comunicações'), (64, 'Ciência, Tecnologia e Inovação'), (74, 'Trabalho e Emprego')]
+PALAVRAS = ['Dispõe', 'sobre', 'a', 'Lei', 'nº', 'altera', 'institui', 'o', 'Programa', 'Nacional',
+            'de', 'liberdade', 'responsabilidade', 'transparência', 'na', 'internet', 'tributária',
+            'sistema', 'regime', 'fiscal', 'educação', 'saúde', 'pública', 'dá', 'outras', 'providências']
+
+
+def consulta_canonica(consulta):
+    """Parâmetros em ordem estável, para comparar requisições"""
+    return urlencode(sorted(parse_qsl(consulta or '', keep_blank_values=True)))
+
+
+def resposta(caminho, dados, consulta=None, status=200):
+    """Entrada no formato das fixtures"""
+    return {
+        'caminho': caminho,
+        'consulta': consulta_canonica(urlencode(consulta or {})),
+        'status': status,
+        'tipo': 'application/json; charset=utf-8',
+        'corpo': json.dumps(dados, ensure_ascii=False),
+    }
+
+
+def resposta_api(caminho, dados, consulta=None):
+    """Resposta da API, que vem sempre dentro de 'dados'"""
+    return resposta(f"{PREFIXO_API}/{caminho}", {'dados': dados, 'links': []}, consulta)
+
+
+def _ementa(aleatorio, minimo=8, maximo=40):
+    return ' '.join(aleatorio.choice(PALAVRAS) for _ in range(aleatorio.randint(minimo, maximo))) + '.'
+
+
+def _status(aleatorio, data):
+    orgao = aleatorio.randrange(len(ORGAOS))
+    return {
+        'dataHora': f"{data:%Y-%m-%dT%H:%M}",
+        'sequencia': aleatorio.randint(1, 400),
+        'siglaOrgao': ORGAOS[orgao][0],
+        'uriOrgao': f"{URL_API}/orgaos/{180 + orgao}",
+        'regime': aleatorio.choice(['Ordinário (Art. 151, III, RICD)', 'Urgência (Art. 155, RICD)']),
+        'descricaoTramitacao': aleatorio.choice(['Apresentação de Proposição', 'Recebimento', 'Despacho']),
+        'codTipoTramitacao': '100',
+        'descricaoSituacao': aleatorio.choice(['Aguardando Parecer', 'Pronta para Pauta', 'Aguardando Designação']),
+        'codSituacao': 1000,
+        'despacho': _ementa(aleatorio, 4, 20),
+        'url': None,
+        'ambito': 'Regimental',
+        'apreciacao': 'Proposição Sujeita à Apreciação do Plenário',
+    }
+
+
+def _respostas_api(aleatorio):
+    respostas = []
+    deputados = set()
+    for id_prop, sigla, numero, ano, n_autores, n_tramitacoes in PROPOSICOES:
+        inicio = datetime(ano, 2, 1, 10, 0)
+        respostas.append(resposta_api(f"proposicoes/{id_prop}", {
+            'id': id_prop,
+            'uri': f"{URL_API}/proposicoes/{id_prop}",
+            'siglaTipo': sigla,
+            'numero': numero,
+            'ano': ano,
+            'ementa': _ementa(aleatorio),
+            'dataApresentacao': f"{inicio:%Y-%m-%dT%H:%M}",
+            'statusProposicao': _status(aleatorio, inicio + timedelta(days=n_tramitacoes)),
+            'urlInteiroTeor': f"https://www.camara.leg.br/proposicoesWeb/prop_mostrarintegra?codteor={id_prop + 1}",
+        }))
+
+        autores = []
+        for i in range(n_autores):
+            id_deputado = 200000 + (id_prop + i * 7919) % 5000
+            deputados.add(id_deputado)
+            autores.append({'uri': f"{URL_API}/deputados/{id_deputado}", 'nome': f"Deputado {id_deputado}",
+                            'codTipo': 10000, 'tipo': 'Deputado(a)', 'ordemAssinatura': i + 1, 'proponente': 1})
+        respostas.append(resposta_api(f"proposicoes/{id_prop}/autores", autores))
+
+        tramitacoes = [_status(aleatorio, inicio + timedelta(days=i, hours=aleatorio.randint(0, 8)))
+                       for i in range(n_tramitacoes)]
+        respostas.append(resposta_api(f"proposicoes/{id_prop}/tramitacoes", tramitacoes))
+
+        # A busca por número consulta todos os tipos; só um deles encontra a proposição
+        for tipo in TIPOS:
+            encontrada = [{'id': id_prop, 'uri': f"{URL_API}/proposicoes/{id_prop}", 'siglaTipo': sigla,
+                           'codTipo': 139, 'numero': numero, 'ano': ano, 'ementa': ''}] if tipo == sigla else []
+            respostas.append(resposta_api("proposicoes", encontrada, {'siglaTipo': tipo, 'numero': numero, 'ano': ano}))
+
+    for id_deputado in sorted(deputados):
+        respostas.append(resposta_api(f"deputados/{id_deputado}", {
+            'id': id_deputado,
+            'ultimoStatus': {'nome': f"Deputado {id_deputado}", 'siglaPartido': aleatorio.choice(PARTIDOS),
+                             'siglaUf': aleatorio.choice(UFS)},
+        }))
+
+    for i, (sigla, nome, tipo) in enumerate(ORGAOS):
+        respostas.append(resposta_api("orgaos", [{
+            'id': 180 + i, 'uri': f"{URL_API}/orgaos/{180 + i}", 'sigla': sigla, 'nome': nome, 'tipoOrgao': tipo,
+        }], {'sigla': sigla}))
+    return respostas
+
+
+def _respostas_arquivos(aleatorio, anos, por_ano):
+    respostas = []
+    for ano in anos:
+        proposicoes, temas = [], []
+        for i in range(por_ano):
+            id_prop = ano * 1000 + i
+            uri = f"{URL_API}/proposicoes/{id_prop}"
+            apresentacao = datetime(ano, 1, 1) + timedelta(minutes=aleatorio.randint(0, 525000))
+            proposicoes.append({
+                'id': id_prop, 'uri': uri, 'siglaTipo': aleatorio.choice(TIPOS), 'numero': i + 1, 'ano': ano,
+                'codTipo': 139, 'descricaoTipo': 'Projeto de Lei', 'ementa': _ementa(aleatorio),
+                'ementaDetalhada': '', 'keywords': 'teste,benchmark',
+                'dataApresentacao': f"{apresentacao:%Y-%m-%dT%H:%M:%S}",
+                'uriOrgaoNumerador': f"{URL_API}/orgaos/180", 'uriPropAnterior': None, 'uriPropPrincipal': None,
+                'uriPropPosterior': None, 'urlInteiroTeor': None, 'urnFinal': None,
+                'ultimoStatus': _status(aleatorio, apresentacao + timedelta(days=aleatorio.randint(0, 300))),
+            })
+            for cod, tema in aleatorio.sample(TEMAS, aleatorio.randint(0, 3)):
+                temas.append({'uriProposicao': uri, 'siglaTipo': proposicoes[-1]['siglaTipo'], 'numero': i + 1,
+                              'ano': ano, 'codTema': cod, 'tema': tema, 'relevancia': 0})
+        respostas.append(resposta(f"{PREFIXO_ARQUIVOS}/proposicoes/json/proposicoes-{ano}.json",
+                                  {'dados': proposicoes}))
+        respostas.append(resposta(f"{PREFIXO_ARQUIVOS}/proposicoesTemas/json/proposicoesTemas-{ano}.json",
+                                  {'dados': temas}))
+    return respostas
+
+
+def gerar(anos=(2019, 2020), por_ano=2000, semente=42):
+    """Lista de respostas: as da API e as dos arquivos anuais dos anos pedidos"""
+    aleatorio = random.Random(semente)
+    return _respostas_api(aleatorio) + _respostas_arquivos(aleatorio, anos, por_ano)
@@ -0,0 +1,176 @@
+"""
+Tempo de inicialização dos pontos de entrada (cold start).
+
+Cada ponto de entrada roda várias vezes em um processo novo, e são medidos,
+a partir do início do processo, o tempo até terminar a importação e até a
+primeira resposta. A primeira resposta não consulta a API da Câmara: é a
+página inicial, nos apps FastAPI, e uma consulta inválida no chatbot. O
+script falha se a mediana passar do limite ou se algum módulo pesado que
+só deveria ser importado sob demanda (pandas, pyarrow...) tiver sido
+carregado.
+
+Uso:
+    python benchmarks/inicializacao.py [--repeticoes 5] [--fator 1.5] [--detalhar]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que a API não deve carregar ao iniciar
+PESADOS = ('pandas', 'pyarrow', 'gradio')
+
+# Página inicial, sem passar pela rede (o httpx já foi importado pelo app)
+_PRIMEIRA_ASGI = """
+import asyncio, httpx
+async def _primeira():
+    transporte = httpx.ASGITransport(app=entrada.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        (await cliente.get("/")).raise_for_status()
+asyncio.run(_primeira())
+"""
+
+# Limites (s) da importação e da primeira resposta, contados do início do processo
+ENTRADAS = {
+    'api/index.py': {
+        'modulo': 'api.index', 'pasta': RAIZ, 'primeira': _PRIMEIRA_ASGI,
+        'importacao': 1.5, 'resposta': 2.0, 'proibidos': PESADOS,
+    },
+    'app.py': {
+        'modulo': 'app', 'pasta': RAIZ, 'primeira': _PRIMEIRA_ASGI,
+        'importacao': 2.0, 'resposta': 2.5, 'proibidos': PESADOS,
+    },
+    # O chatbot monta a interface do gradio ao ser importado
+    'src/chatbot.py': {
+        'modulo': 'chatbot', 'pasta': os.path.join(RAIZ, 'src'),
+        'primeira': 'entrada.processar_consulta("consulta inválida")\n',
+        'importacao': 8.0, 'resposta': 8.5, 'proibidos': ('pandas', 'pyarrow'),
+    },
+}
+
+_CODIGO_FILHO = """
+import json, sys, time
+sys.path.insert(0, {pasta!r})
+try:
+    import {modulo} as entrada
+except ModuleNotFoundError as e:
+    if e.name.split('.')[0] in ('api', 'app', 'src', 'chatbot'):
+        raise
+    print(json.dumps({{'ausente': e.name}}))
+    sys.exit(0)
+importado = time.time()
+{primeira}
+respondido = time.time()
+print(json.dumps({{
+    'importado': importado,
+    'respondido': respondido,
+    'carregados': [m for m in {proibidos!r} if m in sys.modules],
+}}))
+"""
+
+
+def _codigo(entrada):
+    return _CODIGO_FILHO.format(
+        pasta=entrada['pasta'], modulo=entrada['modulo'], primeira=entrada['primeira'],
+        proibidos=tuple(entrada['proibidos']))
+
+
+def medir(entrada, opcoes_python=()):
+    """
+    Roda o ponto de entrada em um processo novo. Retorna o dict do processo
+    (com 'importacao' e 'resposta' em segundos) e a saída de erro.
+    """
+    inicio = time.time()
+    processo = subprocess.run(
+        [sys.executable, *opcoes_python, '-c', _codigo(entrada)],
+        cwd=RAIZ, capture_output=True, text=True, timeout=120)
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else 'falhou')
+    dados = json.loads(processo.stdout.strip().splitlines()[-1])
+    if 'ausente' not in dados:
+        dados['importacao'] = dados.pop('importado') - inicio
+        dados['resposta'] = dados.pop('respondido') - inicio
+    return dados, processo.stderr
+
+
+def importacoes_mais_lentas(entrada, quantidade=10):
+    """Módulos importados diretamente que mais pesam, segundo -X importtime"""
+    _, saida = medir(entrada, ('-X', 'importtime'))
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, acumulado, nome = linha[len('import time:'):].split('|')
+        if len(nome) - len(nome.lstrip()) == 3:  # filhos diretos do que foi importado pelo -c
+            modulos.append((int(acumulado) / 1e6, nome.strip()))
+    return sorted(modulos, reverse=True)[:quantidade]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--fator', type=float, default=1.0, help='multiplica os limites (máquinas lentas)')
+    parser.add_argument('--detalhar', action='store_true', help='mostra as importações mais lentas')
+    parser.add_argument('--json', action='store_true', help='resultado em JSON')
+    parser.add_argument('entradas', nargs='*', default=list(ENTRADAS), help='padrão: todas')
+    args = parser.parse_args()
+
+    resultados = {}
+    falhou = False
+    for nome in args.entradas:
+        entrada = ENTRADAS[nome]
+        resultado = resultados[nome] = {}
+        try:
+            medicoes = [medir(entrada)[0] for _ in range(args.repeticoes)]
+        except Exception as e:
+            resultado.update(situacao='erro', erro=str(e))
+            falhou = True
+            continue
+        if 'ausente' in medicoes[0]:
+            resultado.update(situacao='ignorado', erro=f"dependência ausente: {medicoes[0]['ausente']}")
+            continue
+
+        problemas = []
+        for etapa in ('importacao', 'resposta'):
+            mediana = statistics.median(medicao[etapa] for medicao in medicoes)
+            limite = entrada[etapa] * args.fator
+            resultado[etapa] = round(mediana, 3)
+            resultado[f'limite_{etapa}'] = limite
+            if mediana > limite:
+                problemas.append(f"{etapa} {mediana:.2f}s > {limite:.2f}s")
+        carregados = sorted({modulo for medicao in medicoes for modulo in medicao['carregados']})
+        if carregados:
+            problemas.append(f"importou {', '.join(carregados)}")
+        resultado['carregados'] = carregados
+        resultado['situacao'] = 'falhou' if problemas else 'ok'
+        if problemas:
+            resultado['erro'] = '; '.join(problemas)
+            falhou = True
+        if args.detalhar:
+            resultado['mais_lentas'] = importacoes_mais_lentas(entrada)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'ponto de entrada':<18}{'importação':>12}{'1ª resposta':>13}   situação")
+        for nome, resultado in resultados.items():
+            if 'importacao' in resultado:
+                tempos = (f"{resultado['importacao']:>10.3f}s"
+                          f"{resultado['resposta']:>12.3f}s")
+            else:
+                tempos = f"{'-':>11}{'-':>13}"
+            print(f"{nome:<18}{tempos}   {resultado['situacao']}"
+                  + (f" ({resultado['erro']})" if 'erro' in resultado else ''))
+            for segundos, modulo in resultado.get('mais_lentas', ()):
+                print(f"{'':<20}{segundos:.3f}s  {modulo}")
+
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Benchmark das funções de consulta e da coleta, contra o servidor de
+replay (benchmarks/replay.py), sem acessar a API da Câmara.
+
+Para cada caso, mede a latência (mediana e p95 de várias execuções, cada
+uma com os caches em memória vazios), as chamadas feitas à API e o pico
+de memória alocada (tracemalloc, em uma execução à parte). O resultado
+pode ser salvo e comparado com o de uma execução anterior: o script
+falha se algum caso ficou mais lento ou alocou mais que a tolerância, ou
+se passou a fazer mais chamadas.
+
+Uso:
+    python benchmarks/pipeline.py --salvar base.json
+    python benchmarks/pipeline.py --comparar base.json [--tolerancia 0.2]
+    python benchmarks/pipeline.py --latencia 50 --repeticoes 10 consultar_proposicao_completa
+
+A coleta (coletar_dados) precisa de pandas e pyarrow e é ignorada sem
+eles; o que ela aloca nos processos de processamento não entra no pico.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_BENCHMARKS = os.path.join(RAIZ, 'benchmarks')
+
+# Casos: função, argumentos e o módulo de onde vem
+CASOS = {
+    'buscar_proposicoes[PL 2630/2020]': ('src.teste_consulta', 'buscar_proposicoes', ('PL 2630/2020',)),
+    'buscar_proposicoes[2630/2020]': ('src.teste_consulta', 'buscar_proposicoes', ('2630/2020',)),
+    'consultar_proposicao_completa[PL 2630/2020]':
+        ('src.teste_consulta', 'consultar_proposicao_completa', ('PL 2630/2020',)),
+    'consultar_proposicao_completa[PEC 45/2019]':
+        ('src.teste_consulta', 'consultar_proposicao_completa', ('PEC 45/2019',)),
+    'consultar_proposicao[PL 2630/2020]': ('src.teste_consulta', 'consultar_proposicao', ('PL 2630/2020',)),
+    # Por último: grava o índice local, que as buscas passariam a usar no lugar da API
+    'coletar_dados[2019-2020]': ('seu_arquivo', 'coletar_dados', (2019, 2020)),
+}
+
+
+class Replay:
+    """Servidor de replay em outro processo, para não entrar nas medições"""
+
+    def __init__(self, latencia, variacao, fixtures=None, por_ano=2000):
+        comando = [sys.executable, os.path.join(PASTA_BENCHMARKS, 'replay.py'), '--porta', '0',
+                   '--latencia', str(latencia), '--variacao', str(variacao), '--por-ano', str(por_ano)]
+        if fixtures:
+            comando += ['--fixtures', fixtures]
+        self.processo = subprocess.Popen(comando, stdout=subprocess.PIPE, text=True)
+        linha = self.processo.stdout.readline()
+        if not linha:
+            raise RuntimeError("servidor de replay não iniciou")
+        self.url = linha.split(' em ', 1)[1].split()[0]
+
+    def _pedir(self, caminho, metodo='GET'):
+        with urllib.request.urlopen(urllib.request.Request(f"{self.url}{caminho}", method=metodo)) as resposta:
+            return json.load(resposta)
+
+    def chamadas(self):
+        return self._pedir('/_replay/chamadas')
+
+    def zerar(self):
+        self._pedir('/_replay/zerar', 'POST')
+
+    def parar(self):
+        self.processo.terminate()
+        self.processo.wait()
+
+
+def _preparar_ambiente(replay, pasta):
+    """Aponta o projeto para o replay; precisa vir antes de importar src"""
+    os.environ.update({
+        'IZILEG_API_URL': f"{replay.url}/api/v2",
+        'IZILEG_ARQUIVOS_URL': f"{replay.url}/arquivos",
+        # Sem cache em disco nem índices gravados antes: toda execução vai à API
+        'IZILEG_CACHE_DISCO': '',
+        'IZILEG_CACHE_SNAPSHOT': '',
+        'IZILEG_INDICE': os.path.join(pasta, 'indice_proposicoes.bin'),
+        'IZILEG_BUSCA': os.path.join(pasta, 'busca'),
+        # O limite de taxa da API mediria a espera pelas fichas, não o código
+        'IZILEG_TAXA_API': '100000',
+        'IZILEG_RAJADA_API': '100000',
+    })
+    sys.path.insert(0, RAIZ)
+
+
+def _zerar_caches():
+    from src import cliente_http
+    from src.tramitacoes import armazem_tramitacoes
+    cliente_http.cache_api.limpar()
+    armazem_tramitacoes.limpar()
+
+
+def _carregar(caso):
+    modulo, funcao, argumentos = CASOS[caso]
+    return getattr(__import__(modulo, fromlist=[funcao]), funcao), argumentos
+
+
+@contextlib.contextmanager
+def _execucao(pasta):
+    """Caches vazios, saída descartada e, para a coleta, uma pasta de trabalho nova"""
+    _zerar_caches()
+    trabalho = tempfile.mkdtemp(dir=pasta)
+    anterior = os.getcwd()
+    os.chdir(trabalho)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(trabalho, ignore_errors=True)
+
+
+def medir(caso, replay, repeticoes, pasta):
+    funcao, argumentos = _carregar(caso)
+
+    # Aquecimento: importações, conexões e o loop das chamadas síncronas
+    with _execucao(pasta):
+        funcao(*argumentos)
+
+    replay.zerar()
+    tempos = []
+    for _ in range(repeticoes):
+        with _execucao(pasta):
+            inicio = time.perf_counter()
+            funcao(*argumentos)
+            tempos.append(time.perf_counter() - inicio)
+    chamadas = replay.chamadas()
+
+    with _execucao(pasta):
+        tracemalloc.start()
+        try:
+            funcao(*argumentos)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    tempos.sort()
+    return {
+        'mediana_ms': round(statistics.median(tempos) * 1000, 2),
+        'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))] * 1000, 2),
+        'chamadas': chamadas['total'] / repeticoes,
+        'por_recurso': {recurso: n / repeticoes for recurso, n in sorted(chamadas['por_recurso'].items())},
+        'sem_fixture': chamadas['sem_fixture'],
+        'pico_kb': round(pico / 1024, 1),
+    }
+
+
+def comparar(atual, base, tolerancia):
+    """Regressões de cada caso presente nas duas execuções"""
+    regressoes = {}
+    for caso, dados in atual.items():
+        anterior = base.get(caso)
+        if not anterior:
+            continue
+        problemas = []
+        if dados['mediana_ms'] > anterior['mediana_ms'] * (1 + tolerancia):
+            problemas.append(f"latência {anterior['mediana_ms']:.1f} -> {dados['mediana_ms']:.1f} ms")
+        if dados['chamadas'] > anterior['chamadas']:
+            problemas.append(f"chamadas {anterior['chamadas']:g} -> {dados['chamadas']:g}")
+        if dados['pico_kb'] > anterior['pico_kb'] * (1 + tolerancia):
+            problemas.append(f"memória {anterior['pico_kb']:.0f} -> {dados['pico_kb']:.0f} KB")
+        if problemas:
+            regressoes[caso] = problemas
+    return regressoes
+
+
+def _variacao(atual, anterior):
+    return f"{(atual / anterior - 1) * 100:+.0f}%" if anterior else ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('casos', nargs='*', help='nomes (ou começos de nomes) dos casos; padrão: todos')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--latencia', type=float, default=20, help='ms por resposta do replay')
+    parser.add_argument('--variacao', type=float, default=5, help='ms, para mais ou para menos')
+    parser.add_argument('--fixtures', help='NDJSON gravado pelo replay (padrão: sintéticas)')
+    parser.add_argument('--por-ano', type=int, default=2000, help='proposições por arquivo anual sintético')
+    parser.add_argument('--salvar', help='grava o resultado em JSON')
+    parser.add_argument('--comparar', help='resultado salvo de uma execução anterior')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='piora aceita na comparação (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    casos = [caso for caso in CASOS if not args.casos or any(caso.startswith(nome) for nome in args.casos)]
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)['casos']
+
+    pasta = tempfile.mkdtemp(prefix='izileg_bench_')
+    replay = Replay(args.latencia, args.variacao, args.fixtures, args.por_ano)
+    resultados = {}
+    try:
+        _preparar_ambiente(replay, pasta)
+        for caso in casos:
+            try:
+                resultados[caso] = medir(caso, replay, args.repeticoes, pasta)
+            except ImportError as e:
+                print(f"{caso}: ignorado ({str(e)})")
+    finally:
+        replay.parar()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{'caso':<46}{'mediana':>10}{'p95':>10}{'chamadas':>10}{'pico':>11}")
+    for caso, dados in resultados.items():
+        linha = (f"{caso:<46}{dados['mediana_ms']:>8.1f}ms{dados['p95_ms']:>8.1f}ms"
+                 f"{dados['chamadas']:>10g}{dados['pico_kb']:>9.0f}KB")
+        if base and caso in base:
+            linha += (f"   {_variacao(dados['mediana_ms'], base[caso]['mediana_ms'])} latência,"
+                      f" {_variacao(dados['pico_kb'], base[caso]['pico_kb'])} memória")
+        print(linha)
+        if dados['sem_fixture']:
+            print(f"{'':<4}sem fixture: {dados['sem_fixture']}")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'ambiente': {
+                    'data': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'latencia_ms': args.latencia,
+                    'repeticoes': args.repeticoes,
+                    'fixtures': args.fixtures or 'sinteticas',
+                },
+                'casos': resultados,
+            }, arquivo, indent=2, ensure_ascii=False)
+        print(f"Resultado salvo em {args.salvar}")
+
+    if base is not None:
+        regressoes = comparar(resultados, base, args.tolerancia)
+        for caso, problemas in regressoes.items():
+            print(f"REGRESSÃO {caso}: {'; '.join(problemas)}")
+        if regressoes:
+            sys.exit(1)
+        print("Sem regressões em relação a", args.comparar)
+
+
+if __name__ == "__main__":
+    main()
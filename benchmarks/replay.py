@@ -0,0 +1,214 @@
+"""
+Servidor local que responde como a API da Câmara, a partir de respostas
+gravadas (fixtures), com latência artificial. Com IZILEG_API_URL (e
+IZILEG_ARQUIVOS_URL, para os arquivos anuais) apontando para ele, as
+funções do projeto rodam sem acessar a rede e sempre com as mesmas
+respostas, o que permite medi-las (benchmarks/pipeline.py).
+
+As fixtures ficam em um arquivo NDJSON, uma resposta por linha: caminho,
+consulta (parâmetros em ordem), status, tipo e corpo. Uma requisição usa
+a resposta de mesmo caminho e mesmos parâmetros ou, se não houver, a de
+mesmo caminho sem parâmetros; sem nenhuma, recebe 404. Sem --fixtures,
+usa as respostas sintéticas de benchmarks/fixtures.py.
+
+No modo de gravação (--origem), requisições sem fixture são repassadas à
+origem e as respostas são acrescentadas ao arquivo de --fixtures.
+
+Uso:
+    python benchmarks/replay.py [--porta 8000] [--latencia 50] [--variacao 10] [--fixtures arquivo.ndjson]
+    python benchmarks/replay.py --fixtures gravadas.ndjson --origem https://dadosabertos.camara.leg.br
+    python benchmarks/replay.py --exportar sinteticas.ndjson
+
+Também responde a GET /_replay/chamadas (requisições recebidas, por
+recurso) e POST /_replay/zerar.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+_NUMERO = re.compile(r'/\d+(?=/|$)')
+
+
+def ler_fixtures(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+
+def gravar_fixtures(caminho, respostas, modo='w'):
+    with open(caminho, modo, encoding='utf-8') as arquivo:
+        for resposta in respostas:
+            arquivo.write(json.dumps(resposta, ensure_ascii=False) + '\n')
+
+
+class ServidorReplay(ThreadingHTTPServer):
+    """
+    Servidor HTTP das fixtures. latencia e variacao em segundos: cada
+    resposta espera um tempo sorteado entre latencia - variacao e
+    latencia + variacao.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, respostas, endereco=('127.0.0.1', 0), latencia=0.0, variacao=0.0,
+                 origem=None, arquivo_gravacao=None):
+        super().__init__(endereco, _Tratador)
+        self.respostas = {}
+        for resposta in respostas:
+            self.adicionar(resposta)
+        self.latencia = latencia
+        self.variacao = variacao
+        self.origem = origem.rstrip('/') if origem else None
+        self.arquivo_gravacao = arquivo_gravacao
+        self.chamadas = Counter()
+        self.sem_fixture = Counter()
+        self._trava = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def adicionar(self, resposta):
+        self.respostas[(resposta['caminho'], resposta['consulta'])] = resposta
+
+    def procurar(self, caminho, consulta):
+        return self.respostas.get((caminho, consulta)) or self.respostas.get((caminho, ''))
+
+    def contar(self, caminho, encontrada):
+        # Ids viram {id}, para agrupar as chamadas por recurso
+        recurso = _NUMERO.sub('/{id}', caminho)
+        with self._trava:
+            self.chamadas[recurso] += 1
+            if not encontrada:
+                self.sem_fixture[recurso] += 1
+
+    def zerar(self):
+        with self._trava:
+            self.chamadas.clear()
+            self.sem_fixture.clear()
+
+    def resumo(self):
+        with self._trava:
+            return {'total': sum(self.chamadas.values()), 'por_recurso': dict(self.chamadas),
+                    'sem_fixture': dict(self.sem_fixture)}
+
+    def esperar(self):
+        if self.latencia or self.variacao:
+            time.sleep(max(0.0, random.uniform(self.latencia - self.variacao, self.latencia + self.variacao)))
+
+    def gravar(self, caminho, consulta):
+        """Busca na origem, guarda e retorna a resposta"""
+        import httpx
+        url = f"{self.origem}{caminho}" + (f"?{consulta}" if consulta else '')
+        response = httpx.get(url, timeout=60, follow_redirects=True)
+        resposta = {
+            'caminho': caminho,
+            'consulta': consulta,
+            'status': response.status_code,
+            'tipo': response.headers.get('Content-Type', 'application/json'),
+            'corpo': response.text,
+        }
+        with self._trava:
+            self.adicionar(resposta)
+            if self.arquivo_gravacao:
+                gravar_fixtures(self.arquivo_gravacao, [resposta], 'a')
+        return resposta
+
+
+class _Tratador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalho e corpo saem em escritas separadas; com Nagle, o corpo
+    # esperaria o ACK atrasado do cliente (~40 ms) e entraria na medição
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        if partes.path == '/_replay/chamadas':
+            return self._enviar(200, 'application/json', json.dumps(self.server.resumo()))
+
+        consulta = fixtures.consulta_canonica(partes.query)
+        resposta = self.server.procurar(partes.path, consulta)
+        if resposta is None and self.server.origem:
+            try:
+                resposta = self.server.gravar(partes.path, consulta)
+            except Exception as e:
+                print(f"Erro ao gravar {self.path}: {str(e)}")
+        self.server.contar(partes.path, resposta is not None)
+        self.server.esperar()
+        if resposta is None:
+            return self._enviar(404, 'application/json', json.dumps({'dados': [], 'erro': 'sem fixture'}))
+        self._enviar(resposta['status'], resposta['tipo'], resposta['corpo'])
+
+    def do_POST(self):
+        if urlsplit(self.path).path == '/_replay/zerar':
+            self.server.zerar()
+            return self._enviar(200, 'application/json', '{}')
+        self._enviar(405, 'application/json', '{}')
+
+    def _enviar(self, status, tipo, corpo):
+        dados = corpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        try:
+            self.wfile.write(dados)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # o cliente desistiu (ex: hedge cancelado)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--porta', type=int, default=8000, help='0 escolhe uma porta livre')
+    parser.add_argument('--latencia', type=float, default=0, help='ms por resposta')
+    parser.add_argument('--variacao', type=float, default=0, help='ms, para mais ou para menos')
+    parser.add_argument('--fixtures', help='NDJSON com as respostas (padrão: sintéticas)')
+    parser.add_argument('--origem', help='grava as respostas que faltam, buscando-as aqui')
+    parser.add_argument('--por-ano', type=int, default=2000, help='proposições por arquivo anual sintético')
+    parser.add_argument('--exportar', help='grava as fixtures sintéticas neste arquivo e sai')
+    args = parser.parse_args()
+
+    if args.exportar:
+        gravar_fixtures(args.exportar, fixtures.gerar(por_ano=args.por_ano))
+        print(f"Fixtures salvas em {args.exportar}")
+        return
+    if args.origem and not args.fixtures:
+        parser.error('--origem precisa de --fixtures, onde as respostas são gravadas')
+
+    if args.fixtures and os.path.exists(args.fixtures):
+        respostas = ler_fixtures(args.fixtures)
+    elif args.fixtures and args.origem:
+        respostas = []
+    elif args.fixtures:
+        parser.error(f"{args.fixtures} não existe")
+    else:
+        respostas = fixtures.gerar(por_ano=args.por_ano)
+
+    servidor = ServidorReplay(respostas, ('127.0.0.1', args.porta), args.latencia / 1000, args.variacao / 1000,
+                              args.origem, args.fixtures if args.origem else None)
+    # Primeira linha: usada por quem inicia o servidor para descobrir a porta
+    print(f"Servindo {len(servidor.respostas)} respostas em {servidor.url} "
+          f"(IZILEG_API_URL={servidor.url}{fixtures.PREFIXO_API}, "
+          f"IZILEG_ARQUIVOS_URL={servidor.url}{fixtures.PREFIXO_ARQUIVOS})", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
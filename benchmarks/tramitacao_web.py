@@ -0,0 +1,149 @@
+"""
+Extração das tramitações da ficha de tramitação (página web da Câmara).
+
+Compara src/tramitacao_web.py com a extração antiga (BeautifulSoup com
+html.parser, a página inteira em árvore e todas as linhas ordenadas) em
+uma página salva. Sem --pagina, gera uma página de exemplo com o formato
+da ficha: cabeçalho e menus, a tabela de tramitações e um rodapé longo
+depois dela. Confere que as duas extrações devolvem as mesmas linhas.
+
+Uso:
+    python benchmarks/tramitacao_web.py [--pagina ficha.html] [--linhas 3000] [--repeticoes 5]
+    python benchmarks/tramitacao_web.py --salvar ficha.html   # só gera a página de exemplo
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tramitacao_web import MAX_TRAMITACOES_WEB, extrair_tramitacoes  # noqa: E402
+
+# Tamanho dos trechos entregues ao extrator, como chegam da rede
+TAMANHO_TRECHO = 64 * 1024
+
+ORGAOS = ['PLEN', 'CCJC', 'CFT', 'CCTI', 'MESA', 'CDEICS', 'CTRAB', 'CSAUDE']
+
+
+def gerar_pagina(linhas=3000, semente=42):
+    """HTML no formato da ficha de tramitação, com datas fora de ordem como na página real"""
+    aleatorio = random.Random(semente)
+    partes = ['<!DOCTYPE html><html lang="pt-br"><head><meta charset="utf-8"><title>Ficha de Tramitação</title>']
+    partes += [f'<script src="/js/modulo{i}.js"></script>' for i in range(30)]
+    partes.append('</head><body><div id="cabecalho"><ul class="menu">')
+    partes += [f'<li><a href="/secao/{i}">Seção {i} &amp; serviços</a></li>' for i in range(200)]
+    partes.append('</ul></div><div class="detalhes"><table class="table resumo"><tr><th>Campo</th><th>Valor</th>'
+                  '<th>Obs</th></tr><tr><td>Apresentação</td><td>01/02/2019</td><td>-</td></tr></table></div>')
+
+    partes.append('<table id="content-tramitacao" class="table table-bordered"><thead><tr>'
+                  '<th>Data</th><th>Órgão</th><th>Tramitação</th></tr></thead><tbody>')
+    inicio = date(2019, 2, 1)
+    for i in range(linhas):
+        dia = inicio + timedelta(days=i // 3 + aleatorio.randint(-2, 2))
+        despacho = ' '.join(aleatorio.choice(['Recebimento', 'pela', 'Comissão', 'Parecer', 'do Relator,',
+                                              'Dep. Fulano', '(PARTIDO-UF),', 'pela aprovação', 'Inteiro teor',
+                                              'Designado', 'Relator']) for _ in range(aleatorio.randint(8, 40)))
+        partes.append(f'<tr class="linha"><td class="data">\n  {dia:%d/%m/%Y}\n</td>'
+                      f'<td><a href="/orgao">{aleatorio.choice(ORGAOS)}</a></td>'
+                      f'<td><span>{despacho}</span> <a href="/teor/{i}">Inteiro teor</a></td></tr>')
+    partes.append('</tbody></table>')
+
+    partes.append('<div id="rodape">')
+    partes += [f'<div class="bloco"><p>Conteúdo relacionado {i}: '
+               f'{"texto " * 40}</p><table class="links"><tr><td>a</td><td>b</td><td>c</td></tr></table></div>'
+               for i in range(1500)]
+    partes.append('</div></body></html>')
+    return ''.join(partes)
+
+
+def extrair_antigo(html, n=MAX_TRAMITACOES_WEB):
+    """A extração antiga de consultar_tramitacao_web, com o mesmo formato de saída"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    tabela = soup.find('table', {'id': 'content-tramitacao'}) or soup.find('table', class_='table')
+    tramitacoes = []
+    if tabela:
+        for linha in tabela.find_all('tr')[1:]:
+            colunas = linha.find_all('td')
+            if len(colunas) >= 3:
+                data = colunas[0].text.strip()
+                try:
+                    data_obj = datetime.strptime(data, '%d/%m/%Y')
+                except ValueError:
+                    data_obj = datetime.min
+                tramitacoes.append({'data': data, 'data_obj': data_obj, 'orgao': colunas[1].text.strip(),
+                                    'despacho': colunas[2].text.strip()})
+    tramitacoes.sort(key=lambda x: x['data_obj'], reverse=True)
+    return [{chave: t[chave] for chave in ('data', 'orgao', 'despacho')} for t in tramitacoes[:n]]
+
+
+def extrair_novo(html, n=MAX_TRAMITACOES_WEB):
+    trechos = (html[i:i + TAMANHO_TRECHO] for i in range(0, len(html), TAMANHO_TRECHO))
+    return extrair_tramitacoes(trechos, n)
+
+
+def lido_ate(html):
+    """Fração da página entregue ao extrator até ele concluir"""
+    from src.tramitacao_web import ExtratorTramitacoes
+    extrator = ExtratorTramitacoes()
+    lido = 0
+    for i in range(0, len(html), TAMANHO_TRECHO):
+        extrator.feed(html[i:i + TAMANHO_TRECHO])
+        lido = min(len(html), i + TAMANHO_TRECHO)
+        if extrator.concluido:
+            break
+    return lido / len(html)
+
+
+def cronometrar(funcao, html, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(html)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pagina', help='HTML salvo da ficha de tramitação')
+    parser.add_argument('--linhas', type=int, default=3000, help='linhas da página gerada')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--salvar', help='grava a página gerada neste arquivo e sai')
+    args = parser.parse_args()
+
+    if args.pagina:
+        with open(args.pagina, encoding='utf-8') as arquivo:
+            html = arquivo.read()
+    else:
+        html = gerar_pagina(args.linhas)
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(html)
+        print(f"Página salva em {args.salvar} ({len(html)} caracteres)")
+        return
+
+    print(f"Página: {len(html) / 1024:.0f} KB; extrator lê {lido_ate(html):.0%} dela")
+    tempo_novo, novo = cronometrar(extrair_novo, html, args.repeticoes)
+    print(f"{'tramitacao_web':<24}{tempo_novo * 1000:>9.1f} ms")
+
+    try:
+        tempo_antigo, antigo = cronometrar(extrair_antigo, html, args.repeticoes)
+    except ImportError:
+        print("BeautifulSoup não instalado: comparação com a extração antiga ignorada")
+        return
+    print(f"{'BeautifulSoup (antigo)':<24}{tempo_antigo * 1000:>9.1f} ms   ({tempo_antigo / tempo_novo:.1f}x)")
+    if novo != antigo:
+        print("Resultados diferentes!")
+        print("novo:  ", novo)
+        print("antigo:", antigo)
+        sys.exit(1)
+    print(f"Mesmas {len(novo)} tramitações nas duas extrações")
+
+
+if __name__ == "__main__":
+    main()
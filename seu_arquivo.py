@@ -1,134 +1,488 @@
-import requests
-import pandas as pd
+import httpx
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+import hashlib
+import json
+import multiprocessing
 import os
+import time
+
+from src import cliente_http
+from src.busca_textual import ConstrutorSegmento
+from src.indice_local import CAMINHO_INDICE, IndiceProposicoes
+from src.leitor_json import TAMANHO_LOTE, ler_lotes
+
+# pandas e pyarrow são importados nas funções que os usam: só a coleta e a
+# leitura do dataset precisam deles, e a importação leva segundos
+
+# Endereço dos arquivos anuais (pode ser trocado por um servidor local)
+URL_ARQUIVOS = os.environ.get("IZILEG_ARQUIVOS_URL", "http://dadosabertos.camara.leg.br/arquivos").rstrip('/')
+
+# Arquivos anuais baixados; ficam guardados para as próximas execuções
+PASTA_BRUTOS = os.path.join('dados', 'brutos')
+
+# Tamanho (bytes) de cada bloco gravado em disco durante o download
+TAMANHO_BLOCO = 1024 * 1024
+
+# Tentativas de retomar um download interrompido na mesma execução
+TENTATIVAS_DOWNLOAD = 3
 
 class CamaraDownloader:
-    def __init__(self):
-        self.base_url = "http://dadosabertos.camara.leg.br/arquivos"
+    def __init__(self, pasta=PASTA_BRUTOS):
+        self.base_url = URL_ARQUIVOS
+        self.pasta = pasta
+        os.makedirs(self.pasta, exist_ok=True)
     
     def baixar_proposicoes(self, ano, formato='json'):
         """Baixa arquivo de proposições de um determinado ano"""
         url = f"{self.base_url}/proposicoes/{formato}/proposicoes-{ano}.{formato}"
         
         print(f"Baixando proposições de {ano}...")
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                filename = f"proposicoes-{ano}.{formato}"
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"Arquivo salvo: {filename}")
-                return filename
-            else:
-                print(f"Erro ao baixar arquivo: {response.status_code}")
-                return None
-        except Exception as e:
-            print(f"Erro ao fazer download: {str(e)}")
-            return None
+        return self._baixar(url, f"proposicoes-{ano}.{formato}")
     
     def baixar_proposicoes_temas(self, ano, formato='json'):
         """Baixa arquivo de temas das proposições de um determinado ano"""
         url = f"{self.base_url}/proposicoesTemas/{formato}/proposicoesTemas-{ano}.{formato}"
         
         print(f"Baixando temas das proposições de {ano}...")
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                filename = f"proposicoesTemas-{ano}.{formato}"
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"Arquivo salvo: {filename}")
-                return filename
-            else:
+        return self._baixar(url, f"proposicoesTemas-{ano}.{formato}")
+    
+    def _baixar(self, url, filename):
+        """
+        Baixa url para a pasta de arquivos brutos, em blocos, e retorna o
+        caminho do arquivo (ou None em caso de erro).
+        
+        - Se o arquivo já existe, faz uma requisição condicional (ETag /
+          Last-Modified) e não baixa de novo se ele não mudou.
+        - O download é gravado em '<arquivo>.part'; se for interrompido, é
+          retomado de onde parou com o cabeçalho Range (só se o servidor
+          enviou ETag ou Last-Modified; sem eles, recomeça do zero).
+        - O arquivo só substitui o anterior depois de conferido o tamanho e,
+          para JSON, o final do conteúdo.
+        """
+        destino = os.path.join(self.pasta, filename)
+        for tentativa in range(1, TENTATIVAS_DOWNLOAD + 1):
+            try:
+                return self._baixar_tentativa(url, destino)
+            except Exception as e:
+                print(f"Erro ao fazer download ({tentativa}/{TENTATIVAS_DOWNLOAD}): {str(e)}")
+        return None
+    
+    def _baixar_tentativa(self, url, destino):
+        parcial = destino + '.part'
+        meta = _ler_meta(destino)
+        # Sem compressão, para que as posições do Range sejam as do arquivo
+        headers = {'Accept-Encoding': 'identity'}
+        
+        inicio = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        validadores_parcial = meta.get('parcial') or {}
+        validador = validadores_parcial.get('etag') or validadores_parcial.get('last_modified')
+        if inicio and validador:
+            # Retoma o download; se o arquivo mudou no servidor, vem inteiro (200)
+            headers['Range'] = f"bytes={inicio}-"
+            headers['If-Range'] = validador
+        elif os.path.exists(destino) and _arquivo_confere(destino, meta):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        if inicio and 'Range' not in headers:
+            # Sem ETag nem Last-Modified não há como saber se o trecho baixado
+            # ainda é do mesmo arquivo: recomeça do zero
+            os.remove(parcial)
+            inicio = 0
+        
+        # Novas tentativas para 429/5xx e limite de taxa: política 'arquivos' (src/politicas.py)
+        with cliente_http.get_stream(url, headers=headers, timeout=httpx.Timeout(60, connect=10)) as response:
+            if response.status_code == 304:
+                print(f"Arquivo sem alterações: {destino}")
+                return destino
+            if response.status_code == 416:
+                # O trecho pedido não existe mais: recomeça do zero
+                os.remove(parcial)
+                raise ValueError("download parcial inválido, reiniciando")
+            if response.status_code not in (200, 206):
                 print(f"Erro ao baixar arquivo: {response.status_code}")
                 return None
-        except Exception as e:
-            print(f"Erro ao fazer download: {str(e)}")
-            return None
+            
+            validadores = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            if response.status_code == 206:
+                if not response.headers.get('Content-Range', '').startswith(f"bytes {inicio}-"):
+                    os.remove(parcial)
+                    raise ValueError("resposta parcial fora da posição pedida")
+                tamanho_esperado = _tamanho_total(response.headers.get('Content-Range'))
+                modo = 'ab'
+            else:
+                tamanho = response.headers.get('Content-Length')
+                tamanho_esperado = int(tamanho) if tamanho and 'Content-Encoding' not in response.headers else None
+                modo = 'wb'
+                meta['parcial'] = validadores
+                _gravar_meta(destino, meta)
+            
+            with open(parcial, modo) as f:
+                for bloco in response.iter_bytes(TAMANHO_BLOCO):
+                    f.write(bloco)
+        
+        tamanho, sha256 = _resumo_arquivo(parcial)
+        if tamanho_esperado is not None and tamanho != tamanho_esperado:
+            raise ValueError(f"tamanho incorreto ({tamanho} de {tamanho_esperado} bytes)")
+        if destino.endswith('.json') and not _json_completo(parcial):
+            os.remove(parcial)
+            raise ValueError("arquivo JSON incompleto")
+        
+        os.replace(parcial, destino)
+        _gravar_meta(destino, {**validadores, 'tamanho': tamanho, 'sha256': sha256})
+        print(f"Arquivo salvo: {destino}")
+        return destino
+
+def _caminho_meta(destino):
+    return destino + '.meta.json'
+
+def _ler_meta(destino):
+    """ETag, Last-Modified, tamanho e sha256 do último download"""
+    try:
+        with open(_caminho_meta(destino), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _gravar_meta(destino, meta):
+    temporario = _caminho_meta(destino) + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(temporario, _caminho_meta(destino))
+
+def _tamanho_total(content_range):
+    # 'bytes 100-199/200' -> 200
+    total = (content_range or '').rpartition('/')[2]
+    return int(total) if total.isdigit() else None
+
+def _resumo_arquivo(caminho):
+    """(tamanho, sha256) lendo o arquivo em blocos"""
+    resumo = hashlib.sha256()
+    tamanho = 0
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b''):
+            resumo.update(bloco)
+            tamanho += len(bloco)
+    return tamanho, resumo.hexdigest()
+
+def _arquivo_confere(caminho, meta):
+    """Confere o arquivo já baixado com o tamanho e o sha256 registrados"""
+    if not meta.get('sha256'):
+        return False
+    return _resumo_arquivo(caminho) == (meta.get('tamanho'), meta['sha256'])
+
+def _json_completo(caminho):
+    """Um download truncado não termina no fechamento do objeto JSON"""
+    with open(caminho, 'rb') as f:
+        f.seek(max(0, os.path.getsize(caminho) - 64))
+        return f.read().rstrip().endswith((b'}', b']'))
 
-def coletar_dados(ano_inicial=2002, ano_final=2024):
+# Dataset de proposições em Parquet, com uma pasta por ano (ano=AAAA)
+PASTA_DATASET = os.path.join('dados', 'proposicoes')
+
+# Saídas da coleta que são refeitas a cada execução
+EXTENSOES_SAIDA = ('.csv', '.parquet')
+
+# Anos baixados ao mesmo tempo
+WORKERS_DOWNLOAD = int(os.environ.get("IZILEG_WORKERS_DOWNLOAD", "4"))
+
+# Processos que leem e juntam os arquivos anuais (padrão: um por núcleo)
+WORKERS_PROCESSAMENTO = int(os.environ.get("IZILEG_WORKERS_PROCESSAMENTO", str(os.cpu_count() or 1)))
+
+# Os processos não são criados com fork: as threads de download e a de
+# gravação do cache em disco já estão rodando, e um filho que herdasse uma
+# trava ocupada por uma delas ficaria parado para sempre
+INICIO_PROCESSOS = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Colunas do dataset e seus tipos. Textos com poucos valores distintos são
+# guardados como category; as datas são convertidas com pd.to_datetime.
+TIPOS_PROPOSICAO = {
+    'id': 'Int64',
+    'uri': 'string',
+    'siglaTipo': 'category',
+    'numero': 'Int64',
+    'ano': 'Int64',
+    'codTipo': 'Int64',
+    'descricaoTipo': 'category',
+    'ementa': 'string',
+    'ementaDetalhada': 'string',
+    'keywords': 'string',
+    'dataApresentacao': 'datetime64[ns]',
+    'uriOrgaoNumerador': 'string',
+    'uriPropAnterior': 'string',
+    'uriPropPrincipal': 'string',
+    'uriPropPosterior': 'string',
+    'urlInteiroTeor': 'string',
+    'urnFinal': 'string',
+}
+
+# Campos de ultimoStatus, que viram colunas com o mesmo nome
+TIPOS_STATUS = {
+    'dataHora': 'datetime64[ns]',
+    'sequencia': 'Int64',
+    'uriRelator': 'string',
+    'idOrgao': 'Int64',
+    'siglaOrgao': 'category',
+    'uriOrgao': 'string',
+    'regime': 'category',
+    'descricaoTramitacao': 'category',
+    'idTipoTramitacao': 'string',
+    'descricaoSituacao': 'category',
+    'idSituacao': 'Int64',
+    'despacho': 'string',
+    'apreciacao': 'category',
+    'url': 'string',
+}
+
+TIPOS_TEMA = {
+    'uriProposicao': 'string',
+    'codTema': 'Int64',
+    'tema': 'category',
+    'relevancia': 'Int64',
+}
+
+# Colunas usadas por analisar_tramitacao()
+COLUNAS_TRAMITACAO = [
+    'id', 'siglaTipo', 'numero', 'ano',  # identificação da proposição
+    'dataApresentacao',                   # data inicial
+    'descricaoSituacao',                  # situação atual
+    'siglaOrgao',                         # órgão atual
+    'uriRelator',                         # relator atual
+    'despacho',                           # informação sobre distribuição
+    'regime',                             # regime de tramitação
+    'descricaoTramitacao',                # última movimentação
+    'url',                                # link para acompanhamento
+]
+
+def _tipar(df, tipos):
+    """Mantém só as colunas de tipos, na mesma ordem, cada uma com o seu tipo"""
+    import pandas as pd
+    df = df.reindex(columns=list(tipos))
+    for coluna, tipo in tipos.items():
+        if tipo.startswith('datetime'):
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        else:
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+def _achatar_status(status):
+    """
+    Converte a coluna ultimoStatus (dicts já lidos do JSON, ou nulos) em
+    colunas tipadas, uma por campo de TIPOS_STATUS
+    """
+    import pandas as pd
+    registros = [item if isinstance(item, dict) else {} for item in status]
+    return _tipar(pd.DataFrame.from_records(registros, columns=list(TIPOS_STATUS)), TIPOS_STATUS)
+
+def _baixar_ano(downloader, ano):
+    """Baixa os dois arquivos de um ano; retorna (arquivo_prop, arquivo_temas, duração)"""
+    inicio = time.perf_counter()
+    arquivo_prop = downloader.baixar_proposicoes(ano)
+    arquivo_temas = downloader.baixar_proposicoes_temas(ano)
+    return arquivo_prop, arquivo_temas, time.perf_counter() - inicio
+
+def _esquema_parquet():
+    """Esquema das partições, o mesmo para todos os anos e lotes"""
+    import pyarrow as pa
+    tipos_arrow = {
+        'Int64': pa.int64(),
+        'string': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'datetime64[ns]': pa.timestamp('ns'),
+    }
+    colunas = {**TIPOS_PROPOSICAO, **TIPOS_STATUS, **TIPOS_TEMA}
+    esquema = pa.schema([(coluna, tipos_arrow[tipo]) for coluna, tipo in colunas.items() if coluna != 'ano'])
+    
+    # Com os metadados do pandas, a leitura devolve os mesmos tipos (Int64, category...)
+    vazio = _montar_lote([], {}).drop(columns=['ano'])
+    return pa.Table.from_pandas(vazio, schema=esquema, preserve_index=False).schema
+
+def _ler_temas(arquivo_temas):
+    """(codTema, tema, relevancia) do ano, por uri da proposição"""
+    temas = {}
+    for lote in ler_lotes(arquivo_temas):
+        for tema in lote:
+            temas.setdefault(tema.get('uriProposicao'), []).append(
+                (tema.get('codTema'), tema.get('tema'), tema.get('relevancia')))
+    return temas
+
+def _montar_lote(lote, temas):
+    """DataFrame tipado de um lote de proposições, já junto com os temas"""
+    import pandas as pd
+    # Converte os dados aninhados em DataFrames com colunas tipadas; os campos
+    # de ultimoStatus viram colunas próprias (descricaoSituacao, siglaOrgao...)
+    dados = pd.DataFrame(lote)
+    status = dados['ultimoStatus'] if 'ultimoStatus' in dados.columns else [None] * len(dados)
+    proposicoes = pd.concat([_tipar(dados, TIPOS_PROPOSICAO), _achatar_status(status)], axis=1)
+    
+    # Só os temas das proposições do lote
+    uris = dados['uri'].tolist() if 'uri' in dados.columns else []
+    temas_lote = pd.DataFrame([(uri, *tema) for uri in uris for tema in temas.get(uri, ())],
+                              columns=list(TIPOS_TEMA))
+    
+    # Tenta fazer o merge usando uri/uriProposicao
+    return pd.merge(
+        proposicoes,
+        _tipar(temas_lote, TIPOS_TEMA),
+        left_on='uri',
+        right_on='uriProposicao',
+        how='left'
+    )
+
+def processar_ano(ano, arquivo_prop, arquivo_temas, tamanho_lote=TAMANHO_LOTE):
+    """
+    Lê os arquivos de um ano, junta proposições e temas e grava a partição
+    do ano no dataset Parquet.
+    As proposições são lidas e gravadas em lotes de tamanho_lote, então a
+    memória usada depende do lote, não do tamanho do arquivo; só os temas
+    do ano (poucos campos) ficam inteiros em memória.
+    Roda em outro processo: recebe e retorna só dados simples.
+    Também regrava o segmento do ano no índice de busca textual.
+    Retorna (registros do índice, duração).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    inicio = time.perf_counter()
+    temas = _ler_temas(arquivo_temas)
+    registros = []
+    segmento = ConstrutorSegmento(ano)
+    
+    # Salva o resultado; o ano fica no nome da pasta da partição. O arquivo
+    # só substitui o anterior depois de gravado por inteiro.
+    pasta_ano = os.path.join(PASTA_DATASET, f'ano={ano}')
+    os.makedirs(pasta_ano, exist_ok=True)
+    output_file = os.path.join(pasta_ano, 'dados.parquet')
+    temporario = os.path.join(pasta_ano, '_dados.parquet.tmp')  # ignorado pelo pyarrow
+    
+    esquema = _esquema_parquet()
+    with pq.ParquetWriter(temporario, esquema) as escritor:
+        for lote in ler_lotes(arquivo_prop, tamanho_lote):
+            for prop in lote:
+                registros.append((prop['siglaTipo'], prop['numero'], prop['ano'], prop['id']))
+                segmento.adicionar(prop['id'], prop['siglaTipo'], prop['numero'], prop['ano'], prop.get('ementa'),
+                                   [tema[1] for tema in temas.get(prop.get('uri'), ()) if tema[1]])
+            dados_completos = _montar_lote(lote, temas).drop(columns=['ano'])
+            escritor.write_table(pa.Table.from_pandas(dados_completos, schema=esquema, preserve_index=False))
+    os.replace(temporario, output_file)
+    print(f"Dados completos salvos em: {output_file}")
+    
+    # Só o segmento deste ano é regravado no índice de busca textual
+    segmento.salvar()
+    
+    return registros, time.perf_counter() - inicio
+
+def _relatorio_tempos(tempos, total):
+    print("\nTempos por etapa:")
+    for etapa, duracoes in tempos.items():
+        if len(duracoes) > 1:
+            print(f"- {etapa}: {sum(duracoes):.1f}s somados em {len(duracoes)} anos "
+                  f"(média {sum(duracoes) / len(duracoes):.1f}s, máximo {max(duracoes):.1f}s)")
+        elif duracoes:
+            print(f"- {etapa}: {duracoes[0]:.1f}s")
+    print(f"- total: {total:.1f}s")
+
+def _indice_anterior():
+    """Índice local já salvo, para ser atualizado, ou None"""
+    if not os.path.exists(CAMINHO_INDICE):
+        return None
+    try:
+        return IndiceProposicoes.carregar(CAMINHO_INDICE)
+    except Exception as e:
+        print(f"Índice local anterior ignorado: {str(e)}")
+        return None
+
+def coletar_dados(ano_inicial=2002, ano_final=2024, workers_download=WORKERS_DOWNLOAD,
+                  workers_processamento=WORKERS_PROCESSAMENTO):
     """
     Coleta dados de proposições e seus temas para um período.
     Por padrão coleta de 2002 até o presente, considerando que proposições 
     mais antigas que ~20 anos geralmente não estão mais em tramitação ativa.
+    
+    Os downloads de vários anos correm em paralelo (workers_download threads)
+    e cada ano baixado já segue para leitura e merge em um pool de
+    workers_processamento processos, enquanto os outros ainda baixam.
+    Retorna as durações de cada etapa, por ano.
     """
+    inicio = time.perf_counter()
     downloader = CamaraDownloader()
     
-    # Limpa a pasta dados se ela existir
+    # Limpa as saídas antigas (CSV e Parquet soltos) da pasta dados. Os
+    # arquivos brutos, o índice local e o snapshot do cache são mantidos.
     if os.path.exists('dados'):
         print("Limpando pasta dados...")
         for arquivo in os.listdir('dados'):
-            os.remove(os.path.join('dados', arquivo))
+            caminho = os.path.join('dados', arquivo)
+            if os.path.isfile(caminho) and arquivo.endswith(EXTENSOES_SAIDA):
+                os.remove(caminho)
     
     # Cria pasta para armazenar os arquivos se não existir
     os.makedirs('dados', exist_ok=True)
     
-    # Para cada ano no intervalo
-    for ano in range(ano_inicial, ano_final + 1):
-        print(f"\nProcessando ano {ano}...")
+    # (siglaTipo, numero, ano, id) de todos os anos, para o índice local
+    registros_indice = []
+    anos_indice = set()
+    tempos = {'download': [], 'processamento': []}
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers_download)) as threads, \
+            ProcessPoolExecutor(max_workers=max(1, workers_processamento),
+                                mp_context=multiprocessing.get_context(INICIO_PROCESSOS)) as processos:
+        downloads = {threads.submit(_baixar_ano, downloader, ano): ano
+                     for ano in range(ano_inicial, ano_final + 1)}
         
-        # Baixa proposições
-        arquivo_prop = downloader.baixar_proposicoes(ano)
-        # Baixa temas
-        arquivo_temas = downloader.baixar_proposicoes_temas(ano)
+        # Cada ano vai para o processamento assim que termina de baixar
+        processamentos = {}
+        for futuro in as_completed(downloads):
+            ano = downloads[futuro]
+            arquivo_prop, arquivo_temas, duracao = futuro.result()
+            tempos['download'].append(duracao)
+            if arquivo_prop and arquivo_temas:
+                print(f"\nProcessando ano {ano}...")
+                processamentos[processos.submit(processar_ano, ano, arquivo_prop, arquivo_temas)] = ano
+            else:
+                print(f"Não foi possível baixar os arquivos para o ano {ano}")
         
-        if arquivo_prop and arquivo_temas:
+        for futuro in as_completed(processamentos):
+            ano = processamentos[futuro]
             try:
-                # Carrega os dados
-                proposicoes_json = pd.read_json(arquivo_prop)
-                temas_json = pd.read_json(arquivo_temas)
-                
-                # Converte os dados aninhados em DataFrames
-                proposicoes = pd.DataFrame(proposicoes_json['dados'].tolist())
-                temas = pd.DataFrame(temas_json['dados'].tolist())
-                
-                # Tenta fazer o merge usando uri/uriProposicao
-                dados_completos = pd.merge(
-                    proposicoes,
-                    temas,
-                    left_on='uri',
-                    right_on='uriProposicao',
-                    how='left'
-                )
-                
-                # Salva o resultado
-                output_file = f'dados/proposicoes_completas_{ano}.csv'
-                dados_completos.to_csv(output_file, index=False, encoding='utf-8')
-                print(f"Dados completos salvos em: {output_file}")
-                
+                registros, duracao = futuro.result()
             except Exception as e:
                 print(f"Erro ao processar dados do ano {ano}: {str(e)}")
-            
-            # Remove arquivos temporários
-            os.remove(arquivo_prop)
-            os.remove(arquivo_temas)
-        else:
-            print(f"Não foi possível baixar os arquivos para o ano {ano}")
-
-def unificar_dados():
-    """Unifica todos os arquivos de proposições completas em um único DataFrame"""
-    print("Unificando dados de todos os anos...")
-    
-    # Lista todos os arquivos de proposições completas
-    arquivos = [f for f in os.listdir('dados') if f.startswith('proposicoes_completas_')]
+                continue
+            tempos['processamento'].append(duracao)
+            registros_indice.extend(registros)
+            anos_indice.add(ano)
     
-    # Cria lista para armazenar os DataFrames
-    dfs = []
-    
-    # Lê cada arquivo e adiciona à lista
-    for arquivo in arquivos:
-        df = pd.read_csv(os.path.join('dados', arquivo))
-        dfs.append(df)
-    
-    # Concatena todos os DataFrames
-    df_completo = pd.concat(dfs, ignore_index=True)
+    # Atualiza o índice usado pela busca para evitar chamadas à API. Só os
+    # anos processados agora são substituídos; os outros continuam no índice.
+    if registros_indice:
+        inicio_indice = time.perf_counter()
+        anterior = _indice_anterior()
+        if anterior is not None:
+            indice = anterior.mesclar(registros_indice, anos_indice)
+        else:
+            indice = IndiceProposicoes.construir(registros_indice, anos_indice)
+        indice.salvar()
+        tempos['indice'] = [time.perf_counter() - inicio_indice]
+        print(f"Índice local salvo com {len(indice.chaves)} proposições")
     
-    # Salva o resultado
-    df_completo.to_csv('dados/proposicoes_completas.csv', index=False, encoding='utf-8')
-    print(f"Dados unificados salvos em: dados/proposicoes_completas.csv")
+    _relatorio_tempos(tempos, time.perf_counter() - inicio)
+    return tempos
+
+def carregar_dados(anos=None, colunas=None, pasta=None):
+    """
+    Lê o dataset de proposições gerado por coletar_dados().
+    Só as partições dos anos pedidos e as colunas pedidas são lidas do disco.
     
-    return df_completo
+    Ex: carregar_dados(anos=[2023, 2024], colunas=['siglaTipo', 'tema'])
+    """
+    import pandas as pd
+    filtros = [('ano', 'in', [int(ano) for ano in anos])] if anos else None
+    return pd.read_parquet(pasta or PASTA_DATASET, engine='pyarrow', columns=colunas, filters=filtros)
 
 def analisar_dados(df):
     """Realiza análises básicas sobre as proposições"""
@@ -157,56 +511,47 @@ def analisar_dados(df):
         print(temas_por_ano[temas_por_ano['ano'] == ano].head(5))
 
 def analisar_tramitacao(df):
-    """Analisa detalhes da tramitação das proposições"""
+    """
+    Analisa detalhes da tramitação das proposições.
+    Usa só as colunas de COLUNAS_TRAMITACAO, que podem ser carregadas com
+    carregar_dados(colunas=COLUNAS_TRAMITACAO).
+    """
     
     print("\nAnálise da Tramitação:")
     
     try:
-        # Converte a string JSON em dicionário
-        df['ultimoStatus'] = df['ultimoStatus'].fillna('{}')  # Preenche valores nulos
-        df_status = pd.json_normalize(df['ultimoStatus'].apply(eval))
-        
-        # Adiciona as colunas de status ao DataFrame original
-        df_completo = pd.concat([df.reset_index(drop=True), df_status], axis=1)
+        # O dataset tem uma linha por tema; aqui conta cada proposição uma vez
+        if 'id' in df.columns:
+            df = df.drop_duplicates('id')
         
         # Análise por situação atual
-        if 'descricaoSituacao' in df_completo.columns:
+        if 'descricaoSituacao' in df.columns:
             print("\nQuantidade de proposições por situação:")
-            print(df_completo['descricaoSituacao'].value_counts().head(10))
+            print(df['descricaoSituacao'].value_counts().head(10))
         else:
             print("\nInformação de situação não disponível")
         
         # Análise por órgão atual
-        if 'siglaOrgao' in df_completo.columns:
+        if 'siglaOrgao' in df.columns:
             print("\nQuantidade de proposições por órgão atual:")
-            print(df_completo['siglaOrgao'].value_counts().head(10))
+            print(df['siglaOrgao'].value_counts().head(10))
         else:
             print("\nInformação de órgão não disponível")
         
         # Análise de relatoria
-        if 'nomeRelator' in df_completo.columns:
+        if 'uriRelator' in df.columns:
             print("\nQuantidade de proposições com relator designado:")
-            tem_relator = df_completo['nomeRelator'].notna().sum()
-            total = len(df_completo)
+            tem_relator = int(df['uriRelator'].notna().sum())
+            total = len(df)
             print(f"Com relator: {tem_relator} ({tem_relator/total*100:.2f}%)")
             print(f"Sem relator: {total-tem_relator} ({(total-tem_relator)/total*100:.2f}%)")
         else:
             print("\nInformação de relator não disponível")
         
         # Salva dados de tramitação em arquivo separado
-        colunas_tramitacao = [col for col in [
-            'id', 'siglaTipo', 'numero', 'ano',  # identificação da proposição
-            'dataApresentacao',                   # data inicial
-            'descricaoSituacao',                  # situação atual
-            'siglaOrgao',                         # órgão atual
-            'nomeRelator',                        # relator atual
-            'despacho',                           # informação sobre distribuição
-            'regime',                             # regime de tramitação
-            'descricaoTramitacao',                # última movimentação
-            'url'                                 # link para acompanhamento
-        ] if col in df_completo.columns]
+        colunas_tramitacao = [col for col in COLUNAS_TRAMITACAO if col in df.columns]
         
-        df_tramitacao = df_completo[colunas_tramitacao].copy()
+        df_tramitacao = df[colunas_tramitacao].copy()
         df_tramitacao.to_csv('dados/dados_tramitacao.csv', index=False, encoding='utf-8')
         print("\nDados detalhados de tramitação salvos em: dados/dados_tramitacao.csv")
         
@@ -221,8 +566,6 @@ def consultar_proposicao(id_ou_sigla):
     Consulta detalhes de uma proposição específica.
     Pode receber tanto o ID quanto a sigla (ex: 'PL 1234/2023')
     """
-    base_url = "https://dadosabertos.camara.leg.br/api/v2"
-    
     try:
         # Se receber uma sigla (ex: PL 1234/2023), precisa converter para ID
         if isinstance(id_ou_sigla, str):
@@ -235,8 +578,7 @@ def consultar_proposicao(id_ou_sigla):
                 'numero': numero,
                 'ano': ano
             }
-            response = requests.get(f"{base_url}/proposicoes", params=params)
-            dados = response.json()['dados']
+            dados = cliente_http.get_dados("proposicoes", params)
             if not dados:
                 return "Proposição não encontrada"
             id_prop = dados[0]['id']
@@ -244,31 +586,26 @@ def consultar_proposicao(id_ou_sigla):
             id_prop = id_ou_sigla
         
         # Busca detalhes da proposição
-        response = requests.get(f"{base_url}/proposicoes/{id_prop}")
-        prop = response.json()['dados']
+        prop = cliente_http.get_dados(f"proposicoes/{id_prop}")
         
         # Busca tramitações
-        response = requests.get(f"{base_url}/proposicoes/{id_prop}/tramitacoes")
-        trams = response.json()['dados']
+        trams = cliente_http.get_dados(f"proposicoes/{id_prop}/tramitacoes")
         ultima_tramitacao = trams[0] if trams else None
         
         # Busca informações do órgão atual
         orgao_atual = None
         if 'statusProposicao' in prop and 'siglaOrgao' in prop['statusProposicao']:
-            response = requests.get(f"{base_url}/orgaos", params={'sigla': prop['statusProposicao']['siglaOrgao']})
-            orgaos = response.json()['dados']
+            orgaos = cliente_http.get_dados("orgaos", {'sigla': prop['statusProposicao']['siglaOrgao']})
             if orgaos:
                 orgao_atual = orgaos[0]
                 # Busca membros do órgão (incluindo relator)
-                response = requests.get(f"{base_url}/orgaos/{orgao_atual['id']}/membros")
-                membros = response.json()['dados']
+                membros = cliente_http.get_dados(f"orgaos/{orgao_atual['id']}/membros")
         
         # Busca o relator atual (se houver)
         relator_info = "Não designado"
         if ultima_tramitacao and 'uriUltimoRelator' in ultima_tramitacao:
             if ultima_tramitacao['uriUltimoRelator']:
-                response = requests.get(ultima_tramitacao['uriUltimoRelator'])
-                relator_dados = response.json()['dados']
+                relator_dados = cliente_http.get_dados(ultima_tramitacao['uriUltimoRelator'])
                 relator_info = f"""Nome: {relator_dados['nomeCivil']}
 Partido: {relator_dados.get('siglaPartido', 'N/A')}
 UF: {relator_dados.get('siglaUf', 'N/A')}"""
@@ -312,8 +649,8 @@ if __name__ == "__main__":
     # Coleta dados a partir de 2012
     coletar_dados(2012, 2024)
     
-    # Unifica os dados
-    df_completo = unificar_dados()
+    # Carrega do dataset só as colunas usadas na análise de tramitação
+    df_completo = carregar_dados(colunas=COLUNAS_TRAMITACAO)
     
     # Realiza análise de tramitação
     df_tramitacao = analisar_tramitacao(df_completo)
@@ -0,0 +1,191 @@
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+
+try:
+    from .busca_textual import INTERVALO_VERIFICACAO, normalizar, obter_indice_textual
+except ImportError:
+    from busca_textual import INTERVALO_VERIFICACAO, normalizar, obter_indice_textual
+
+# Sugestões retornadas por consulta
+MAX_SUGESTOES = int(os.environ.get("IZILEG_MAX_SUGESTOES", "8"))
+
+# Identificadores examinados, a partir do primeiro que casa com o prefixo,
+# para escolher as sugestões
+CANDIDATOS = 500
+
+# Caracteres da ementa exibidos em cada sugestão
+TAMANHO_EMENTA = 80
+
+_SIGLA_NUMERO = re.compile(r'^([A-Z]+)\s*(?=\d)')
+
+
+def _prefixo(texto):
+    """'pl2630/20' -> b'PL 2630/20', no mesmo formato das chaves"""
+    texto = ' '.join(normalizar(texto).upper().split())
+    return _SIGLA_NUMERO.sub(r'\1 ', texto).encode('ascii', 'ignore')
+
+
+class _Chaves:
+    """
+    Sequência ordenada de chaves guardadas juntas em um único bytes; a
+    chave i é texto[inicio[i]:inicio[i + 1]]. Serve para bisect.
+    """
+
+    def __init__(self, texto, inicio):
+        self.texto = texto
+        self.inicio = inicio
+
+    def __len__(self):
+        return len(self.inicio) - 1
+
+    def __getitem__(self, i):
+        return self.texto[self.inicio[i]:self.inicio[i + 1]]
+
+
+def _por_numero(chave):
+    """b'PL 2630/2020' -> b'2630/2020 PL'"""
+    sigla, _, numero = chave.partition(b' ')
+    return numero + b' ' + sigla
+
+
+def _prioridade(chave):
+    """
+    Ordem das sugestões (menor primeiro): sigla e número mais curtos, mais
+    próximos do que foi digitado, e depois o ano mais recente
+    """
+    espaco = chave.index(b' ')
+    barra = chave.index(b'/', espaco)
+    return (espaco * 16 + barra - espaco) * 10000 + 9999 - min(int(chave[barra + 1:]), 9999)
+
+
+class _ChavesPorNumero:
+    """As mesmas chaves como 'número/ano SIGLA', na ordem de 'ordem'"""
+
+    def __init__(self, chaves, ordem):
+        self.chaves = chaves
+        self.ordem = ordem
+
+    def __len__(self):
+        return len(self.ordem)
+
+    def __getitem__(self, i):
+        return _por_numero(self.chaves[self.ordem[i]])
+
+
+class IndiceAutocompletar:
+    """
+    Identificadores ('PL 2630/2020') de todas as proposições em ordem
+    alfabética, para sugerir os que começam com o texto digitado. Também
+    aceita só o número ('2630/20'), por uma segunda ordem.
+
+    As chaves ficam em um único bytes e as demais informações (id, ementa)
+    são lidas dos segmentos da busca textual, sem cópia: poucos bytes por
+    proposição além do que a busca já carrega.
+    """
+
+    def __init__(self, segmentos):
+        self.origem = segmentos
+        self.segmentos = list(segmentos.values())
+
+        entradas = []
+        for s, segmento in enumerate(self.segmentos):
+            siglas = [sigla.upper() for sigla in segmento.siglas]
+            entradas.extend(
+                (f"{siglas[tipo]} {numero}/{ano}".encode('ascii', 'ignore'), s, doc)
+                for doc, (tipo, numero, ano) in enumerate(zip(segmento.tipos, segmento.numeros, segmento.anos))
+            )
+        entradas.sort()
+
+        inicio = array('I', [0])
+        total = 0
+        for chave, _, _ in entradas:
+            total += len(chave)
+            inicio.append(total)
+        self.chaves = _Chaves(b''.join([chave for chave, _, _ in entradas]), inicio)
+        self.refs_segmento = array('H', [s for _, s, _ in entradas])
+        self.refs_doc = array('I', [doc for _, _, doc in entradas])
+        self.prioridades = array('I', [_prioridade(chave) for chave, _, _ in entradas])
+
+        por_numero = [_por_numero(chave) for chave, _, _ in entradas]
+        del entradas
+        ordem = array('I', sorted(range(len(por_numero)), key=por_numero.__getitem__))
+        self.chaves_por_numero = _ChavesPorNumero(self.chaves, ordem)
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def sugerir(self, texto, limite=MAX_SUGESTOES):
+        """
+        Até limite proposições cujo identificador começa com texto. Números
+        completos vêm antes dos que só começam igual, e anos recentes antes
+        dos antigos.
+        """
+        prefixo = _prefixo(texto)
+        if not prefixo or not len(self.chaves):
+            return []
+
+        por_numero = prefixo[:1].isdigit()
+        chaves = self.chaves_por_numero if por_numero else self.chaves
+        inicio = bisect_left(chaves, prefixo)
+        fim = min(bisect_left(chaves, prefixo + b'\xff'), inicio + CANDIDATOS)
+
+        posicoes = chaves.ordem[inicio:fim] if por_numero else range(inicio, fim)
+        posicoes = nsmallest(limite, posicoes, key=self.prioridades.__getitem__)
+
+        return [
+            self._sugestao(self.segmentos[self.refs_segmento[posicao]].documento(self.refs_doc[posicao]))
+            for posicao in posicoes
+        ]
+
+    @staticmethod
+    def _sugestao(doc):
+        id_prop, sigla_tipo, numero, ano, ementa = doc
+        if len(ementa) > TAMANHO_EMENTA:
+            ementa = ementa[:TAMANHO_EMENTA].rsplit(' ', 1)[0] + '...'
+        return {'titulo': f"{sigla_tipo} {numero}/{ano}", 'id': id_prop, 'ementa': ementa}
+
+
+_indice = IndiceAutocompletar({})
+_verificado_em = None
+_em_atualizacao = False
+_trava = threading.Lock()
+
+
+def _atualizar():
+    global _indice, _em_atualizacao, _verificado_em
+    try:
+        segmentos = obter_indice_textual().segmentos
+        if segmentos is not _indice.origem:
+            _indice = IndiceAutocompletar(segmentos)
+    except Exception as e:
+        print(f"Erro ao montar índice de sugestões: {str(e)}")
+    finally:
+        with _trava:
+            _em_atualizacao = False
+            _verificado_em = time.monotonic()
+
+
+def iniciar():
+    """Monta o índice em segundo plano, acompanhando os segmentos da busca textual"""
+    global _em_atualizacao
+    with _trava:
+        if _em_atualizacao:
+            return
+        _em_atualizacao = True
+    threading.Thread(target=_atualizar, name="izileg-autocompletar", daemon=True).start()
+
+
+def sugerir(texto, limite=MAX_SUGESTOES):
+    """
+    Sugestões para o texto digitado. Nunca espera: usa o índice atual e,
+    a cada INTERVALO_VERIFICACAO segundos, verifica em segundo plano se os
+    segmentos mudaram.
+    """
+    if _verificado_em is None or time.monotonic() - _verificado_em >= INTERVALO_VERIFICACAO:
+        iniciar()
+    return _indice.sugerir(texto, limite)
@@ -0,0 +1,419 @@
+import json
+import math
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from bisect import bisect_left
+from heapq import nlargest
+
+try:
+    from .leitor_json import ler_dados
+    from .modelos import URL_FICHA
+except ImportError:
+    from leitor_json import ler_dados
+    from modelos import URL_FICHA
+
+# Segmentos do índice textual, um arquivo por ano ({ano}.bin)
+PASTA_BUSCA = os.environ.get(
+    "IZILEG_BUSCA",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "busca"),
+)
+
+VERSAO = 1
+
+# Caracteres da ementa guardados para exibir nos resultados
+TAMANHO_EMENTA = 200
+
+# Máximo de resultados por busca em /busca
+MAX_RESULTADOS = 50
+
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+
+# Termos presentes em mais documentos que isso (em um ano) usam lista de campeões
+LIMITE_CAMPEOES = 500
+TAMANHO_CAMPEOES = 100
+
+# Intervalo (s) entre verificações de segmentos novos ou regravados
+INTERVALO_VERIFICACAO = int(os.environ.get("IZILEG_BUSCA_INTERVALO", "60"))
+
+# Palavras que não entram no índice (já sem acentos)
+PALAVRAS_IGNORADAS = frozenset("""
+    a o as os um uma uns umas de da do das dos e em no na nos nas ao aos
+    para pela pelo pelas pelos por com sem que se ou sobre seu sua seus suas
+    como mais entre ate
+""".split())
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos ('Ação' -> 'acao')"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return texto.encode('ascii', 'ignore').decode('ascii')
+
+
+def tokenizar(texto):
+    return [
+        termo for termo in _TOKEN.findall(normalizar(texto))
+        if termo not in PALAVRAS_IGNORADAS and (len(termo) > 1 or termo.isdigit())
+    ]
+
+
+ASSINATURA = b"IZIB"
+
+# Arrays gravados em cada segmento, na ordem do arquivo
+_SECOES = [
+    ('ids', 'Q'),                # id da proposição, por documento
+    ('tipos', 'B'),              # posição da sigla em 'siglas'
+    ('numeros', 'I'),
+    ('anos', 'H'),
+    ('comprimentos', 'H'),       # termos indexados do documento
+    ('inicio_ementas', 'I'),     # ementa do documento i: ementas[inicio[i]:inicio[i + 1]]
+    ('ementas', 'B'),            # ementas resumidas, em UTF-8
+    ('inicio_postings', 'I'),    # ocorrências do termo t: postings[inicio[t]:inicio[t + 1]]
+    ('postings', 'I'),           # documentos, em ordem, de cada termo
+    ('frequencias', 'H'),        # vezes que o termo aparece no documento (tf)
+    ('inicio_campeoes', 'I'),    # campeões do termo t (vazio se o termo não é frequente)
+    ('campeoes', 'I'),
+]
+
+
+class ConstrutorSegmento:
+    """Monta o segmento de busca de um ano, proposição por proposição"""
+
+    def __init__(self, ano):
+        self.ano = int(ano)
+        self.siglas = {}
+        self.arrays = {nome: array(tipo) for nome, tipo in _SECOES}
+        self.arrays['inicio_ementas'].append(0)
+        self.termos = {}  # termo -> (documentos, frequências)
+
+    def adicionar(self, id_prop, sigla_tipo, numero, ano, ementa, temas=()):
+        """Indexa a ementa e os temas de uma proposição"""
+        ementa = ementa or ''
+        termos = tokenizar(' '.join([ementa, *temas]))
+        doc = len(self.arrays['ids'])
+        self.arrays['ids'].append(int(id_prop))
+        self.arrays['tipos'].append(self.siglas.setdefault(sigla_tipo, len(self.siglas)))
+        self.arrays['numeros'].append(int(numero))
+        self.arrays['anos'].append(int(ano))
+        self.arrays['comprimentos'].append(min(len(termos), 0xFFFF))
+        self.arrays['ementas'].frombytes(ementa[:TAMANHO_EMENTA].encode('utf-8'))
+        self.arrays['inicio_ementas'].append(len(self.arrays['ementas']))
+        for termo, frequencia in Counter(termos).items():
+            entrada = self.termos.get(termo)
+            if entrada is None:
+                entrada = self.termos[termo] = (array('I'), array('H'))
+            entrada[0].append(doc)
+            entrada[1].append(min(frequencia, 0xFFFF))
+
+    def _campeoes(self, docs, frequencias, media):
+        """Os TAMANHO_CAMPEOES documentos em que o termo tem mais peso no BM25"""
+        comprimentos = self.arrays['comprimentos']
+
+        def peso(item):
+            doc, frequencia = item
+            return frequencia / (frequencia + K1 * (1 - B + B * comprimentos[doc] / media))
+
+        return sorted(doc for doc, _ in nlargest(TAMANHO_CAMPEOES, zip(docs, frequencias), key=peso))
+
+    def salvar(self, pasta=PASTA_BUSCA):
+        """Grava o segmento em {pasta}/{ano}.bin (escrita atômica)"""
+        arrays = self.arrays
+        total_docs = len(arrays['ids'])
+        media = sum(arrays['comprimentos']) / total_docs if total_docs else 1
+
+        termos = sorted(self.termos)
+        for nome in ('inicio_postings', 'inicio_campeoes'):
+            arrays[nome] = array('I', [0])
+        arrays['postings'] = array('I')
+        arrays['frequencias'] = array('H')
+        arrays['campeoes'] = array('I')
+        for termo in termos:
+            docs, frequencias = self.termos[termo]
+            arrays['postings'].extend(docs)
+            arrays['frequencias'].extend(frequencias)
+            arrays['inicio_postings'].append(len(arrays['postings']))
+            if len(docs) > LIMITE_CAMPEOES:
+                arrays['campeoes'].extend(self._campeoes(docs, frequencias, media))
+            arrays['inicio_campeoes'].append(len(arrays['campeoes']))
+
+        cabecalho = json.dumps({
+            'versao': VERSAO,
+            'ano': self.ano,
+            'siglas': list(self.siglas),
+            'termos': termos,
+            'tamanhos': {nome: len(arrays[nome]) for nome, _ in _SECOES},
+            'ordem_bytes': sys.byteorder,
+        }, ensure_ascii=False).encode('utf-8')
+
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"{self.ano}.bin")
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(ASSINATURA)
+            f.write(struct.pack('<I', len(cabecalho)))
+            f.write(cabecalho)
+            for nome, _ in _SECOES:
+                arrays[nome].tofile(f)
+        os.replace(temporario, caminho)
+        return caminho
+
+
+class SegmentoBusca:
+    """
+    Índice invertido das proposições de um ano, só para leitura. Os
+    documentos e as ocorrências de todos os termos ficam em poucos arrays
+    contíguos, carregados direto do disco, sem parse.
+
+    Termos muito frequentes têm também uma lista de campeões: os
+    TAMANHO_CAMPEOES documentos em que o termo tem mais peso. Na busca,
+    esses termos só trazem os seus campeões como candidatos, em vez de
+    percorrer todas as ocorrências.
+    """
+
+    def __init__(self, ano, siglas, termos, arrays, modificado_em=None):
+        self.ano = ano
+        self.siglas = siglas
+        self.termos = {sys.intern(termo): i for i, termo in enumerate(termos)}
+        self.modificado_em = modificado_em
+        for nome, _ in _SECOES:
+            setattr(self, nome, arrays[nome])
+        self.total_docs = len(self.ids)
+
+    @classmethod
+    def carregar(cls, caminho):
+        modificado_em = os.path.getmtime(caminho)
+        with open(caminho, 'rb') as f:
+            if f.read(4) != ASSINATURA:
+                raise ValueError(f"Arquivo de segmento inválido: {caminho}")
+            tamanho, = struct.unpack('<I', f.read(4))
+            cabecalho = json.loads(f.read(tamanho))
+            if cabecalho['versao'] != VERSAO:
+                raise ValueError(f"Versão de segmento não suportada: {cabecalho['versao']}")
+
+            arrays = {}
+            for nome, tipo in _SECOES:
+                arrays[nome] = array(tipo)
+                arrays[nome].fromfile(f, cabecalho['tamanhos'][nome])
+
+        if cabecalho['ordem_bytes'] != sys.byteorder:
+            for valores in arrays.values():
+                valores.byteswap()
+        return cls(cabecalho['ano'], cabecalho['siglas'], cabecalho['termos'], arrays, modificado_em)
+
+    def ocorrencias(self, termo):
+        """(documentos, frequências) do termo, sem cópia, ou None"""
+        i = self.termos.get(termo)
+        if i is None:
+            return None
+        inicio, fim = self.inicio_postings[i], self.inicio_postings[i + 1]
+        return memoryview(self.postings)[inicio:fim], memoryview(self.frequencias)[inicio:fim]
+
+    def campeoes_do_termo(self, termo):
+        """Campeões do termo, ou None se ele não é frequente"""
+        i = self.termos.get(termo)
+        if i is None or self.inicio_campeoes[i] == self.inicio_campeoes[i + 1]:
+            return None
+        return memoryview(self.campeoes)[self.inicio_campeoes[i]:self.inicio_campeoes[i + 1]]
+
+    def documento(self, doc):
+        """(id, siglaTipo, numero, ano, ementa resumida)"""
+        ementa = bytes(self.ementas[self.inicio_ementas[doc]:self.inicio_ementas[doc + 1]]).decode('utf-8')
+        return self.ids[doc], self.siglas[self.tipos[doc]], self.numeros[doc], self.anos[doc], ementa
+
+
+class IndiceTextual:
+    """
+    Busca por termos nas ementas e temas, com ranking BM25 sobre todos os
+    segmentos (anos) carregados
+    """
+
+    def __init__(self, segmentos=()):
+        self.segmentos = {}
+        self._definir({segmento.ano: segmento for segmento in segmentos})
+
+    def _definir(self, segmentos):
+        total_docs = sum(segmento.total_docs for segmento in segmentos.values())
+        total_termos = sum(sum(segmento.comprimentos) for segmento in segmentos.values())
+        self.total_docs = total_docs
+        self.media_comprimento = total_termos / total_docs if total_docs else 0
+        self.segmentos = segmentos
+
+    def atualizar(self, pasta=PASTA_BUSCA):
+        """
+        Carrega segmentos novos ou regravados e descarta os removidos.
+        Retorna True se algo mudou.
+        """
+        arquivos = {}
+        if os.path.isdir(pasta):
+            for entrada in os.scandir(pasta):
+                if entrada.name.endswith('.bin') and entrada.name[:-4].isdigit():
+                    arquivos[int(entrada.name[:-4])] = entrada
+
+        segmentos = {}
+        mudou = set(arquivos) != set(self.segmentos)
+        for ano, entrada in arquivos.items():
+            atual = self.segmentos.get(ano)
+            if atual is not None and atual.modificado_em == entrada.stat().st_mtime:
+                segmentos[ano] = atual
+                continue
+            try:
+                segmentos[ano] = SegmentoBusca.carregar(entrada.path)
+                mudou = True
+            except Exception as e:
+                print(f"Erro ao carregar segmento de busca {entrada.name}: {str(e)}")
+                if atual is not None:
+                    segmentos[ano] = atual
+
+        if mudou:
+            self._definir(segmentos)
+        return mudou
+
+    def _idf(self, termo):
+        frequencia = 0
+        for segmento in self.segmentos.values():
+            ocorrencias = segmento.ocorrencias(termo)
+            if ocorrencias is not None:
+                frequencia += len(ocorrencias[0])
+        if not frequencia:
+            return 0.0
+        return math.log(1 + (self.total_docs - frequencia + 0.5) / (frequencia + 0.5))
+
+    def buscar(self, consulta, limite=10, anos=None):
+        """
+        As limite proposições mais relevantes para a consulta, da mais para a
+        menos relevante. anos restringe a busca a esses anos.
+        """
+        termos = set(tokenizar(consulta))
+        if not termos or not self.total_docs:
+            return []
+
+        # Os segmentos podem ser trocados por atualizar() durante a busca
+        todos = self.segmentos
+        segmentos = [segmento for ano, segmento in todos.items() if not anos or ano in anos]
+        idfs = {termo: self._idf(termo) for termo in termos}
+        normalizacao = K1 * (1 - B)
+        fator = K1 * B / max(self.media_comprimento, 1)
+        candidatos = []
+        for segmento in segmentos:
+            pontuacoes = {}
+            comprimentos = segmento.comprimentos
+            frequentes = []
+            for termo, idf in idfs.items():
+                entrada = segmento.ocorrencias(termo)
+                if not idf or entrada is None:
+                    continue
+                peso = idf * (K1 + 1)
+                campeoes = segmento.campeoes_do_termo(termo)
+                if campeoes is not None:
+                    frequentes.append((peso, entrada))
+                    for doc in campeoes:
+                        pontuacoes.setdefault(doc, 0.0)
+                    continue
+                for doc, frequencia in zip(*entrada):
+                    pontuacao = peso * frequencia / (frequencia + normalizacao + fator * comprimentos[doc])
+                    pontuacoes[doc] = pontuacoes.get(doc, 0.0) + pontuacao
+
+            # Termos frequentes só pontuam os candidatos já reunidos
+            for peso, (docs, frequencias) in frequentes:
+                total = len(docs)
+                for doc in pontuacoes:
+                    posicao = bisect_left(docs, doc)
+                    if posicao < total and docs[posicao] == doc:
+                        frequencia = frequencias[posicao]
+                        pontuacoes[doc] += peso * frequencia / (frequencia + normalizacao + fator * comprimentos[doc])
+
+            candidatos.extend(
+                (pontuacao, segmento.ano, doc)
+                for doc, pontuacao in nlargest(limite, pontuacoes.items(), key=lambda item: item[1])
+            )
+
+        return [
+            self._resultado(todos[ano].documento(doc), pontuacao)
+            for pontuacao, ano, doc in nlargest(limite, candidatos)
+        ]
+
+    @staticmethod
+    def _resultado(doc, pontuacao):
+        id_prop, sigla_tipo, numero, ano, ementa = doc
+        return {
+            'titulo': f"{sigla_tipo} {numero}/{ano}",
+            'id': id_prop,
+            'link': URL_FICHA.format(id_prop),
+            'ementa': ementa,
+            'pontuacao': round(pontuacao, 3),
+        }
+
+
+_indice = IndiceTextual()
+_verificado_em = None
+_trava = threading.Lock()
+
+
+def obter_indice_textual():
+    """
+    Retorna o índice textual, verificando a pasta de segmentos na primeira
+    chamada e depois a cada INTERVALO_VERIFICACAO segundos
+    """
+    global _verificado_em
+    agora = time.monotonic()
+    if _verificado_em is None or agora - _verificado_em >= INTERVALO_VERIFICACAO:
+        with _trava:
+            if _verificado_em is None or agora - _verificado_em >= INTERVALO_VERIFICACAO:
+                try:
+                    _indice.atualizar()
+                except Exception as e:
+                    print(f"Erro ao atualizar índice textual: {str(e)}")
+                _verificado_em = time.monotonic()
+    return _indice
+
+
+def iniciar():
+    """Carrega os segmentos em segundo plano, para a primeira busca não esperar"""
+    threading.Thread(target=obter_indice_textual, name="izileg-busca", daemon=True).start()
+
+
+def buscar_texto(consulta, limite=10, anos=None):
+    """Busca textual no índice local; lista vazia se ele não existir"""
+    return obter_indice_textual().buscar(consulta, limite, anos)
+
+
+def construir_segmento(arquivo_prop, arquivo_temas=None):
+    """Segmento de um ano a partir dos arquivos anuais de proposições e temas"""
+    temas = {}
+    if arquivo_temas:
+        for tema in ler_dados(arquivo_temas):
+            if tema.get('tema'):
+                temas.setdefault(tema.get('uriProposicao'), []).append(tema['tema'])
+
+    ano = re.search(r'(\d{4})', os.path.basename(arquivo_prop)).group(1)
+    segmento = ConstrutorSegmento(ano)
+    for prop in ler_dados(arquivo_prop):
+        segmento.adicionar(prop['id'], prop['siglaTipo'], prop['numero'], prop['ano'],
+                           prop.get('ementa'), temas.get(prop.get('uri'), ()))
+    return segmento
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.busca_textual proposicoes-2020.json proposicoes-2021.json ...
+    # Os temas são lidos de proposicoesTemas-{ano}.json, se existir na mesma pasta
+    arquivos = sys.argv[1:]
+    if not arquivos:
+        print("Informe os arquivos proposicoes-{ano}.json a indexar")
+        sys.exit(1)
+
+    for arquivo in arquivos:
+        arquivo_temas = os.path.join(os.path.dirname(arquivo),
+                                     os.path.basename(arquivo).replace('proposicoes-', 'proposicoesTemas-'))
+        segmento = construir_segmento(arquivo, arquivo_temas if os.path.exists(arquivo_temas) else None)
+        caminho = segmento.salvar()
+        print(f"Segmento salvo em {caminho}: {len(segmento.arrays['ids'])} proposições, {len(segmento.termos)} termos")
@@ -0,0 +1,268 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+
+def montar_chave(url, params=None):
+    """Chave do cache: URL + parâmetros em ordem estável"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class CacheRespostas:
+    """
+    Cache LRU em memória com TTL por tipo de recurso.
+
+    - Entradas vencidas continuam sendo servidas por até `tempo_stale`
+      segundos enquanto são atualizadas em segundo plano.
+    - Se várias chamadas não encontram a mesma chave ao mesmo tempo, só
+      uma busca na origem; as outras esperam o mesmo resultado.
+    - Se `servir_vencido_se(erro)` for verdadeiro para o erro da busca, o
+      último valor guardado é servido mesmo vencido (stale-if-error).
+    - Com `disco` (src/cache_persistente.py), tudo o que é gravado vai
+      também para o disco, e o que falta na memória é procurado lá antes
+      de ir à origem.
+    - `ao_contar(evento)`, se dado, é chamado a cada evento contado
+      (acertos, faltas...), para a telemetria (src/telemetria.py).
+    """
+
+    def __init__(self, max_itens=2000, regras_ttl=(), ttl_padrao=300, tempo_stale=600, servir_vencido_se=None,
+                 disco=None, ao_contar=None):
+        self.max_itens = max_itens
+        self.regras_ttl = [(re.compile(padrao), ttl) for padrao, ttl in regras_ttl]
+        self.ttl_padrao = ttl_padrao
+        self.tempo_stale = tempo_stale
+        self.servir_vencido_se = servir_vencido_se
+        self.disco = disco if disco is not None and disco.ativo else None
+        self.ao_contar = ao_contar
+        self._itens = OrderedDict()
+        self._em_voo = {}
+        self._tarefas = set()
+        self._trava = threading.RLock()
+        self._contadores = dict.fromkeys(
+            ['acertos', 'acertos_stale', 'faltas', 'agrupadas', 'remocoes', 'expiradas', 'atualizacoes',
+             'vencidas_servidas', 'acertos_disco'], 0)
+
+    def ttl_para(self, recurso):
+        """TTL em segundos para um caminho da API (ex: 'orgaos', 'proposicoes/123')"""
+        for padrao, ttl in self.regras_ttl:
+            if padrao.search(recurso):
+                return ttl
+        return self.ttl_padrao
+
+    def _contar(self, nome):
+        with self._trava:
+            self._contadores[nome] += 1
+        if self.ao_contar is not None:
+            self.ao_contar(nome)
+
+    def _ler(self, chave):
+        """
+        Retorna (valor, situação) da memória, onde situação é 'fresco',
+        'stale', 'vencido' ou None
+        """
+        agora = time.monotonic()
+        with self._trava:
+            entrada = self._itens.get(chave)
+            if entrada is None:
+                return None, None
+            valor, vence_em = entrada
+            if agora < vence_em:
+                self._itens.move_to_end(chave)
+                return valor, 'fresco'
+            if agora < vence_em + self.tempo_stale:
+                self._itens.move_to_end(chave)
+                return valor, 'stale'
+            self._contar('expiradas')
+            if self.servir_vencido_se is not None:
+                # Guardado para o caso de a origem falhar; sai pelo LRU
+                return valor, 'vencido'
+            del self._itens[chave]
+            return None, None
+
+    def _usar_disco(self, chave, lida):
+        """
+        (valor, situação) do que foi lido do disco (disco.ler, que faz E/S e
+        roda fora da trava); se ainda serve, traz para a memória
+        """
+        if lida is None:
+            return None, None
+        valor, expira_em = lida
+        # O disco guarda a validade em horário de parede; a memória, em monotonic
+        restante = expira_em - time.time()
+        if restante <= -self.disco.tempo_stale:
+            return (valor, 'vencido') if self.servir_vencido_se is not None else (None, None)
+        self._contar('acertos_disco')
+        self._guardar(chave, valor, time.monotonic() + restante)
+        return valor, ('fresco' if restante > 0 else 'stale')
+
+    def _guardar(self, chave, valor, vence_em):
+        with self._trava:
+            self._itens[chave] = (valor, vence_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self._contar('remocoes')
+
+    def gravar(self, chave, valor, ttl):
+        self._guardar(chave, valor, time.monotonic() + ttl)
+        if self.disco is not None:
+            self.disco.gravar(chave, valor, ttl)
+
+    def _entrar_voo(self, chave):
+        """Retorna (futuro, lider). Só o líder deve buscar na origem."""
+        with self._trava:
+            futuro = self._em_voo.get(chave)
+            if futuro is not None:
+                return futuro, False
+            futuro = Future()
+            self._em_voo[chave] = futuro
+            return futuro, True
+
+    def _sair_voo(self, chave, futuro, valor=None, erro=None):
+        with self._trava:
+            self._em_voo.pop(chave, None)
+        if erro is None:
+            futuro.set_result(valor)
+        elif isinstance(erro, Exception):
+            futuro.set_exception(erro)
+        else:
+            futuro.cancel()
+
+    def _reserva(self, erro, vencido):
+        """Valor vencido a servir no lugar do erro, ou None"""
+        if vencido is None or not isinstance(erro, Exception) or not self.servir_vencido_se(erro):
+            return None
+        self._contar('vencidas_servidas')
+        return vencido
+
+    async def _carregar_async(self, chave, ttl, carregar, futuro, vencido=None):
+        try:
+            valor = await carregar()
+        except BaseException as e:
+            reserva = self._reserva(e, vencido)
+            if reserva is not None:
+                self._sair_voo(chave, futuro, reserva)
+                return reserva
+            self._sair_voo(chave, futuro, erro=e)
+            raise
+        self.gravar(chave, valor, ttl)
+        self._sair_voo(chave, futuro, valor)
+        return valor
+
+    def _carregar(self, chave, ttl, carregar, futuro, vencido=None):
+        try:
+            valor = carregar()
+        except BaseException as e:
+            reserva = self._reserva(e, vencido)
+            if reserva is not None:
+                self._sair_voo(chave, futuro, reserva)
+                return reserva
+            self._sair_voo(chave, futuro, erro=e)
+            raise
+        self.gravar(chave, valor, ttl)
+        self._sair_voo(chave, futuro, valor)
+        return valor
+
+    async def _atualizar_async(self, chave, ttl, carregar, futuro):
+        try:
+            await self._carregar_async(chave, ttl, carregar, futuro)
+        except Exception as e:
+            print(f"Erro ao atualizar cache de {chave}: {str(e)}")
+
+    def _atualizar(self, chave, ttl, carregar, futuro):
+        try:
+            self._carregar(chave, ttl, carregar, futuro)
+        except Exception as e:
+            print(f"Erro ao atualizar cache de {chave}: {str(e)}")
+
+    def _criar_tarefa(self, coro):
+        """
+        Tarefa do próprio cache: não é cancelada junto com quem a iniciou e
+        fica guardada até terminar
+        """
+        tarefa = asyncio.ensure_future(coro)
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefa_concluida)
+        return tarefa
+
+    def _tarefa_concluida(self, tarefa):
+        self._tarefas.discard(tarefa)
+        if not tarefa.cancelled():
+            tarefa.exception()  # já entregue pelo futuro; evita o aviso de exceção não lida
+
+    async def obter_async(self, chave, ttl, carregar):
+        """
+        Retorna o valor da chave, chamando a corrotina carregar() quando
+        não estiver no cache
+        """
+        valor, situacao = self._ler(chave)
+        if situacao is None and self.disco is not None:
+            # Em outra thread: o SQLite não pode segurar o event loop
+            valor, situacao = self._usar_disco(chave, await asyncio.to_thread(self.disco.ler, chave))
+        if situacao == 'fresco':
+            self._contar('acertos')
+            return valor
+        if situacao == 'stale':
+            self._contar('acertos_stale')
+            futuro, lider = self._entrar_voo(chave)
+            if lider:
+                self._contar('atualizacoes')
+                self._criar_tarefa(self._atualizar_async(chave, ttl, carregar, futuro))
+            return valor
+
+        futuro, lider = self._entrar_voo(chave)
+        if not lider:
+            self._contar('agrupadas')
+            # shield: um seguidor cancelado não cancela o futuro compartilhado
+            return await asyncio.shield(asyncio.wrap_future(futuro))
+        self._contar('faltas')
+        # A busca continua se o líder for cancelado (ex: cliente desconectou),
+        # e os seguidores recebem o resultado dela, não o cancelamento
+        tarefa = self._criar_tarefa(
+            self._carregar_async(chave, ttl, carregar, futuro, valor if situacao == 'vencido' else None))
+        return await asyncio.shield(tarefa)
+
+    def obter(self, chave, ttl, carregar):
+        """Versão síncrona de obter_async(); carregar() é uma função comum"""
+        valor, situacao = self._ler(chave)
+        if situacao is None and self.disco is not None:
+            valor, situacao = self._usar_disco(chave, self.disco.ler(chave))
+        if situacao == 'fresco':
+            self._contar('acertos')
+            return valor
+        if situacao == 'stale':
+            self._contar('acertos_stale')
+            futuro, lider = self._entrar_voo(chave)
+            if lider:
+                self._contar('atualizacoes')
+                threading.Thread(target=self._atualizar, args=(chave, ttl, carregar, futuro), daemon=True).start()
+            return valor
+
+        futuro, lider = self._entrar_voo(chave)
+        if not lider:
+            self._contar('agrupadas')
+            return futuro.result()
+        self._contar('faltas')
+        return self._carregar(chave, ttl, carregar, futuro, valor if situacao == 'vencido' else None)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self):
+        """Contadores de uso e taxa de acerto"""
+        with self._trava:
+            dados = dict(self._contadores)
+            dados['itens'] = len(self._itens)
+        dados['max_itens'] = self.max_itens
+        consultas = dados['acertos'] + dados['acertos_stale'] + dados['faltas'] + dados['agrupadas']
+        dados['taxa_acerto'] = round((dados['acertos'] + dados['acertos_stale']) / consultas, 4) if consultas else 0.0
+        if self.disco is not None:
+            dados['disco'] = self.disco.estatisticas()
+        return dados
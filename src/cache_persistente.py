@@ -0,0 +1,347 @@
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+# Cache em disco (SQLite) das respostas da API, que sobrevive a reinícios.
+# Em ambientes serverless só o diretório temporário aceita gravação.
+# Vazio desativa.
+CAMINHO_CACHE_DISCO = os.environ.get(
+    "IZILEG_CACHE_DISCO", os.path.join(tempfile.gettempdir(), "izileg_cache.sqlite3"))
+
+# Cópia somente leitura distribuída junto com o deploy, consultada quando o
+# cache em disco não tem a chave (ex: logo após um cold start)
+CAMINHO_SNAPSHOT = os.environ.get(
+    "IZILEG_CACHE_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "cache_snapshot.sqlite3"),
+)
+
+# Tamanho máximo das respostas guardadas (comprimidas)
+MAX_BYTES = int(os.environ.get("IZILEG_CACHE_DISCO_MB", "64")) * 1024 * 1024
+
+# Tempo (s) depois de vencida em que uma resposta do disco ainda é servida
+# enquanto é atualizada; depois disso, só se a API falhar
+TEMPO_STALE = int(os.environ.get("IZILEG_CACHE_DISCO_STALE", "86400"))
+
+# Versão do esquema (PRAGMA user_version). Um arquivo de outra versão é
+# recriado vazio; um snapshot de outra versão é ignorado.
+VERSAO = 1
+
+_CRIAR_TABELA = """
+    CREATE TABLE respostas (
+        chave TEXT PRIMARY KEY,
+        valor BLOB NOT NULL,      -- JSON comprimido com zlib
+        expira_em REAL NOT NULL,  -- segundos desde a época
+        acessado_em REAL NOT NULL,
+        tamanho INTEGER NOT NULL
+    )
+"""
+_CRIAR_INDICE = "CREATE INDEX respostas_acesso ON respostas (acessado_em)"
+
+
+def _codificar(valor):
+    return zlib.compress(json.dumps(valor, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _decodificar(dados):
+    return json.loads(zlib.decompress(dados))
+
+
+class BancoRespostas:
+    """
+    Respostas guardadas em um arquivo SQLite, com uma conexão por thread.
+
+    Ler não grava nada: o horário de acesso, usado para escolher o que
+    remover, é atualizado junto com as gravações (gravar_lote). No modo
+    gravável usa WAL, então leitores (inclusive de outros
+    processos) não esperam as gravações; quando o total passa de max_bytes,
+    as respostas acessadas há mais tempo são removidas. No modo somente
+    leitura o arquivo é aberto como imutável, sem travas nem WAL, o que
+    funciona em sistemas de arquivos só de leitura.
+    """
+
+    def __init__(self, caminho, somente_leitura=False, max_bytes=MAX_BYTES):
+        self.caminho = caminho
+        self.somente_leitura = somente_leitura
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._trava = threading.Lock()  # gravações deste processo, uma por vez
+        self._total = None
+        self.remocoes = 0
+        self._conexao()
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = self._conectar()
+            self._local.conexao = conexao
+        return conexao
+
+    def _conectar(self):
+        if self.somente_leitura:
+            conexao = sqlite3.connect(f"file:{self.caminho}?mode=ro&immutable=1", uri=True)
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao != VERSAO:
+                conexao.close()
+                raise ValueError(f"versão {versao} do snapshot, esperada {VERSAO}")
+            return conexao
+
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        # isolation_level=None: cada comando é uma transação, salvo BEGIN explícito
+        conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        if conexao.execute("PRAGMA user_version").fetchone()[0] != VERSAO:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                # Outro processo pode ter criado o esquema enquanto esperávamos a trava
+                if conexao.execute("PRAGMA user_version").fetchone()[0] != VERSAO:
+                    conexao.execute("DROP TABLE IF EXISTS respostas")
+                    conexao.execute(_CRIAR_TABELA)
+                    conexao.execute(_CRIAR_INDICE)
+                    conexao.execute(f"PRAGMA user_version = {VERSAO}")
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        return conexao
+
+    def ler(self, chave):
+        """(valor, expira_em) da chave, ou None"""
+        conexao = self._conexao()
+        linha = conexao.execute("SELECT valor, expira_em FROM respostas WHERE chave = ?", (chave,)).fetchone()
+        if linha is None:
+            return None
+        return _decodificar(linha[0]), linha[1]
+
+    def gravar(self, chave, valor, ttl):
+        self.gravar_lote([(chave, valor, time.time() + ttl)])
+
+    def gravar_lote(self, respostas, acessos=None):
+        """
+        Grava as respostas [(chave, valor, expira_em)] e os horários de
+        acesso {chave: acessado_em} em uma única transação
+        """
+        linhas = []
+        for chave, valor, expira_em in respostas:
+            dados = _codificar(valor)
+            linhas.append((chave, dados, expira_em, (acessos or {}).pop(chave, time.time()), len(dados)))
+        conexao = self._conexao()
+        with self._trava:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                conexao.executemany(
+                    "INSERT OR REPLACE INTO respostas (chave, valor, expira_em, acessado_em, tamanho) "
+                    "VALUES (?, ?, ?, ?, ?)", linhas)
+                if acessos:
+                    conexao.executemany("UPDATE respostas SET acessado_em = ? WHERE chave = ?",
+                                        [(acessado_em, chave) for chave, acessado_em in acessos.items()])
+                if self._total is None:
+                    self._total = self._calcular_total(conexao)
+                else:
+                    # Estimativa: não desconta a versão substituída nem o que outros processos gravam
+                    self._total += sum(linha[4] for linha in linhas)
+                if self._total > self.max_bytes:
+                    self._remover_antigas(conexao)
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+
+    def _calcular_total(self, conexao):
+        return conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+
+    def _remover_antigas(self, conexao):
+        """Remove as respostas acessadas há mais tempo até ocupar 90% do limite"""
+        cursor = conexao.execute("""
+            DELETE FROM respostas WHERE chave IN (
+                SELECT chave FROM (
+                    SELECT chave, SUM(tamanho) OVER (ORDER BY acessado_em DESC, chave) AS acumulado
+                    FROM respostas
+                ) WHERE acumulado > ?
+            )
+        """, (int(self.max_bytes * 0.9),))
+        self.remocoes += cursor.rowcount
+        self._total = self._calcular_total(conexao)
+
+    def estatisticas(self):
+        conexao = self._conexao()
+        itens, total = conexao.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()
+        return {'caminho': self.caminho, 'itens': itens, 'bytes': total, 'remocoes': self.remocoes}
+
+
+class CacheDisco:
+    """
+    Cache em disco com dois níveis: o arquivo gravável e, atrás dele, o
+    snapshot somente leitura. Erros de disco nunca chegam a quem consulta:
+    a chave só é tratada como ausente.
+
+    As gravações são feitas em segundo plano (write-behind): gravar() só
+    guarda a resposta em memória, e uma thread as grava em lotes, junto com
+    os horários de acesso das leituras. Quem grava, inclusive no event
+    loop, nunca espera o disco nem as travas de outros processos.
+    """
+
+    def __init__(self, caminho=CAMINHO_CACHE_DISCO, snapshot=CAMINHO_SNAPSHOT, max_bytes=MAX_BYTES,
+                 tempo_stale=TEMPO_STALE):
+        self.tempo_stale = tempo_stale
+        self.banco = self._abrir(caminho, False, max_bytes) if caminho else None
+        self.snapshot = self._abrir(snapshot, True, max_bytes) if snapshot and os.path.exists(snapshot) else None
+        self._contadores = dict.fromkeys(['acertos', 'acertos_snapshot', 'faltas', 'gravacoes', 'erros'], 0)
+        self._trava = threading.Lock()
+        self._pendentes = {}   # chave -> (valor, expira_em), ainda não gravadas
+        self._acessos = {}     # chave -> horário da última leitura, ainda não gravado
+        self._aviso = threading.Event()
+        self._gravador = None
+        self._trava_gravacao = threading.Lock()
+        if self.banco is not None:
+            atexit.register(self.descarregar)
+
+    @staticmethod
+    def _abrir(caminho, somente_leitura, max_bytes):
+        try:
+            return BancoRespostas(caminho, somente_leitura, max_bytes)
+        except Exception as e:
+            print(f"Cache em disco desativado ({caminho}): {str(e)}")
+            return None
+
+    def _contar(self, nome):
+        with self._trava:
+            self._contadores[nome] += 1
+
+    @property
+    def ativo(self):
+        return self.banco is not None or self.snapshot is not None
+
+    def ler(self, chave):
+        """(valor, expira_em) da chave, ou None. Faz E/S: fora do event loop."""
+        with self._trava:
+            pendente = self._pendentes.get(chave)
+        if pendente is not None:
+            self._contar('acertos')
+            return pendente
+        for banco, contador in ((self.banco, 'acertos'), (self.snapshot, 'acertos_snapshot')):
+            if banco is None:
+                continue
+            try:
+                lida = banco.ler(chave)
+            except Exception as e:
+                self._contar('erros')
+                print(f"Erro ao ler cache em disco: {str(e)}")
+                continue
+            if lida is not None:
+                self._contar(contador)
+                if banco is self.banco:
+                    with self._trava:
+                        self._acessos[chave] = time.time()
+                else:
+                    # O snapshot tem a idade do deploy: por mais antigo que seja,
+                    # vale como stale (servido e atualizado em segundo plano), e não
+                    # como vencido, que só é servido quando a API falha
+                    valor, expira_em = lida
+                    lida = (valor, max(expira_em, time.time()))
+                return lida
+        self._contar('faltas')
+        return None
+
+    def gravar(self, chave, valor, ttl):
+        """Agenda a gravação; o valor não deve ser alterado depois"""
+        if self.banco is None:
+            return
+        with self._trava:
+            self._pendentes[chave] = (valor, time.time() + ttl)
+            if self._gravador is None:
+                self._gravador = threading.Thread(target=self._gravar_em_segundo_plano, name="izileg-cache-disco",
+                                                  daemon=True)
+                self._gravador.start()
+        self._aviso.set()
+
+    def _gravar_em_segundo_plano(self):
+        while True:
+            self._aviso.wait()
+            self._aviso.clear()
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava agora as respostas e os acessos pendentes"""
+        with self._trava_gravacao:
+            with self._trava:
+                pendentes, self._pendentes = self._pendentes, {}
+                acessos, self._acessos = self._acessos, {}
+            if not pendentes and not acessos:
+                return
+            try:
+                self.banco.gravar_lote([(chave, valor, expira_em) for chave, (valor, expira_em) in pendentes.items()],
+                                       acessos)
+                with self._trava:
+                    self._contadores['gravacoes'] += len(pendentes)
+            except Exception as e:
+                self._contar('erros')
+                print(f"Erro ao gravar cache em disco: {str(e)}")
+
+    def estatisticas(self):
+        with self._trava:
+            dados = dict(self._contadores)
+        for nome, banco in (('disco', self.banco), ('snapshot', self.snapshot)):
+            try:
+                dados[nome] = banco.estatisticas() if banco is not None else None
+            except Exception as e:
+                dados[nome] = {'erro': str(e)}
+        return dados
+
+
+def criar_snapshot(destino, origem=CAMINHO_CACHE_DISCO):
+    """
+    Copia o cache em disco para um arquivo compacto e sem WAL, pronto para
+    ser aberto como somente leitura (ex: incluído no deploy)
+    """
+    temporario = f"{destino}.tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    conexao_origem = sqlite3.connect(origem)
+    conexao_destino = sqlite3.connect(temporario)
+    try:
+        conexao_origem.backup(conexao_destino)
+        conexao_destino.execute("PRAGMA journal_mode=DELETE")
+        conexao_destino.execute("VACUUM")
+    finally:
+        conexao_destino.close()
+        conexao_origem.close()
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+    os.replace(temporario, destino)
+    return destino
+
+
+cache_disco = CacheDisco()
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python -m src.cache_persistente aquecer "PL 2630/2020" "PEC 45/2019" ...
+    #   python -m src.cache_persistente snapshot [destino]
+    argumentos = sys.argv[1:]
+    comando = argumentos.pop(0) if argumentos else None
+
+    if comando == 'aquecer':
+        try:
+            from .teste_consulta import consultar_proposicao_estruturada
+        except ImportError:
+            from teste_consulta import consultar_proposicao_estruturada
+        for identificador in argumentos:
+            resultado = consultar_proposicao_estruturada(identificador)
+            print(f"{identificador}: {resultado.tipo}")
+        cache_disco.descarregar()
+        print(cache_disco.estatisticas()['disco'])
+
+    elif comando == 'snapshot':
+        destino = criar_snapshot(argumentos[0] if argumentos else CAMINHO_SNAPSHOT)
+        print(f"Snapshot salvo em {destino} ({os.path.getsize(destino)} bytes)")
+
+    else:
+        print("Comandos: aquecer IDENTIFICADOR..., snapshot [DESTINO]")
+        sys.exit(1)
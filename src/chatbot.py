@@ -1,97 +1,12 @@
 import gradio as gr
-from teste_consulta import buscar_proposicoes, consultar_proposicao_completa
+from teste_consulta import buscar_proposicoes, consultar_proposicao_estruturada
+from renderizacao import renderizar_html
+from referencia import referencia
 import re
 
-def formatar_resultado(texto):
+def formatar_resultado(resultado):
     """Formata o resultado em HTML com foco em mobile e todas as informações"""
-    # Extrai as informações usando regex
-    proposicao = re.search(r'Proposição: (.*?)\n', texto)
-    ementa = re.search(r'Ementa: (.*?)\n', texto)
-    status = re.search(r'Status: (.*?)\n', texto)
-    orgao = re.search(r'Órgão atual: (.*?)\n', texto)
-    orgao_nome = re.search(r'Nome completo: (.*?)\n', texto)
-    orgao_tipo = re.search(r'Tipo: (.*?)\n', texto)
-    data = re.search(r'Data: (.*?)\n', texto)
-    despacho = re.search(r'Despacho: (.*?)\n', texto)
-    descricao = re.search(r'Descrição: (.*?)\n', texto)
-    regime = re.search(r'Regime de tramitação: (.*?)\n', texto)
-    link_pagina = re.search(r'Página da proposição: (.*?)\n', texto)
-    link_texto = re.search(r'Texto completo: (.*?)\n', texto)
-    
-    html = f"""
-    <div style="font-family: system-ui, -apple-system, sans-serif; max-width: 800px; margin: 0 auto;">
-        <div style="background-color: #004A2F; color: white; padding: 20px; border-radius: 12px 12px 0 0;">
-            <h2 style="margin: 0; font-size: 1.4em; color: white;">
-                {proposicao.group(1) if proposicao else ''}
-            </h2>
-        </div>
-        
-        <div style="border: 1px solid #e0e0e0; border-top: none; border-radius: 0 0 12px 12px; overflow: hidden;">
-            <div style="padding: 20px; background: white;">
-                <div style="font-size: 1.1em; line-height: 1.5; color: #333; margin-bottom: 20px;">
-                    {ementa.group(1) if ementa else ''}
-                </div>
-                
-                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
-                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Situação atual</h3>
-                    <div style="margin-bottom: 8px; color: #333;">
-                        <strong style="color: #333;">Status:</strong> {status.group(1) if status else ''}
-                    </div>
-                    <div style="color: #333;">
-                        <strong style="color: #333;">Órgão atual:</strong> {orgao.group(1) if orgao else ''}<br>
-                        <div style="margin-left: 15px; color: #555;">
-                            {orgao_nome.group(1) if orgao_nome else ''}<br>
-                            {orgao_tipo.group(1) if orgao_tipo else ''}
-                        </div>
-                    </div>
-                </div>
-                
-                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
-                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Última tramitação</h3>
-                    <div style="margin-bottom: 8px; color: #333;">
-                        <strong style="color: #333;">Data:</strong> {data.group(1) if data else 'N/A'}
-                    </div>
-                    <div style="margin-bottom: 8px;">
-                        <strong style="color: #333;">Despacho:</strong>
-                        <div style="margin-left: 15px; color: #333; background: white; padding: 8px; border-radius: 4px; margin-top: 4px;">
-                            {despacho.group(1) if despacho else 'N/A'}
-                        </div>
-                    </div>
-                    <div>
-                        <strong style="color: #333;">Descrição:</strong>
-                        <div style="margin-left: 15px; color: #333; background: white; padding: 8px; border-radius: 4px; margin-top: 4px;">
-                            {descricao.group(1) if descricao else 'N/A'}
-                        </div>
-                    </div>
-                </div>
-                
-                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
-                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Regime de tramitação</h3>
-                    <div style="color: #333;">
-                        {regime.group(1) if regime else 'N/A'}
-                    </div>
-                </div>
-                
-                <div style="border-top: 1px solid #e0e0e0; padding-top: 15px;">
-                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em;">Links</h3>
-                    <div style="margin-bottom: 8px;">
-                        <a href="{link_pagina.group(1) if link_pagina else ''}" 
-                           style="color: #004A2F; text-decoration: none; display: flex; align-items: center; gap: 5px; font-weight: 500;">
-                           📄 Página da proposição
-                        </a>
-                    </div>
-                    <div>
-                        <a href="{link_texto.group(1) if link_texto else ''}" 
-                           style="color: #004A2F; text-decoration: none; display: flex; align-items: center; gap: 5px; font-weight: 500;">
-                           📑 Texto completo
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """
-    return html
+    return renderizar_html(resultado)
 
 def processar_consulta(numero_pl):
     try:
@@ -100,7 +15,7 @@ def processar_consulta(numero_pl):
         
         if match:
             pl = f"{match.group(1)} {match.group(2)}/{match.group(3)}"
-            resultado = consultar_proposicao_completa(pl)
+            resultado = consultar_proposicao_estruturada(pl)
             return formatar_resultado(resultado)
         else:
             return """
@@ -248,6 +163,7 @@ with gr.Blocks(
         )
 
 if __name__ == "__main__":
+    referencia.iniciar()
     iface.launch(
         server_port=7861,
         show_error=True,
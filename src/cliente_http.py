@@ -0,0 +1,344 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+import httpx
+
+try:
+    from . import politicas, telemetria
+    from .cache import CacheRespostas, montar_chave
+    from .cache_persistente import cache_disco
+except ImportError:
+    import politicas
+    import telemetria
+    from cache import CacheRespostas, montar_chave
+    from cache_persistente import cache_disco
+
+# Endereço base da API de dados abertos (pode ser trocado por um servidor local)
+BASE_URL = os.environ.get("IZILEG_API_URL", "https://dadosabertos.camara.leg.br/api/v2").rstrip('/')
+
+# Timeouts em segundos
+TIMEOUT_CONEXAO = float(os.environ.get("IZILEG_TIMEOUT_CONEXAO", "5"))
+TIMEOUT_LEITURA = float(os.environ.get("IZILEG_TIMEOUT_LEITURA", "20"))
+
+# Pool de conexões mantidas abertas (keep-alive)
+MAX_CONEXOES = int(os.environ.get("IZILEG_MAX_CONEXOES", "20"))
+MAX_CONEXOES_OCIOSAS = int(os.environ.get("IZILEG_MAX_CONEXOES_OCIOSAS", "10"))
+TEMPO_KEEPALIVE = float(os.environ.get("IZILEG_TEMPO_KEEPALIVE", "30"))
+
+# Limite de requisições à API em andamento ao mesmo tempo no processo,
+# somando as chamadas síncronas e as de todos os event loops. Quem passar
+# do limite espera a vez, em vez de abrir mais conexões com a Câmara.
+MAX_REQUISICOES = int(os.environ.get("IZILEG_MAX_REQUISICOES", "50"))
+
+# Cache das respostas da API, com TTL (s) por tipo de recurso
+TTL_BUSCA = int(os.environ.get("IZILEG_TTL_BUSCA", "600"))
+TTL_PROPOSICAO = int(os.environ.get("IZILEG_TTL_PROPOSICAO", "60"))
+TTL_REFERENCIA = int(os.environ.get("IZILEG_TTL_REFERENCIA", "86400"))
+
+cache_api = CacheRespostas(
+    max_itens=int(os.environ.get("IZILEG_CACHE_ITENS", "2000")),
+    regras_ttl=[
+        (r'^proposicoes$', TTL_BUSCA),
+        (r'^proposicoes/\d+', TTL_PROPOSICAO),
+        (r'^(orgaos|deputados)\b', TTL_REFERENCIA),
+    ],
+    ttl_padrao=TTL_PROPOSICAO,
+    tempo_stale=int(os.environ.get("IZILEG_CACHE_TEMPO_STALE", "600")),
+    # Com a API fora do ar (ou o circuito aberto), serve a última resposta guardada
+    servir_vencido_se=politicas.erro_transitorio,
+    # Sobrevive a reinícios e cold starts (src/cache_persistente.py)
+    disco=cache_disco,
+    # Acertos e faltas entram nas métricas e no trecho da consulta
+    ao_contar=telemetria.registrar_cache,
+)
+
+# HTTP/2 só é usado se o pacote h2 estiver instalado (httpx[http2]). Só
+# verifica se existe: o httpx o importa ao criar o primeiro cliente.
+HTTP2 = importlib.util.find_spec("h2") is not None and os.environ.get("IZILEG_HTTP2", "1") != "0"
+
+
+
+class LimiteRequisicoes:
+    """
+    Semáforo compartilhado por threads e por qualquer event loop: usado
+    com 'with' nas chamadas síncronas e 'async with' nas assíncronas.
+    As vagas são entregues por ordem de chegada; quem libera passa a vaga
+    direto para o primeiro da fila.
+    """
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.em_uso = 0
+        self._fila = deque()  # threading.Event ou (loop, futuro)
+        self._trava = threading.Lock()
+
+    def _entrar(self, espera):
+        """True se pegou uma vaga; senão, 'espera' vai para a fila"""
+        with self._trava:
+            if self.em_uso < self.maximo and not self._fila:
+                self.em_uso += 1
+                return True
+            self._fila.append(espera)
+            return False
+
+    def liberar(self):
+        with self._trava:
+            if not self._fila:
+                self.em_uso -= 1
+                return
+            espera = self._fila.popleft()
+        if isinstance(espera, threading.Event):
+            espera.set()
+            return
+        loop, futuro = espera
+        try:
+            loop.call_soon_threadsafe(self._receber, futuro)
+        except RuntimeError:  # loop já fechado: a vaga vai para o próximo
+            self.liberar()
+
+    def _receber(self, futuro):
+        # Roda no loop de quem espera; se ele desistiu, a vaga segue adiante
+        if futuro.done():
+            self.liberar()
+        else:
+            futuro.set_result(None)
+
+    def __enter__(self):
+        espera = threading.Event()
+        if not self._entrar(espera):
+            espera.wait()
+        return self
+
+    def __exit__(self, *erro):
+        self.liberar()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        if self._entrar((loop, futuro)):
+            return self
+        try:
+            await futuro
+        except asyncio.CancelledError:
+            if futuro.done() and not futuro.cancelled():
+                self.liberar()  # a vaga chegou junto com o cancelamento
+            else:
+                with self._trava:
+                    if (loop, futuro) in self._fila:
+                        self._fila.remove((loop, futuro))
+            raise
+        return self
+
+    async def __aexit__(self, *erro):
+        self.liberar()
+
+
+_trava = threading.Lock()
+_cliente = None
+_clientes_async = weakref.WeakKeyDictionary()
+_limite = LimiteRequisicoes(MAX_REQUISICOES)
+_loop_sincrono = None
+
+
+def _configuracao():
+    return {
+        'http2': HTTP2,
+        'timeout': httpx.Timeout(TIMEOUT_LEITURA, connect=TIMEOUT_CONEXAO),
+        'limits': httpx.Limits(
+            max_connections=max(MAX_CONEXOES, MAX_REQUISICOES),
+            max_keepalive_connections=MAX_CONEXOES_OCIOSAS,
+            keepalive_expiry=TEMPO_KEEPALIVE,
+        ),
+        'follow_redirects': True,
+    }
+
+
+def montar_url(caminho):
+    """Monta a URL completa a partir de um caminho relativo à API"""
+    if caminho.startswith(('http://', 'https://')):
+        return caminho
+    return f"{BASE_URL}/{caminho.lstrip('/')}"
+
+
+def obter_cliente():
+    """
+    Retorna o cliente HTTP síncrono compartilhado pelo processo
+    """
+    global _cliente
+    if _cliente is None:
+        with _trava:
+            if _cliente is None:
+                _cliente = httpx.Client(**_configuracao())
+    return _cliente
+
+
+def obter_cliente_async():
+    """
+    Retorna o cliente HTTP assíncrono do event loop atual.
+    Cada loop tem o seu próprio pool, já que conexões não podem ser
+    compartilhadas entre loops diferentes.
+    """
+    loop = asyncio.get_running_loop()
+    cliente = _clientes_async.get(loop)
+    if cliente is None:
+        cliente = httpx.AsyncClient(**_configuracao())
+        _clientes_async[loop] = cliente
+    return cliente
+
+
+def _recurso(url):
+    """Caminho relativo à API, usado para escolher o TTL do cache e a política"""
+    if url.startswith(BASE_URL):
+        return url[len(BASE_URL):].strip('/')
+    return url
+
+
+def _marcar_resposta(chamada, response):
+    chamada.marcar(status=response.status_code, bytes=response.num_bytes_downloaded)
+
+
+def get(caminho, params=None, **kwargs):
+    """
+    Faz um GET usando o pool de conexões compartilhado, com a política do
+    endpoint (limite de taxa, novas tentativas e circuito; src/politicas.py)
+    """
+    url = montar_url(caminho)
+
+    with telemetria.chamada_upstream(_recurso(url)) as chamada:
+        def fazer():
+            chamada.contar('requisicoes')
+            with _limite:
+                return obter_cliente().get(url, params=params, **kwargs)
+
+        response = politicas.politica_para(_recurso(url)).executar(fazer)
+        _marcar_resposta(chamada, response)
+        return response
+
+
+async def get_async(caminho, params=None, unica_requisicao=False, **kwargs):
+    """
+    Versão assíncrona de get(); também faz hedge nos endpoints configurados.
+    Com unica_requisicao, não há novas tentativas nem hedge (ex: quem tem
+    um orçamento de requisições a cumprir).
+    """
+    url = montar_url(caminho)
+    politica = politicas.politica_para(_recurso(url))
+    if unica_requisicao:
+        politica = politica.unica_requisicao()
+
+    with telemetria.chamada_upstream(_recurso(url)) as chamada:
+        async def fazer():
+            chamada.contar('requisicoes')  # mais de uma: novas tentativas ou hedge
+            async with _limite:
+                return await obter_cliente_async().get(url, params=params, **kwargs)
+
+        response = await politica.executar_async(fazer)
+        _marcar_resposta(chamada, response)
+        return response
+
+
+@contextmanager
+def get_stream(caminho, params=None, **kwargs):
+    """
+    Como get(), mas sem ler o corpo, para usar com 'with' e iter_bytes().
+    Feito para downloads longos, que não ocupam as vagas de MAX_REQUISICOES.
+    """
+    url = montar_url(caminho)
+    cliente = obter_cliente()
+    requisicao = cliente.build_request('GET', url, params=params, **kwargs)
+    # O trecho vai até o fim do bloco, para contar os bytes de fato lidos
+    with telemetria.chamada_upstream(_recurso(url)) as chamada:
+        def fazer():
+            chamada.contar('requisicoes')
+            return cliente.send(requisicao, stream=True)
+
+        response = politicas.politica_para(_recurso(url)).executar(fazer)
+        try:
+            yield response
+        finally:
+            response.close()
+            _marcar_resposta(chamada, response)
+
+
+def get_dados(caminho, params=None, usar_cache=True):
+    """
+    Retorna o campo 'dados' da resposta JSON da API.
+    Respostas com erro geram httpx.HTTPStatusError e não entram no cache.
+    Os valores retornados são compartilhados pelo cache e não devem ser alterados.
+    """
+    url = montar_url(caminho)
+
+    def carregar():
+        response = get(url, params)
+        response.raise_for_status()
+        return response.json()['dados']
+
+    if not usar_cache:
+        return carregar()
+    with telemetria.trecho('cache', endpoint=telemetria.endpoint(_recurso(url))):
+        return cache_api.obter(montar_chave(url, params), cache_api.ttl_para(_recurso(url)), carregar)
+
+
+async def get_dados_async(caminho, params=None, usar_cache=True, unica_requisicao=False):
+    """Versão assíncrona de get_dados(); unica_requisicao como em get_async()"""
+    url = montar_url(caminho)
+
+    async def carregar():
+        response = await get_async(url, params, unica_requisicao)
+        response.raise_for_status()
+        return response.json()['dados']
+
+    if not usar_cache:
+        return await carregar()
+    with telemetria.trecho('cache', endpoint=telemetria.endpoint(_recurso(url))):
+        return await cache_api.obter_async(montar_chave(url, params), cache_api.ttl_para(_recurso(url)), carregar)
+
+
+def fechar():
+    """Fecha o cliente síncrono e libera as conexões abertas"""
+    global _cliente
+    with _trava:
+        if _cliente is not None:
+            _cliente.close()
+            _cliente = None
+
+
+async def fechar_async():
+    """Fecha o cliente assíncrono do event loop atual"""
+    cliente = _clientes_async.pop(asyncio.get_running_loop(), None)
+    if cliente is not None:
+        await cliente.aclose()
+
+
+def obter_loop_sincrono():
+    """Event loop em segundo plano usado pelas chamadas síncronas"""
+    global _loop_sincrono
+    if _loop_sincrono is None:
+        with _trava:
+            if _loop_sincrono is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="izileg-loop", daemon=True).start()
+                _loop_sincrono = loop
+    return _loop_sincrono
+
+
+def executar_sincrono(coro):
+    """
+    Executa uma corrotina a partir de código síncrono (CLI, Gradio).
+    Usa um event loop dedicado em segundo plano, para que o pool de
+    conexões assíncrono seja reaproveitado entre as chamadas.
+    """
+    loop = obter_loop_sincrono()
+    try:
+        atual = asyncio.get_running_loop()
+    except RuntimeError:
+        atual = None
+    if atual is loop:
+        coro.close()
+        raise RuntimeError("executar_sincrono() não pode ser chamado de dentro de uma corrotina")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,23 @@
+import json
+
+try:
+    from .teste_consulta import consultar_proposicao_eventos_async
+except ImportError:
+    from teste_consulta import consultar_proposicao_eventos_async
+
+
+def formatar_evento(evento, dados):
+    """Formata um evento no padrão server-sent events"""
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+async def consultar_sse(pl):
+    """
+    Consulta uma proposição enviando cada parte como um evento SSE assim
+    que fica pronta. Erros viram um evento 'erro' no lugar do 'resultado'.
+    """
+    try:
+        async for evento, dados in consultar_proposicao_eventos_async(pl):
+            yield formatar_evento(evento, dados)
+    except Exception as e:
+        yield formatar_evento('erro', {'message': str(e)})
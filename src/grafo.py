@@ -0,0 +1,114 @@
+import asyncio
+import inspect
+import time
+
+
+class GrafoExecucao:
+    """
+    Executa etapas que dependem umas das outras, iniciando cada etapa assim
+    que todas as suas dependências terminam.
+
+    Cada etapa recebe como argumentos os resultados das suas dependências,
+    na ordem em que foram declaradas, e pode ser uma função comum ou uma
+    corrotina. Todas rodam no event loop atual.
+    """
+
+    def __init__(self):
+        self.etapas = {}
+        self.resultados = {}
+        self.inicio = {}
+        self.fim = {}
+
+    def adicionar(self, nome, funcao, dependencias=()):
+        """Registra uma etapa do grafo"""
+        if nome in self.etapas:
+            raise ValueError(f"Etapa duplicada: {nome}")
+        self.etapas[nome] = (funcao, tuple(dependencias))
+        return self
+
+    def _validar(self):
+        for nome, (_, dependencias) in self.etapas.items():
+            for dep in dependencias:
+                if dep not in self.etapas:
+                    raise ValueError(f"Etapa '{nome}' depende de '{dep}', que não existe")
+
+        # Detecta ciclos removendo etapas sem dependências pendentes
+        restantes = {nome: set(deps) for nome, (_, deps) in self.etapas.items()}
+        while restantes:
+            livres = [nome for nome, deps in restantes.items() if not deps]
+            if not livres:
+                raise ValueError(f"Ciclo entre as etapas: {', '.join(sorted(restantes))}")
+            for nome in livres:
+                del restantes[nome]
+            for deps in restantes.values():
+                deps.difference_update(livres)
+
+    async def _executar_etapa(self, funcao, argumentos):
+        resultado = funcao(*argumentos)
+        if inspect.isawaitable(resultado):
+            resultado = await resultado
+        return resultado
+
+    async def executar(self, ao_concluir=None):
+        """
+        Executa o grafo e retorna um dicionário nome -> resultado.
+        Se informado, ao_concluir(nome, resultado) é chamado assim que cada
+        etapa termina. Se alguma etapa falhar, as que ainda estão rodando
+        são canceladas e a exceção é propagada.
+        """
+        self._validar()
+        self.resultados = {}
+        self.inicio = {}
+        self.fim = {}
+        t0 = time.perf_counter()
+
+        pendentes = dict(self.etapas)
+        em_execucao = {}
+        try:
+            while pendentes or em_execucao:
+                # Inicia todas as etapas cujas dependências já terminaram
+                for nome, (funcao, dependencias) in list(pendentes.items()):
+                    if all(dep in self.resultados for dep in dependencias):
+                        del pendentes[nome]
+                        argumentos = [self.resultados[dep] for dep in dependencias]
+                        self.inicio[nome] = time.perf_counter() - t0
+                        tarefa = asyncio.ensure_future(self._executar_etapa(funcao, argumentos))
+                        em_execucao[tarefa] = nome
+
+                concluidas, _ = await asyncio.wait(em_execucao, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in concluidas:
+                    nome = em_execucao.pop(tarefa)
+                    self.fim[nome] = time.perf_counter() - t0
+                    self.resultados[nome] = tarefa.result()
+                    if ao_concluir is not None:
+                        ao_concluir(nome, self.resultados[nome])
+        finally:
+            for tarefa in em_execucao:
+                tarefa.cancel()
+
+        return self.resultados
+
+    def caminho_critico(self):
+        """
+        Retorna a cadeia de etapas que determinou a duração total, como
+        uma lista de (nome, duração em segundos), e a duração total.
+        """
+        if not self.fim:
+            return [], 0.0
+
+        caminho = []
+        atual = max(self.fim, key=self.fim.get)
+        while atual is not None:
+            caminho.append((atual, self.fim[atual] - self.inicio[atual]))
+            dependencias = self.etapas[atual][1]
+            # A dependência que terminou por último foi a que liberou a etapa
+            atual = max(dependencias, key=self.fim.get) if dependencias else None
+
+        caminho.reverse()
+        return caminho, max(self.fim.values())
+
+    def descrever_caminho_critico(self):
+        """Resumo do caminho crítico em uma linha, para log"""
+        caminho, total = self.caminho_critico()
+        etapas = " → ".join(f"{nome} ({duracao * 1000:.0f}ms)" for nome, duracao in caminho)
+        return f"{etapas} = {total * 1000:.0f}ms"
@@ -0,0 +1,211 @@
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from itertools import chain
+
+try:
+    from .leitor_json import ler_dados
+except ImportError:
+    from leitor_json import ler_dados
+
+# Índice gerado a partir dos arquivos anuais de proposições da Câmara
+CAMINHO_INDICE = os.environ.get(
+    "IZILEG_INDICE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "indice_proposicoes.bin"),
+)
+
+ASSINATURA = b"IZIX"
+VERSAO = 1
+
+# Cada chave ocupa 64 bits: ano (24) | tipo (16) | número (24)
+_BITS_ANO = 24
+_BITS_NUMERO = 24
+_BITS_TIPO = 16
+
+
+def _chave(ano, tipo, numero):
+    """Chave de 64 bits, ou None se alguma parte não cabe no seu campo"""
+    if not (0 <= ano < 1 << _BITS_ANO and 0 <= tipo < 1 << _BITS_TIPO and 0 <= numero < 1 << _BITS_NUMERO):
+        return None
+    return (ano << (_BITS_TIPO + _BITS_NUMERO)) | (tipo << _BITS_NUMERO) | numero
+
+
+class IndiceProposicoes:
+    """
+    Índice compacto (sigla, número, ano) -> id de proposição.
+
+    As chaves ficam em um array ordenado de inteiros de 64 bits e a busca é
+    binária, então o índice inteiro cabe em poucos MB e carrega direto do
+    disco, sem parse.
+    """
+
+    def __init__(self, siglas, chaves, ids, anos, gerado_em):
+        self.siglas = list(siglas)
+        self._tipos = {sigla: i for i, sigla in enumerate(self.siglas)}
+        self.chaves = chaves
+        self.ids = ids
+        self.anos = set(anos)
+        self.gerado_em = gerado_em
+        # O ano da geração ainda pode ganhar proposições novas
+        ano_geracao = time.gmtime(gerado_em).tm_year
+        self.anos_completos = {ano for ano in self.anos if ano < ano_geracao}
+
+    @classmethod
+    def construir(cls, registros, anos):
+        """Cria o índice a partir de tuplas (siglaTipo, numero, ano, id)"""
+        siglas = {}
+        pares = {}
+        incompletos = set()
+        for sigla, numero, ano, id_prop in registros:
+            sigla = str(sigla).upper()
+            tipo = siglas.get(sigla, len(siglas))
+            chave = _chave(int(ano), tipo, int(numero))
+            if chave is None:
+                # Não cabe na chave; essas proposições ficam com a API. Sem
+                # código para o tipo, o ano inteiro deixa de ser coberto.
+                if tipo >= 1 << _BITS_TIPO:
+                    incompletos.add(int(ano))
+                continue
+            siglas.setdefault(sigla, tipo)
+            pares[chave] = int(id_prop)
+
+        chaves = array('Q', sorted(pares))
+        ids = array('Q', (pares[chave] for chave in chaves))
+        return cls(siglas, chaves, ids, set(anos) - incompletos, time.time())
+
+    def registros(self):
+        """Tuplas (siglaTipo, numero, ano, id) guardadas no índice"""
+        mascara_tipo = (1 << _BITS_TIPO) - 1
+        mascara_numero = (1 << _BITS_NUMERO) - 1
+        for chave, id_prop in zip(self.chaves, self.ids):
+            tipo = (chave >> _BITS_NUMERO) & mascara_tipo
+            yield self.siglas[tipo], chave & mascara_numero, chave >> (_BITS_TIPO + _BITS_NUMERO), id_prop
+
+    def mesclar(self, registros, anos):
+        """
+        Novo índice com os registros dos anos dados no lugar dos atuais. Dos
+        demais anos, ficam os que já estavam completos neste índice.
+        """
+        anos = {int(ano) for ano in anos}
+        mantidos = self.anos_completos - anos
+        anteriores = (registro for registro in self.registros() if registro[2] in mantidos)
+        return self.construir(chain(anteriores, registros), mantidos | anos)
+
+    def salvar(self, caminho=CAMINHO_INDICE):
+        """Grava o índice em disco (escrita atômica)"""
+        cabecalho = json.dumps({
+            'versao': VERSAO,
+            'siglas': self.siglas,
+            'anos': sorted(self.anos),
+            'gerado_em': self.gerado_em,
+            'total': len(self.chaves),
+            'ordem_bytes': sys.byteorder,
+        }).encode('utf-8')
+
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(ASSINATURA)
+            f.write(struct.pack('<I', len(cabecalho)))
+            f.write(cabecalho)
+            self.chaves.tofile(f)
+            self.ids.tofile(f)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO_INDICE):
+        with open(caminho, 'rb') as f:
+            if f.read(4) != ASSINATURA:
+                raise ValueError(f"Arquivo de índice inválido: {caminho}")
+            tamanho, = struct.unpack('<I', f.read(4))
+            cabecalho = json.loads(f.read(tamanho))
+            if cabecalho['versao'] != VERSAO:
+                raise ValueError(f"Versão do índice não suportada: {cabecalho['versao']}")
+
+            chaves = array('Q')
+            ids = array('Q')
+            chaves.fromfile(f, cabecalho['total'])
+            ids.fromfile(f, cabecalho['total'])
+
+        if cabecalho['ordem_bytes'] != sys.byteorder:
+            chaves.byteswap()
+            ids.byteswap()
+        return cls(cabecalho['siglas'], chaves, ids, cabecalho['anos'], cabecalho['gerado_em'])
+
+    def cobre(self, ano, numero=None):
+        """
+        Indica se o ano está completo no índice (dispensa a API). Anos e
+        números que não cabem na chave nunca entram no índice, então não
+        são cobertos.
+        """
+        if not 0 <= int(ano) < 1 << _BITS_ANO:
+            return False
+        if numero is not None and not 0 <= int(numero) < 1 << _BITS_NUMERO:
+            return False
+        return int(ano) in self.anos_completos
+
+    def buscar(self, sigla, numero, ano):
+        """Retorna o id da proposição, ou None"""
+        tipo = self._tipos.get(sigla.upper())
+        if tipo is None:
+            return None
+        chave = _chave(int(ano), tipo, int(numero))
+        if chave is None:
+            return None
+        posicao = bisect_left(self.chaves, chave)
+        if posicao < len(self.chaves) and self.chaves[posicao] == chave:
+            return self.ids[posicao]
+        return None
+
+
+def ler_registros(arquivo):
+    """Lê (siglaTipo, numero, ano, id) de um arquivo anual proposicoes-{ano}.json"""
+    for prop in ler_dados(arquivo):
+        yield prop['siglaTipo'], prop['numero'], prop['ano'], prop['id']
+
+
+_indice = None
+_indice_verificado = False
+_trava = threading.Lock()
+
+
+def obter_indice():
+    """
+    Retorna o índice local, carregado na primeira chamada, ou None se o
+    arquivo não existir
+    """
+    global _indice, _indice_verificado
+    if not _indice_verificado:
+        with _trava:
+            if not _indice_verificado:
+                if os.path.exists(CAMINHO_INDICE):
+                    try:
+                        _indice = IndiceProposicoes.carregar(CAMINHO_INDICE)
+                    except Exception as e:
+                        print(f"Erro ao carregar índice local: {str(e)}")
+                _indice_verificado = True
+    return _indice
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.indice_local proposicoes-2020.json proposicoes-2021.json ...
+    arquivos = sys.argv[1:]
+    if not arquivos:
+        print("Informe os arquivos proposicoes-{ano}.json a indexar")
+        sys.exit(1)
+
+    registros = []
+    anos = set()
+    for arquivo in arquivos:
+        for registro in ler_registros(arquivo):
+            registros.append(registro)
+            anos.add(int(registro[2]))
+
+    indice = IndiceProposicoes.construir(registros, anos)
+    indice.salvar()
+    print(f"Índice salvo em {CAMINHO_INDICE}: {len(indice.chaves)} proposições de {len(anos)} anos")
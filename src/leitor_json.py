@@ -0,0 +1,78 @@
+import json
+import os
+import re
+from itertools import islice
+
+# Caracteres lidos do arquivo por vez
+TAMANHO_BLOCO = 1024 * 1024
+
+# Maior registro aceito; acima disso o arquivo é tratado como inválido,
+# em vez de acumular o resto do arquivo em memória
+TAMANHO_MAXIMO_REGISTRO = 64 * 1024 * 1024
+
+# Registros por lote em ler_lotes()
+TAMANHO_LOTE = int(os.environ.get("IZILEG_TAMANHO_LOTE", "5000"))
+
+_INICIO_DADOS = re.compile(r'"dados"\s*:\s*\[')
+_ESPACOS = re.compile(r'[\s,]*')
+
+_decodificador = json.JSONDecoder()
+
+
+def ler_dados(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Gera, um a um, os objetos do array "dados" de um arquivo no formato dos
+    arquivos anuais da Câmara ({"dados": [{...}, {...}]}).
+    Só um bloco do arquivo e o registro atual ficam em memória.
+    """
+    with open(arquivo, encoding='utf-8') as f:
+        buffer = ''
+        descartados = 0  # caracteres já removidos do início do buffer
+        fim_arquivo = False
+
+        def ler_mais():
+            nonlocal buffer, fim_arquivo
+            bloco = f.read(tamanho_bloco)
+            fim_arquivo = not bloco
+            buffer += bloco
+
+        # Avança até o início do array
+        while True:
+            inicio = _INICIO_DADOS.search(buffer)
+            if inicio:
+                posicao = inicio.end()
+                break
+            if fim_arquivo:
+                raise ValueError(f"{arquivo}: campo 'dados' não encontrado")
+            # A chave pode estar dividida entre dois blocos
+            descartados += max(0, len(buffer) - 32)
+            buffer = buffer[-32:]
+            ler_mais()
+
+        while True:
+            posicao = _ESPACOS.match(buffer, posicao).end()
+            if posicao < len(buffer) and buffer[posicao] == ']':
+                return
+            try:
+                registro, fim = _decodificador.raw_decode(buffer, posicao)
+            except ValueError:
+                # Registro incompleto: descarta o que já foi lido e busca mais
+                if fim_arquivo or len(buffer) - posicao > TAMANHO_MAXIMO_REGISTRO:
+                    raise ValueError(f"{arquivo}: JSON incompleto ou inválido na posição {descartados + posicao}")
+                descartados += posicao
+                buffer = buffer[posicao:]
+                posicao = 0
+                ler_mais()
+                continue
+            yield registro
+            posicao = fim
+
+
+def ler_lotes(arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Mesmo que ler_dados(), em listas de até tamanho_lote registros"""
+    registros = ler_dados(arquivo)
+    while True:
+        lote = list(islice(registros, tamanho_lote))
+        if not lote:
+            return
+        yield lote
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+
+try:
+    from .teste_consulta import consultar_proposicao_estruturada_async
+except ImportError:
+    from teste_consulta import consultar_proposicao_estruturada_async
+
+# Consultas de um lote executadas ao mesmo tempo
+MAX_CONCORRENCIA_LOTE = int(os.environ.get("IZILEG_CONCORRENCIA_LOTE", "8"))
+
+# Máximo de identificadores aceitos em um lote
+MAX_ITENS_LOTE = int(os.environ.get("IZILEG_MAX_ITENS_LOTE", "1000"))
+
+
+async def _consultar_item(identificador):
+    try:
+        resultado = await consultar_proposicao_estruturada_async(identificador)
+        return {'identificador': identificador, 'status': 'success', 'data': resultado.para_dict()}
+    except Exception as e:
+        return {'identificador': identificador, 'status': 'error', 'message': str(e)}
+
+
+async def consultar_lote(identificadores, max_concorrencia=MAX_CONCORRENCIA_LOTE):
+    """
+    Consulta várias proposições, no máximo max_concorrencia por vez, e gera
+    cada resultado assim que fica pronto (não na ordem de entrada).
+
+    Identificadores repetidos são consultados uma vez só. Órgãos, deputados
+    e demais recursos comuns a várias proposições são buscados uma única vez
+    graças ao cache compartilhado, que também junta buscas simultâneas da
+    mesma URL.
+    """
+    unicos = iter(dict.fromkeys(i.strip() for i in identificadores if i and i.strip()))
+    em_execucao = set()
+
+    def iniciar_proximo():
+        identificador = next(unicos, None)
+        if identificador is not None:
+            em_execucao.add(asyncio.ensure_future(_consultar_item(identificador)))
+
+    for _ in range(max(1, max_concorrencia)):
+        iniciar_proximo()
+
+    try:
+        while em_execucao:
+            concluidas, em_execucao = await asyncio.wait(em_execucao, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in concluidas:
+                iniciar_proximo()
+                yield tarefa.result()
+    finally:
+        for tarefa in em_execucao:
+            tarefa.cancel()
+
+
+async def consultar_lote_ndjson(identificadores, max_concorrencia=MAX_CONCORRENCIA_LOTE):
+    """Mesmo que consultar_lote(), com cada resultado em uma linha JSON"""
+    async for item in consultar_lote(identificadores, max_concorrencia):
+        yield json.dumps(item, ensure_ascii=False) + "\n"
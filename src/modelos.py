@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+URL_FICHA = "https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={}"
+
+
+@dataclass(slots=True)
+class Autor:
+    nome: str
+    partido: str = ''
+    uf: str = ''
+
+    def para_dict(self):
+        return {'nome': self.nome, 'partido': self.partido, 'uf': self.uf}
+
+
+@dataclass(slots=True)
+class Orgao:
+    sigla: str
+    nome: str = ''
+    tipo: str = ''
+
+    def para_dict(self):
+        return {'sigla': self.sigla, 'nome': self.nome, 'tipo': self.tipo}
+
+
+@dataclass(slots=True)
+class Status:
+    situacao: str
+    regime: str
+    sigla_orgao: str
+
+    def para_dict(self):
+        return {'situacao': self.situacao, 'regime': self.regime, 'sigla_orgao': self.sigla_orgao}
+
+
+@dataclass(slots=True)
+class Tramitacao:
+    data_hora: str  # formato da API: AAAA-MM-DDTHH:MM
+    sigla_orgao: str
+    despacho: str
+    descricao: str
+
+    def para_dict(self):
+        return {
+            'data_hora': self.data_hora,
+            'sigla_orgao': self.sigla_orgao,
+            'despacho': self.despacho,
+            'descricao': self.descricao,
+        }
+
+
+@dataclass(slots=True)
+class Links:
+    pagina: str
+    inteiro_teor: str = ''
+
+    def para_dict(self):
+        return {'pagina': self.pagina, 'inteiro_teor': self.inteiro_teor}
+
+
+@dataclass(slots=True)
+class Proposicao:
+    id: int
+    sigla_tipo: str
+    numero: int
+    ano: int
+    ementa: str
+    status: Status
+    links: Links
+    autores: List[Autor] = field(default_factory=list)
+    mais_autores: bool = False  # há autores além dos listados
+    orgao: Optional[Orgao] = None
+    ultima_tramitacao: Optional[Tramitacao] = None
+
+    @property
+    def titulo(self):
+        return f"{self.sigla_tipo} {self.numero}/{self.ano}"
+
+    def para_dict(self):
+        return {
+            'id': self.id,
+            'titulo': self.titulo,
+            'sigla_tipo': self.sigla_tipo,
+            'numero': self.numero,
+            'ano': self.ano,
+            'ementa': self.ementa,
+            'autores': [autor.para_dict() for autor in self.autores],
+            'mais_autores': self.mais_autores,
+            'status': self.status.para_dict(),
+            'orgao': self.orgao.para_dict() if self.orgao else None,
+            'ultima_tramitacao': self.ultima_tramitacao.para_dict() if self.ultima_tramitacao else None,
+            'links': self.links.para_dict(),
+        }
+
+
+@dataclass(slots=True)
+class OpcaoBusca:
+    titulo: str
+    id: int
+    link: str
+    ementa: str = ''  # preenchida nas buscas por termo
+
+    def para_dict(self):
+        return {'titulo': self.titulo, 'id': self.id, 'link': self.link, 'ementa': self.ementa}
+
+
+@dataclass(slots=True)
+class ResultadoConsulta:
+    """
+    Resultado de uma consulta. `tipo` indica o caso:
+    - 'proposicao': uma proposição encontrada, em `proposicao`
+    - 'opcoes': mais de uma proposição com o mesmo número, em `opcoes`
+    - 'nao_encontrada': nada encontrado
+    """
+    tipo: str
+    proposicao: Optional[Proposicao] = None
+    opcoes: List[OpcaoBusca] = field(default_factory=list)
+
+    def para_dict(self):
+        return {
+            'tipo': self.tipo,
+            'proposicao': self.proposicao.para_dict() if self.proposicao else None,
+            'opcoes': [opcao.para_dict() for opcao in self.opcoes],
+        }
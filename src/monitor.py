@@ -0,0 +1,362 @@
+import asyncio
+import heapq
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    from . import cliente_http
+    from .politicas import BaldeFichas
+except ImportError:
+    import cliente_http
+    from politicas import BaldeFichas
+
+# Pasta com a lista de proposições acompanhadas (lista.txt, um id por
+# linha), o último estado de cada uma e o feed de eventos
+PASTA_MONITOR = os.environ.get(
+    "IZILEG_MONITOR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "monitor"),
+)
+
+# Máximo de requisições à API por hora, qualquer que seja o tamanho da lista
+ORCAMENTO_HORA = int(os.environ.get("IZILEG_MONITOR_ORCAMENTO", "600"))
+
+# Limites (s) do intervalo entre duas verificações da mesma proposição
+INTERVALO_MINIMO = int(os.environ.get("IZILEG_MONITOR_INTERVALO_MINIMO", "900"))
+INTERVALO_MAXIMO = int(os.environ.get("IZILEG_MONITOR_INTERVALO_MAXIMO", "86400"))
+
+# Dentro dos limites, o intervalo é essa fração do tempo desde a última
+# mudança: uma proposição parada há 10 dias é verificada uma vez por dia
+FATOR_INTERVALO = 0.1
+
+# Verificações em andamento ao mesmo tempo
+CONCORRENCIA = int(os.environ.get("IZILEG_MONITOR_CONCORRENCIA", "4"))
+
+# Intervalo (s) entre gravações do estado e releituras da lista
+INTERVALO_GRAVACAO = 30
+
+# Eventos guardados para reenvio quando o webhook falha
+MAX_PENDENTES = 1000
+
+# Campos de statusProposicao comparados a cada verificação
+CAMPOS_STATUS = (
+    'dataHora', 'sequencia', 'siglaOrgao', 'regime', 'descricaoTramitacao', 'codTipoTramitacao',
+    'descricaoSituacao', 'codSituacao', 'despacho', 'apreciacao', 'uriUltimoRelator',
+)
+
+# Campos que identificam a última tramitação; se mudam, houve tramitação nova
+CAMPOS_TRAMITACAO = ('dataHora', 'sequencia')
+
+
+def _agora_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def _gravar_json(caminho, dados):
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _timestamp(data_hora):
+    """'AAAA-MM-DDTHH:MM' (horário local da API) -> segundos desde a época"""
+    try:
+        return datetime.fromisoformat(data_hora[:16]).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def calcular_intervalo(atividade, agora):
+    """
+    Intervalo até a próxima verificação: proposições com mudança recente são
+    verificadas com frequência, as paradas há muito tempo, raramente
+    """
+    if atividade is None:
+        return INTERVALO_MINIMO
+    parada = max(0.0, agora - atividade)
+    return min(INTERVALO_MAXIMO, max(INTERVALO_MINIMO, parada * FATOR_INTERVALO))
+
+
+def comparar_status(antes, depois):
+    """Campos de statusProposicao que mudaram: {campo: {'antes': ..., 'depois': ...}}"""
+    return {
+        campo: {'antes': antes.get(campo), 'depois': depois.get(campo)}
+        for campo in CAMPOS_STATUS
+        if antes.get(campo) != depois.get(campo)
+    }
+
+
+def ler_lista(caminho):
+    """Ids da lista de acompanhamento, na ordem do arquivo"""
+    if not os.path.exists(caminho):
+        return []
+    ids = []
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.split('#', 1)[0].strip()
+            if linha.isdigit():
+                ids.append(int(linha))
+    return list(dict.fromkeys(ids))
+
+
+def gravar_lista(caminho, ids):
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.writelines(f"{id_prop}\n" for id_prop in ids)
+    os.replace(temporario, caminho)
+
+
+class SaidaNDJSON:
+    """Acrescenta cada evento como uma linha JSON em um arquivo"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    async def enviar(self, evento):
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+class SaidaWebhook:
+    """Envia cada evento em um POST JSON"""
+
+    def __init__(self, url):
+        self.url = url
+
+    async def enviar(self, evento):
+        response = await cliente_http.obter_cliente_async().post(self.url, json=evento)
+        response.raise_for_status()
+
+
+class Monitor:
+    """
+    Acompanha uma lista de proposições e emite um evento quando o
+    statusProposicao (e com ele a última tramitação) de alguma muda.
+
+    Cada verificação é uma requisição a proposicoes/{id}. As proposições
+    ficam em uma fila pela hora da próxima verificação, definida por
+    calcular_intervalo(); o balde de fichas segura a fila quando o
+    orçamento por hora acaba, então listas grandes só ficam com intervalos
+    maiores, sem gastar mais requisições.
+    """
+
+    def __init__(self, saidas, pasta=PASTA_MONITOR, orcamento_hora=ORCAMENTO_HORA, concorrencia=CONCORRENCIA):
+        self.saidas = list(saidas)
+        self.caminho_lista = os.path.join(pasta, "lista.txt")
+        self.caminho_estado = os.path.join(pasta, "estado.json")
+        self.balde = BaldeFichas.por_hora(orcamento_hora)
+        self.concorrencia = concorrencia
+        self.estados = {}    # id -> último estado conhecido
+        self.pendentes = []  # eventos que não puderam ser enviados
+        self._fila = []      # (próxima verificação, id)
+        self._lista_modificada_em = None
+        self._alterado = False
+
+    def carregar(self):
+        if os.path.exists(self.caminho_estado):
+            with open(self.caminho_estado, encoding='utf-8') as f:
+                dados = json.load(f)
+            self.estados = {int(id_prop): estado for id_prop, estado in dados.get('proposicoes', {}).items()}
+            self.pendentes = dados.get('pendentes', [])
+        self.sincronizar_lista()
+
+    def gravar(self):
+        os.makedirs(os.path.dirname(self.caminho_estado) or '.', exist_ok=True)
+        _gravar_json(self.caminho_estado, {
+            'proposicoes': {str(id_prop): estado for id_prop, estado in self.estados.items()},
+            'pendentes': self.pendentes,
+        })
+        self._alterado = False
+
+    def sincronizar_lista(self):
+        """Relê a lista se o arquivo mudou: ids novos entram na fila, os removidos saem"""
+        modificado_em = os.path.getmtime(self.caminho_lista) if os.path.exists(self.caminho_lista) else None
+        if modificado_em == self._lista_modificada_em:
+            return
+        self._lista_modificada_em = modificado_em
+
+        ids = ler_lista(self.caminho_lista)
+        agora = time.time()
+        self.estados = {id_prop: self.estados.get(id_prop) or {'proxima': agora} for id_prop in ids}
+        self._fila = [(estado['proxima'], id_prop) for id_prop, estado in self.estados.items()]
+        heapq.heapify(self._fila)
+        self._alterado = True
+
+    def _proxima(self):
+        """(id, espera em s) da próxima verificação; descarta entradas vencidas da fila"""
+        while self._fila:
+            proxima, id_prop = self._fila[0]
+            estado = self.estados.get(id_prop)
+            if estado is None or estado['proxima'] != proxima:
+                heapq.heappop(self._fila)
+                continue
+            return id_prop, proxima - time.time()
+        return None, None
+
+    def _agendar(self, id_prop, estado, intervalo):
+        estado['proxima'] = time.time() + intervalo
+        heapq.heappush(self._fila, (estado['proxima'], id_prop))
+
+    async def verificar(self, id_prop):
+        """Consulta a proposição, compara com o último estado e emite o evento, se houver"""
+        estado = self.estados.get(id_prop)
+        if estado is None:
+            # Removida da lista enquanto esperava a vez
+            return None
+        agora = time.time()
+        try:
+            # Uma requisição por verificação, para o orçamento por hora valer:
+            # sem novas tentativas nem hedge (o erro só adia a próxima verificação)
+            prop = await cliente_http.get_dados_async(f"proposicoes/{id_prop}", usar_cache=False,
+                                                      unica_requisicao=True)
+        except Exception as e:
+            # Erros espaçam as tentativas, até o intervalo máximo
+            estado['erros'] = estado.get('erros', 0) + 1
+            print(f"Erro ao verificar proposição {id_prop}: {str(e)}")
+            self._agendar(id_prop, estado, min(INTERVALO_MAXIMO, INTERVALO_MINIMO * 2 ** estado['erros']))
+            self._alterado = True
+            return None
+
+        status = {campo: (prop.get('statusProposicao') or {}).get(campo) for campo in CAMPOS_STATUS}
+        anterior = estado.get('status')
+        evento = None
+        if anterior is None:
+            # Primeira verificação: só guarda o estado de referência
+            estado['atividade'] = _timestamp(status['dataHora']) or agora
+        else:
+            mudancas = comparar_status(anterior, status)
+            if mudancas:
+                estado['atividade'] = agora
+                evento = {
+                    'id': id_prop,
+                    'titulo': f"{prop.get('siglaTipo')} {prop.get('numero')}/{prop.get('ano')}",
+                    'tipo': 'tramitacao' if any(campo in mudancas for campo in CAMPOS_TRAMITACAO) else 'status',
+                    'mudancas': mudancas,
+                    'status': status,
+                    'detectado_em': _agora_iso(),
+                }
+
+        estado['status'] = status
+        estado['verificada_em'] = agora
+        estado['erros'] = 0
+        self._agendar(id_prop, estado, calcular_intervalo(estado['atividade'], agora))
+        self._alterado = True
+
+        if evento is not None:
+            await self.emitir(evento)
+        return evento
+
+    async def emitir(self, evento):
+        """Envia o evento a todas as saídas; se alguma falhar, guarda para reenvio"""
+        try:
+            for saida in self.saidas:
+                await saida.enviar(evento)
+        except Exception as e:
+            print(f"Erro ao enviar evento da proposição {evento['id']}: {str(e)}")
+            self.pendentes = (self.pendentes + [evento])[-MAX_PENDENTES:]
+            self._alterado = True
+
+    async def reenviar_pendentes(self):
+        pendentes, self.pendentes = self.pendentes, []
+        for evento in pendentes:
+            await self.emitir(evento)
+        if pendentes:
+            self._alterado = True
+
+    async def executar(self, duracao=None):
+        """
+        Verifica as proposições da lista continuamente (ou por 'duracao'
+        segundos). Mudanças na lista são percebidas sem reiniciar.
+        """
+        self.carregar()
+        fim = time.monotonic() + duracao if duracao is not None else None
+        limite = asyncio.Semaphore(self.concorrencia)
+        em_andamento = set()
+        em_verificacao = set()
+        gravado_em = time.monotonic()
+
+        async def verificar(id_prop):
+            try:
+                await self.verificar(id_prop)
+            finally:
+                em_verificacao.discard(id_prop)
+                limite.release()
+
+        try:
+            while fim is None or time.monotonic() < fim:
+                if time.monotonic() - gravado_em >= INTERVALO_GRAVACAO:
+                    self.sincronizar_lista()
+                    await self.reenviar_pendentes()
+                    if self._alterado:
+                        self.gravar()
+                    gravado_em = time.monotonic()
+
+                id_prop, espera = self._proxima()
+                if id_prop is not None and espera <= 0:
+                    # Orçamento esgotado: a fila espera a próxima ficha
+                    espera = self.balde.tempo_ate_ficha()
+                if id_prop is None or espera > 0:
+                    pausa = INTERVALO_GRAVACAO if id_prop is None else min(espera, INTERVALO_GRAVACAO)
+                    if fim is not None:
+                        pausa = min(pausa, max(0.0, fim - time.monotonic()))
+                    await asyncio.sleep(pausa)
+                    continue
+
+                if id_prop in em_verificacao:
+                    # Já em andamento (a lista foi relida); será reagendada ao terminar
+                    heapq.heappop(self._fila)
+                    continue
+                if not self.balde.tentar_retirar():
+                    # Sem ficha afinal: a proposição continua na fila, esperando a próxima
+                    continue
+                heapq.heappop(self._fila)
+                em_verificacao.add(id_prop)
+                await limite.acquire()
+                tarefa = asyncio.ensure_future(verificar(id_prop))
+                em_andamento.add(tarefa)
+                tarefa.add_done_callback(em_andamento.discard)
+        finally:
+            if em_andamento:
+                await asyncio.gather(*em_andamento, return_exceptions=True)
+            self.gravar()
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python -m src.monitor adicionar 2256735 2270800 ...
+    #   python -m src.monitor remover 2256735 ...
+    #   python -m src.monitor executar [--webhook URL] [--saida eventos.ndjson]
+    argumentos = sys.argv[1:]
+    comando = argumentos.pop(0) if argumentos else None
+    caminho_lista = os.path.join(PASTA_MONITOR, "lista.txt")
+
+    if comando in ('adicionar', 'remover'):
+        ids = ler_lista(caminho_lista)
+        informados = [int(id_prop) for id_prop in argumentos if id_prop.isdigit()]
+        if comando == 'adicionar':
+            ids = list(dict.fromkeys(ids + informados))
+        else:
+            ids = [id_prop for id_prop in ids if id_prop not in informados]
+        gravar_lista(caminho_lista, ids)
+        print(f"{len(ids)} proposições acompanhadas")
+
+    elif comando == 'executar':
+        opcoes = dict(zip(argumentos[::2], argumentos[1::2]))
+        saidas = []
+        if '--webhook' in opcoes:
+            saidas.append(SaidaWebhook(opcoes['--webhook']))
+        if '--saida' in opcoes or not saidas:
+            saidas.append(SaidaNDJSON(opcoes.get('--saida', os.path.join(PASTA_MONITOR, "eventos.ndjson"))))
+        try:
+            asyncio.run(Monitor(saidas).executar())
+        except KeyboardInterrupt:
+            pass
+
+    else:
+        print("Comandos: adicionar ID..., remover ID..., executar [--webhook URL] [--saida ARQUIVO]")
+        sys.exit(1)
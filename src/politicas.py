@@ -0,0 +1,386 @@
+import asyncio
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# Respostas tratadas como falha temporária: novas tentativas e circuito
+STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+
+# Requisições por segundo e rajada de cada grupo de endpoints. Endpoints do
+# mesmo grupo dividem o mesmo limite. Uma consulta sem cache faz de 4 a 6
+# requisições à API, então a taxa da API limita as consultas por segundo de
+# cada processo (30/s: cerca de 5 consultas sem cache por segundo).
+GRUPOS = {
+    'api': (float(os.environ.get("IZILEG_TAXA_API", "30")), int(os.environ.get("IZILEG_RAJADA_API", "60"))),
+    'arquivos': (2, 4),
+    'web': (2, 2),
+}
+
+# Política usada quando nenhum ajuste se aplica
+PADRAO = {
+    'grupo': 'api',
+    'tentativas': 3,          # total de tentativas, incluindo a primeira
+    'espera_base': 0.2,       # espera (s) antes da 2ª tentativa; dobra a cada nova
+    'espera_maxima': 5,       # maior espera (s) entre tentativas, inclusive via Retry-After
+    'limite_falhas': 5,       # falhas seguidas que abrem o circuito
+    'tempo_aberto': 30,       # tempo (s) com o circuito aberto antes de testar de novo
+    'hedge_apos': None,       # segundos sem resposta até disparar uma 2ª requisição (só async)
+}
+
+# Ajustes por endpoint, na ordem em que são testados. A expressão é
+# aplicada ao caminho relativo à API (ex: 'proposicoes/123') ou, para
+# outros endereços, à URL completa. IZILEG_POLITICAS, em JSON
+# ({"expressão": {...}}), altera os ajustes de uma expressão da lista ou
+# acrescenta expressões novas, testadas antes das demais.
+ENDPOINTS = [
+    (r'^https?://dadosabertos\.camara\.leg\.br/arquivos/',
+     {'grupo': 'arquivos', 'tentativas': 5, 'espera_base': 1, 'espera_maxima': 30, 'tempo_aberto': 60}),
+    (r'^https?://www\.camara\.leg\.br/', {'grupo': 'web', 'tentativas': 2}),
+    (r'^proposicoes/\d+$', {'hedge_apos': 1.0}),
+    (r'^proposicoes$', {'hedge_apos': 1.5}),
+]
+
+
+class CircuitoAberto(Exception):
+    """O endpoint falhou seguidamente e não está sendo consultado"""
+
+
+class BaldeFichas:
+    """
+    Limita a taxa de requisições: cada requisição gasta uma ficha, o balde
+    guarda até 'capacidade' fichas e recebe 'taxa' fichas por segundo
+    """
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self._atualizado_em = time.monotonic()
+        self._trava = threading.Lock()
+
+    @classmethod
+    def por_hora(cls, orcamento):
+        """
+        Balde que nunca passa de 'orcamento' requisições em uma hora: a
+        rajada inicial (1 minuto de orçamento) é descontada da taxa
+        """
+        capacidade = max(1, orcamento // 60)
+        return cls(max(orcamento - capacidade, 1) / 3600, capacidade)
+
+    def _repor(self):
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._atualizado_em) * self.taxa)
+        self._atualizado_em = agora
+
+    def tempo_ate_ficha(self):
+        """Segundos até haver uma ficha disponível (0 se já há)"""
+        with self._trava:
+            self._repor()
+            return max(0.0, (1 - self.fichas) / self.taxa)
+
+    def tentar_retirar(self):
+        with self._trava:
+            self._repor()
+            if self.fichas >= 1:
+                self.fichas -= 1
+                return True
+            return False
+
+    async def retirar(self):
+        """Espera até haver uma ficha e a consome"""
+        while not self.tentar_retirar():
+            await asyncio.sleep(self.tempo_ate_ficha())
+
+    def retirar_sincrono(self):
+        """Versão síncrona de retirar()"""
+        while not self.tentar_retirar():
+            time.sleep(self.tempo_ate_ficha())
+
+
+class Circuito:
+    """
+    Disjuntor: depois de limite_falhas falhas seguidas, recusa chamadas por
+    tempo_aberto segundos; depois deixa passar uma chamada de teste, que
+    fecha o circuito se der certo ou o abre de novo se falhar
+    """
+
+    def __init__(self, limite_falhas, tempo_aberto):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.falhas = 0
+        self.aberto_ate = None
+        self._em_teste = False
+        self._trava = threading.Lock()
+
+    @property
+    def estado(self):
+        if self.aberto_ate is None:
+            return 'fechado'
+        return 'aberto' if time.monotonic() < self.aberto_ate else 'meio-aberto'
+
+    def permitir(self):
+        """
+        False se a chamada deve ser recusada; 'teste' para a chamada de
+        teste do circuito meio-aberto; True para as demais
+        """
+        with self._trava:
+            if self.aberto_ate is None:
+                return True
+            if time.monotonic() >= self.aberto_ate and not self._em_teste:
+                self._em_teste = True
+                return 'teste'
+            return False
+
+    def liberar_teste(self):
+        """
+        A chamada de teste terminou sem resultado (cancelada ou com um erro
+        que não é da API): outra chamada pode testar
+        """
+        with self._trava:
+            self._em_teste = False
+
+    def sucesso(self):
+        with self._trava:
+            self.falhas = 0
+            self.aberto_ate = None
+            self._em_teste = False
+
+    def falha(self):
+        with self._trava:
+            self.falhas += 1
+            if self._em_teste or self.falhas >= self.limite_falhas:
+                self.aberto_ate = time.monotonic() + self.tempo_aberto
+                self._em_teste = False
+
+
+def _retry_after(response):
+    """Segundos pedidos no cabeçalho Retry-After (número ou data), ou None"""
+    valor = response.headers.get('Retry-After')
+    if not valor:
+        return None
+    if valor.strip().isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def erro_transitorio(erro):
+    """Indica se o erro é de rede, de circuito aberto ou um status retentável"""
+    if isinstance(erro, (httpx.TransportError, CircuitoAberto)):
+        return True
+    return isinstance(erro, httpx.HTTPStatusError) and erro.response.status_code in STATUS_RETENTAVEIS
+
+
+class Politica:
+    """
+    Limite de taxa, novas tentativas com espera exponencial (com jitter),
+    disjuntor e, nas chamadas assíncronas, hedge: se a resposta demora mais
+    que hedge_apos, uma segunda requisição igual é feita e vale a primeira
+    que responder. Só para requisições idempotentes (GET).
+    """
+
+    def __init__(self, nome, balde, grupo='api', tentativas=3, espera_base=0.2, espera_maxima=5,
+                 limite_falhas=5, tempo_aberto=30, hedge_apos=None):
+        self.nome = nome
+        self.balde = balde
+        self.grupo = grupo
+        self.tentativas = max(1, tentativas)
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.hedge_apos = hedge_apos
+        self.circuito = Circuito(limite_falhas, tempo_aberto)
+        self._contadores = dict.fromkeys(
+            ['requisicoes', 'novas_tentativas', 'falhas', 'recusadas', 'hedges', 'hedges_vencedores'], 0)
+        self._trava = threading.Lock()
+
+    def unica_requisicao(self):
+        """
+        A mesma política (taxa, circuito e contadores), mas sem novas
+        tentativas nem hedge: cada chamada faz uma requisição só
+        """
+        variante = copy.copy(self)
+        variante.tentativas = 1
+        variante.hedge_apos = None
+        return variante
+
+    def _contar(self, nome):
+        with self._trava:
+            self._contadores[nome] += 1
+
+    def _espera(self, tentativa, pedida=None):
+        """
+        Espera antes da próxima tentativa (full jitter), ou None se o
+        servidor pediu mais que espera_maxima
+        """
+        if pedida is not None:
+            return pedida if pedida <= self.espera_maxima else None
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** tentativa))
+
+    def _avaliar(self, response=None, erro=None):
+        """Registra o resultado no circuito; retorna True se deve tentar de novo"""
+        if erro is None and response.status_code not in STATUS_RETENTAVEIS:
+            self.circuito.sucesso()
+            return False
+        self._contar('falhas')
+        self.circuito.falha()
+        return True
+
+    def _entrar(self):
+        """Retorna True se a chamada é o teste do circuito meio-aberto"""
+        permitida = self.circuito.permitir()
+        if not permitida:
+            self._contar('recusadas')
+            raise CircuitoAberto(f"Circuito aberto para '{self.nome}': tente novamente em instantes")
+        self._contar('requisicoes')
+        return permitida == 'teste'
+
+    def executar(self, fazer):
+        """
+        Chama fazer() (que retorna um httpx.Response) aplicando a política.
+        Retorna a última resposta, mesmo com status de erro, ou propaga o
+        último erro de rede.
+        """
+        for tentativa in range(self.tentativas):
+            teste = self._entrar()
+            response, erro = None, None
+            try:
+                self.balde.retirar_sincrono()
+                response = fazer()
+            except httpx.TransportError as e:
+                erro = e
+            except BaseException:
+                # Sem resposta da API para avaliar: o teste do circuito fica livre
+                if teste:
+                    self.circuito.liberar_teste()
+                raise
+            if not self._avaliar(response, erro):
+                return response
+
+            espera = self._espera(tentativa, _retry_after(response) if response is not None else None)
+            if tentativa == self.tentativas - 1 or espera is None:
+                break
+            if response is not None:
+                response.close()
+            self._contar('novas_tentativas')
+            time.sleep(espera)
+
+        if erro is not None:
+            raise erro
+        return response
+
+    async def _tentar_async(self, fazer):
+        """Uma tentativa; com hedge, dispara a segunda requisição se a primeira demorar"""
+        if self.hedge_apos is None:
+            return await fazer()
+
+        tarefas = [asyncio.ensure_future(fazer())]
+        try:
+            concluidas, _ = await asyncio.wait(tarefas, timeout=self.hedge_apos)
+            if not concluidas and self.balde.tentar_retirar():
+                self._contar('hedges')
+                tarefas.append(asyncio.ensure_future(fazer()))
+
+            # Vale a primeira resposta; erro só se todas falharem
+            pendentes = set(tarefas)
+            erro = None
+            while pendentes:
+                concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in concluidas:
+                    if tarefa.exception() is not None:
+                        erro = tarefa.exception()
+                        continue
+                    if tarefa is not tarefas[0]:
+                        self._contar('hedges_vencedores')
+                    return tarefa.result()
+            raise erro
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    async def executar_async(self, fazer):
+        """Versão assíncrona de executar(); fazer() é uma corrotina"""
+        for tentativa in range(self.tentativas):
+            teste = self._entrar()
+            response, erro = None, None
+            try:
+                await self.balde.retirar()
+                response = await self._tentar_async(fazer)
+            except httpx.TransportError as e:
+                erro = e
+            except BaseException:
+                # Cancelada (cliente desconectou, grafo cancelado...) ou erro que não é da API
+                if teste:
+                    self.circuito.liberar_teste()
+                raise
+            if not self._avaliar(response, erro):
+                return response
+
+            espera = self._espera(tentativa, _retry_after(response) if response is not None else None)
+            if tentativa == self.tentativas - 1 or espera is None:
+                break
+            if response is not None:
+                await response.aclose()
+            self._contar('novas_tentativas')
+            await asyncio.sleep(espera)
+
+        if erro is not None:
+            raise erro
+        return response
+
+    def estatisticas(self):
+        with self._trava:
+            dados = dict(self._contadores)
+        dados['grupo'] = self.grupo
+        dados['circuito'] = self.circuito.estado
+        return dados
+
+
+def _montar_politicas():
+    ajustes = dict(ENDPOINTS)
+    configuracao = os.environ.get("IZILEG_POLITICAS")
+    if configuracao:
+        try:
+            novos = {}
+            for padrao, ajuste in json.loads(configuracao).items():
+                if padrao in ajustes:
+                    ajustes[padrao] = {**ajustes[padrao], **ajuste}
+                else:
+                    novos[padrao] = ajuste
+            ajustes = {**novos, **ajustes}
+        except (ValueError, AttributeError, TypeError) as e:
+            print(f"IZILEG_POLITICAS inválido, usando o padrão: {str(e)}")
+
+    baldes = {grupo: BaldeFichas(taxa, rajada) for grupo, (taxa, rajada) in GRUPOS.items()}
+
+    def criar(nome, ajuste):
+        opcoes = {**PADRAO, **ajuste}
+        if opcoes['grupo'] not in baldes:
+            baldes[opcoes['grupo']] = BaldeFichas(*GRUPOS['api'])
+        return Politica(nome, baldes[opcoes['grupo']], **opcoes)
+
+    return [(re.compile(padrao), criar(padrao, ajuste)) for padrao, ajuste in ajustes.items()], criar('padrao', {})
+
+
+_politicas, _politica_padrao = _montar_politicas()
+
+
+def politica_para(recurso):
+    """Política do endpoint: caminho relativo à API ou URL completa"""
+    for padrao, politica in _politicas:
+        if padrao.search(recurso):
+            return politica
+    return _politica_padrao
+
+
+def estatisticas():
+    """Contadores e estado do circuito de cada política"""
+    return {politica.nome: politica.estatisticas() for _, politica in _politicas + [(None, _politica_padrao)]}
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import time
+
+try:
+    from . import cliente_http
+    from .cache_persistente import cache_disco
+except ImportError:
+    import cliente_http
+    from cache_persistente import cache_disco
+
+# Intervalo (s) entre as atualizações dos dados de referência
+INTERVALO_ATUALIZACAO = int(os.environ.get("IZILEG_INTERVALO_REFERENCIA", "21600"))
+
+# Tamanho máximo de página aceito pela API
+ITENS_POR_PAGINA = 100
+
+# Chave dos dados de referência no cache em disco
+CHAVE_DISCO = "referencia"
+
+logger = logging.getLogger(__name__)
+
+
+async def _listar_paginado(caminho, params=None):
+    """Percorre todas as páginas de uma listagem da API"""
+    registros = []
+    pagina = 1
+    while True:
+        parametros = dict(params or {}, itens=ITENS_POR_PAGINA, pagina=pagina)
+        dados = await cliente_http.get_dados_async(caminho, parametros, usar_cache=False)
+        registros.extend(dados)
+        if len(dados) < ITENS_POR_PAGINA:
+            return registros
+        pagina += 1
+
+
+async def _legislatura_atual():
+    dados = await cliente_http.get_dados_async(
+        "legislaturas", {'ordem': 'DESC', 'ordenarPor': 'id', 'itens': 1}, usar_cache=False)
+    return dados[0]['id']
+
+
+class DadosReferencia:
+    """
+    Cópia em memória dos deputados da legislatura atual e dos órgãos da
+    Câmara. Esses dados mudam pouco e são usados em quase toda consulta,
+    então são carregados de uma vez e atualizados periodicamente.
+    """
+
+    def __init__(self, intervalo=INTERVALO_ATUALIZACAO):
+        self.intervalo = intervalo
+        self.deputados = {}
+        self.orgaos = {}
+        self.legislatura = None
+        self.carregado_em = None
+        self._tarefa = None
+
+    async def carregar(self):
+        """Baixa deputados e órgãos e substitui a cópia atual"""
+        legislatura = await _legislatura_atual()
+        deputados, orgaos = await asyncio.gather(
+            _listar_paginado("deputados", {'idLegislatura': legislatura}),
+            _listar_paginado("orgaos"),
+        )
+
+        por_sigla = {}
+        for orgao in orgaos:
+            # Mantém o primeiro órgão de cada sigla, como a busca por sigla da API
+            por_sigla.setdefault(orgao['sigla'].upper(), orgao)
+
+        # Troca os dicionários inteiros para que leitores nunca vejam dados pela metade
+        self.deputados = {str(dep['id']): dep for dep in deputados}
+        self.orgaos = por_sigla
+        self.legislatura = legislatura
+        self.carregado_em = time.time()
+        print(f"Dados de referência carregados: {len(self.deputados)} deputados, {len(self.orgaos)} órgãos")
+        cache_disco.gravar(CHAVE_DISCO, {
+            'legislatura': self.legislatura,
+            'deputados': self.deputados,
+            'orgaos': self.orgaos,
+            'carregado_em': self.carregado_em,
+        }, self.intervalo)
+
+    def restaurar(self):
+        """
+        Usa a cópia guardada no cache em disco, se houver, para não esperar
+        a API depois de um reinício. Retorna a idade da cópia (s) ou None.
+        """
+        lida = cache_disco.ler(CHAVE_DISCO)
+        if lida is None:
+            return None
+        dados, _ = lida
+        self.deputados = dados['deputados']
+        self.orgaos = dados['orgaos']
+        self.legislatura = dados['legislatura']
+        self.carregado_em = dados['carregado_em']
+        return time.time() - self.carregado_em
+
+    async def manter_atualizado(self):
+        """Carrega os dados e os atualiza a cada `intervalo` segundos"""
+        # A leitura do cache em disco faz E/S: fora do event loop
+        idade = await asyncio.to_thread(self.restaurar)
+        if idade is not None and idade < self.intervalo:
+            # A cópia do disco ainda vale: só atualiza quando ela vencer
+            await asyncio.sleep(self.intervalo - idade)
+        while True:
+            try:
+                await self.carregar()
+            except Exception:
+                logger.exception("Erro ao carregar dados de referência")
+            await asyncio.sleep(self.intervalo)
+
+    def iniciar(self):
+        """
+        Inicia a atualização periódica em segundo plano. Dentro de um event
+        loop (ex: startup da API) usa o loop atual; fora dele, usa o loop
+        das chamadas síncronas.
+        """
+        if self._tarefa is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+            self._tarefa = asyncio.ensure_future(self.manter_atualizado())
+        except RuntimeError:
+            self._tarefa = asyncio.run_coroutine_threadsafe(
+                self.manter_atualizado(), cliente_http.obter_loop_sincrono())
+
+    def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    def deputado(self, id_deputado):
+        """Deputado da legislatura atual (com siglaPartido e siglaUf), ou None"""
+        return self.deputados.get(str(id_deputado))
+
+    def orgao(self, sigla):
+        """Órgão pela sigla, ou None"""
+        return self.orgaos.get(sigla.upper()) if sigla else None
+
+
+referencia = DadosReferencia()
@@ -0,0 +1,195 @@
+from datetime import datetime
+from html import escape
+
+
+def formatar_erro_busca():
+    return """
+[TITULO]Como pesquisar proposições[/TITULO]
+
+[INFO]
+Digite o tipo e número da proposição ou apenas o número para ver todas as opções.
+
+Exemplos de busca:
+• PL 2306/2020 (Projeto de Lei)
+• PEC 45/2019 (Proposta de Emenda à Constituição)
+• REQ 123/2024 (Requerimento)
+• MPV 1172/2023 (Medida Provisória)
+• 2306/2020 (busca em todos os tipos)
+
+Tipos disponíveis:
+• PL  - Projeto de Lei
+• PLP - Projeto de Lei Complementar
+• PEC - Proposta de Emenda à Constituição
+• MPV - Medida Provisória
+• PDL - Projeto de Decreto Legislativo
+• PRC - Projeto de Resolução
+• REQ - Requerimento
+• INC - Indicação
+• RIC - Requerimento de Informação
+[/INFO]
+"""
+
+
+def formatar_data_hora(data_hora):
+    """Converte 'AAAA-MM-DDTHH:MM' para 'DD/MM/AAAA às HH:MM'"""
+    if not data_hora:
+        return 'N/A'
+    return datetime.strptime(data_hora[:16], '%Y-%m-%dT%H:%M').strftime('%d/%m/%Y às %H:%M')
+
+
+def formatar_autores(proposicao):
+    """Retorna (rótulo, autores) no formato 'Nome (PARTIDO/UF), ...'"""
+    autores_info = [
+        f"{autor.nome} ({autor.partido}/{autor.uf})" if autor.partido and autor.uf else f"{autor.nome} (N/A)"
+        for autor in proposicao.autores
+    ]
+    if proposicao.mais_autores:
+        autores_info.append("e outros")
+
+    if len(autores_info) > 1:
+        rotulo = "Autores"
+    elif proposicao.autores and 'Deputada' in proposicao.autores[0].nome:
+        rotulo = "Autora"
+    else:
+        rotulo = "Autor"
+    return rotulo, ", ".join(autores_info)
+
+
+def renderizar_texto(resultado):
+    """
+    Texto com marcações [TITULO]/[SUBTITULO], usado pela linha de comando
+    e por consultar_proposicao_completa()
+    """
+    if resultado.tipo == 'nao_encontrada':
+        return formatar_erro_busca()
+
+    if resultado.tipo == 'opcoes':
+        resposta = "[TITULO]Proposições encontradas[/TITULO]\n"
+        resposta += "Encontramos várias proposições com este número:\n\n"
+        for opcao in resultado.opcoes:
+            resposta += f"• {opcao.titulo} - {opcao.ementa}\n" if opcao.ementa else f"• {opcao.titulo}\n"
+        resposta += "\nPor favor, especifique o tipo (ex: PL, PEC, etc)"
+        return resposta
+
+    prop = resultado.proposicao
+    rotulo_autores, autores = formatar_autores(prop)
+    tramitacao = prop.ultima_tramitacao
+    return f"""
+[TITULO]{prop.titulo}[/TITULO]
+{prop.ementa}
+
+[SUBTITULO]Informações[/SUBTITULO]
+• {rotulo_autores}: {autores}
+• Status: {prop.status.situacao}
+• Órgão: {prop.status.sigla_orgao} - {prop.orgao.nome if prop.orgao else 'N/A'}
+• Regime: {prop.status.regime}
+
+[SUBTITULO]Última atualização[/SUBTITULO]
+{formatar_data_hora(tramitacao.data_hora) if tramitacao else 'N/A'}
+{tramitacao.despacho if tramitacao else 'N/A'}
+
+[SUBTITULO]Links[/SUBTITULO]
+Página da proposição: <a href="{prop.links.pagina}" target="_blank">{prop.links.pagina}</a>
+Texto completo: <a href="{prop.links.inteiro_teor or '#'}" target="_blank">{prop.links.inteiro_teor or 'N/A'}</a>
+"""
+
+
+def renderizar_html(resultado):
+    """Cartão HTML com estilos embutidos, usado pela interface Gradio"""
+    if resultado.tipo == 'nao_encontrada':
+        return """
+            <div style="padding: 15px; color: #856404; background-color: #fff3cd; border-radius: 8px;">
+                ⚠️ Proposição não encontrada. Use: PL XXXX/YYYY (exemplo: PL 2306/2020)
+            </div>
+            """
+
+    if resultado.tipo == 'opcoes':
+        itens = "".join(f"<li>{escape(opcao.titulo)}</li>" for opcao in resultado.opcoes)
+        return f"""
+            <div style="padding: 15px; color: #333; background-color: #f8f9fa; border-radius: 8px;">
+                Encontramos várias proposições com este número:
+                <ul>{itens}</ul>
+                Por favor, especifique o tipo (ex: PL, PEC, etc)
+            </div>
+            """
+
+    prop = resultado.proposicao
+    _, autores = formatar_autores(prop)
+    orgao = prop.orgao
+    tramitacao = prop.ultima_tramitacao
+    return f"""
+    <div style="font-family: system-ui, -apple-system, sans-serif; max-width: 800px; margin: 0 auto;">
+        <div style="background-color: #004A2F; color: white; padding: 20px; border-radius: 12px 12px 0 0;">
+            <h2 style="margin: 0; font-size: 1.4em; color: white;">
+                {escape(prop.titulo)}
+            </h2>
+        </div>
+
+        <div style="border: 1px solid #e0e0e0; border-top: none; border-radius: 0 0 12px 12px; overflow: hidden;">
+            <div style="padding: 20px; background: white;">
+                <div style="font-size: 1.1em; line-height: 1.5; color: #333; margin-bottom: 20px;">
+                    {escape(prop.ementa)}
+                </div>
+
+                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
+                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Situação atual</h3>
+                    <div style="margin-bottom: 8px; color: #333;">
+                        <strong style="color: #333;">Autoria:</strong> {escape(autores)}
+                    </div>
+                    <div style="margin-bottom: 8px; color: #333;">
+                        <strong style="color: #333;">Status:</strong> {escape(prop.status.situacao)}
+                    </div>
+                    <div style="color: #333;">
+                        <strong style="color: #333;">Órgão atual:</strong> {escape(prop.status.sigla_orgao)}<br>
+                        <div style="margin-left: 15px; color: #555;">
+                            {escape(orgao.nome) if orgao else ''}<br>
+                            {escape(orgao.tipo) if orgao else ''}
+                        </div>
+                    </div>
+                </div>
+
+                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
+                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Última tramitação</h3>
+                    <div style="margin-bottom: 8px; color: #333;">
+                        <strong style="color: #333;">Data:</strong> {formatar_data_hora(tramitacao.data_hora) if tramitacao else 'N/A'}
+                    </div>
+                    <div style="margin-bottom: 8px;">
+                        <strong style="color: #333;">Despacho:</strong>
+                        <div style="margin-left: 15px; color: #333; background: white; padding: 8px; border-radius: 4px; margin-top: 4px;">
+                            {escape(tramitacao.despacho) if tramitacao else 'N/A'}
+                        </div>
+                    </div>
+                    <div>
+                        <strong style="color: #333;">Descrição:</strong>
+                        <div style="margin-left: 15px; color: #333; background: white; padding: 8px; border-radius: 4px; margin-top: 4px;">
+                            {escape(tramitacao.descricao) if tramitacao else 'N/A'}
+                        </div>
+                    </div>
+                </div>
+
+                <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-bottom: 20px;">
+                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em; font-weight: 600;">Regime de tramitação</h3>
+                    <div style="color: #333;">
+                        {escape(prop.status.regime) or 'N/A'}
+                    </div>
+                </div>
+
+                <div style="border-top: 1px solid #e0e0e0; padding-top: 15px;">
+                    <h3 style="margin: 0 0 10px 0; color: #004A2F; font-size: 1.2em;">Links</h3>
+                    <div style="margin-bottom: 8px;">
+                        <a href="{escape(prop.links.pagina)}"
+                           style="color: #004A2F; text-decoration: none; display: flex; align-items: center; gap: 5px; font-weight: 500;">
+                           📄 Página da proposição
+                        </a>
+                    </div>
+                    <div>
+                        <a href="{escape(prop.links.inteiro_teor)}"
+                           style="color: #004A2F; text-decoration: none; display: flex; align-items: center; gap: 5px; font-weight: 500;">
+                           📑 Texto completo
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """
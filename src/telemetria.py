@@ -0,0 +1,303 @@
+"""
+Telemetria das chamadas à API da Câmara.
+
+Cada chamada vira um trecho (span) com duração, status, bytes e resultado
+do cache, pendurado no trecho em andamento. A árvore de uma requisição
+começa em rastrear() e acompanha as tarefas criadas dentro dela (o
+trecho atual fica em uma ContextVar). Durações, status e erros também
+vão para métricas no formato do Prometheus, exibidas em /metrics.
+
+Com IZILEG_LOG_LENTAS_MS, as requisições mais lentas que o limite são
+exibidas com a árvore completa de chamadas, para uma amostra
+(IZILEG_LOG_LENTAS_AMOSTRA) delas.
+"""
+import bisect
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Requisições mais lentas que isso (ms) podem ser exibidas; 0 desliga
+LIMITE_LENTAS = float(os.environ.get("IZILEG_LOG_LENTAS_MS", "0")) / 1000
+# Fração das requisições lentas exibidas
+AMOSTRA_LENTAS = float(os.environ.get("IZILEG_LOG_LENTAS_AMOSTRA", "0.1"))
+
+# Limites (s) das faixas dos histogramas de duração
+FAIXAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Eventos do cache (contadores de CacheRespostas) que dizem o resultado da consulta
+RESULTADOS_CACHE = {
+    'acertos': 'acerto',
+    'acertos_stale': 'stale',
+    'faltas': 'falta',
+    'agrupadas': 'agrupada',
+    'vencidas_servidas': 'vencido',
+}
+
+logger = logging.getLogger(__name__)
+
+_trecho_atual = ContextVar('izileg_trecho', default=None)
+_raiz_atual = ContextVar('izileg_raiz', default=None)
+_NUMERO = re.compile(r'/\d+(?=/|$)')
+
+
+class Trecho:
+    """Uma etapa medida: nome, atributos, duração (s) e os trechos filhos"""
+
+    def __init__(self, nome, atributos):
+        self.nome = nome
+        self.atributos = atributos
+        self.filhos = []
+        self.inicio = time.perf_counter()
+        self.duracao = None
+
+    def marcar(self, **atributos):
+        self.atributos.update(atributos)
+
+    def contar(self, nome):
+        self.atributos[nome] = self.atributos.get(nome, 0) + 1
+
+    def para_dict(self):
+        return {
+            'nome': self.nome,
+            'duracao_ms': round(self.duracao * 1000, 1) if self.duracao is not None else None,
+            **self.atributos,
+            'filhos': [filho.para_dict() for filho in self.filhos],
+        }
+
+    def arvore(self, nivel=0):
+        """Linhas de texto com o trecho e seus filhos, em ordem de início"""
+        duracao = f"{self.duracao * 1000:.1f} ms" if self.duracao is not None else "em andamento"
+        atributos = ' '.join(f"{chave}={valor}" for chave, valor in self.atributos.items())
+        linhas = [f"{'  ' * nivel}{self.nome} {duracao} {atributos}".rstrip()]
+        for filho in sorted(self.filhos, key=lambda filho: filho.inicio):
+            linhas += filho.arvore(nivel + 1)
+        return linhas
+
+
+class Contador:
+    def __init__(self, nome, ajuda, rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = {}
+        self._trava = threading.Lock()
+
+    def somar(self, valores, quantidade=1):
+        with self._trava:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def linhas(self):
+        with self._trava:
+            valores = sorted(self._valores.items())
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} counter"
+        for rotulos, valor in valores:
+            yield f"{self.nome}{_rotulos(self.rotulos, rotulos)} {valor:g}"
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, rotulos, faixas=FAIXAS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.faixas = faixas
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, valores, valor):
+        with self._trava:
+            serie = self._series.get(valores)
+            if serie is None:
+                # Contagem por faixa (a última é +Inf) e soma
+                serie = self._series[valores] = [[0] * (len(self.faixas) + 1), 0.0]
+            serie[0][bisect.bisect_left(self.faixas, valor)] += 1
+            serie[1] += valor
+
+    def linhas(self):
+        with self._trava:
+            series = sorted((rotulos, (list(contagens), soma)) for rotulos, (contagens, soma) in self._series.items())
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} histogram"
+        for rotulos, (contagens, soma) in series:
+            acumulado = 0
+            for limite, contagem in zip(self.faixas + ('+Inf',), contagens):
+                acumulado += contagem
+                faixa = _rotulos(self.rotulos + ('le',), rotulos + (f"{limite:g}" if limite != '+Inf' else limite,))
+                yield f"{self.nome}_bucket{faixa} {acumulado}"
+            yield f"{self.nome}_sum{_rotulos(self.rotulos, rotulos)} {soma:.6f}"
+            yield f"{self.nome}_count{_rotulos(self.rotulos, rotulos)} {acumulado}"
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)) + '}'
+
+
+duracao_requisicoes = Histograma(
+    'izileg_requisicao_duracao_segundos', 'Duração das requisições recebidas', ('rota',))
+requisicoes = Contador(
+    'izileg_requisicoes_total', 'Requisições recebidas, por rota e status', ('rota', 'status'))
+erros_requisicoes = Contador(
+    'izileg_requisicao_erros_total', 'Requisições que terminaram em erro, por tipo', ('rota', 'tipo'))
+duracao_upstream = Histograma(
+    'izileg_upstream_duracao_segundos', 'Duração das chamadas à API da Câmara', ('endpoint',))
+chamadas_upstream = Contador(
+    'izileg_upstream_chamadas_total', 'Chamadas à API da Câmara, por status', ('endpoint', 'status'))
+erros_upstream = Contador(
+    'izileg_upstream_erros_total', 'Chamadas à API da Câmara com erro (status ou exceção)', ('endpoint', 'tipo'))
+bytes_upstream = Contador(
+    'izileg_upstream_bytes_total', 'Bytes recebidos da API da Câmara', ('endpoint',))
+eventos_cache = Contador(
+    'izileg_cache_eventos_total', 'Eventos do cache de respostas (acertos, faltas, remoções...)', ('evento',))
+
+METRICAS = [duracao_requisicoes, requisicoes, erros_requisicoes, duracao_upstream, chamadas_upstream,
+            erros_upstream, bytes_upstream, eventos_cache]
+
+
+def endpoint(recurso):
+    """Nome do endpoint para as métricas: sem parâmetros e com os ids trocados por {id}"""
+    return _NUMERO.sub('/{id}', recurso.split('?', 1)[0])
+
+
+def _abrir(nome, atributos, raiz=False):
+    atual = Trecho(nome, atributos)
+    pai = None if raiz else _trecho_atual.get()
+    if pai is not None:
+        pai.filhos.append(atual)
+    return atual, _trecho_atual.set(atual)
+
+
+def _fechar(atual, token, erro=None):
+    atual.duracao = time.perf_counter() - atual.inicio
+    if erro is not None and 'erro' not in atual.atributos:
+        atual.atributos['erro'] = type(erro).__name__
+    _trecho_atual.reset(token)
+
+
+@contextmanager
+def trecho(nome, **atributos):
+    """Mede o bloco como filho do trecho atual; exceções ficam em 'erro'"""
+    atual, token = _abrir(nome, atributos)
+    try:
+        yield atual
+    except BaseException as e:
+        _fechar(atual, token, e)
+        raise
+    _fechar(atual, token)
+
+
+@contextmanager
+def chamada_upstream(recurso):
+    """
+    Trecho de uma chamada à API. Quem chama marca status e bytes; ao
+    terminar, a chamada entra nas métricas do endpoint.
+    """
+    atual, token = _abrir('upstream', {'endpoint': endpoint(recurso)})
+    try:
+        yield atual
+    except BaseException as e:
+        _fechar(atual, token, e)
+        _registrar_upstream(atual)
+        raise
+    _fechar(atual, token)
+    _registrar_upstream(atual)
+
+
+def _registrar_upstream(atual):
+    nome = atual.atributos['endpoint']
+    status = atual.atributos.get('status')
+    duracao_upstream.observar((nome,), atual.duracao)
+    chamadas_upstream.somar((nome, str(status) if status is not None else 'erro'))
+    if atual.atributos.get('bytes'):
+        bytes_upstream.somar((nome,), atual.atributos['bytes'])
+    if 'erro' in atual.atributos:
+        erros_upstream.somar((nome, atual.atributos['erro']))
+    elif status is not None and status >= 400:
+        erros_upstream.somar((nome, str(status)))
+
+
+@contextmanager
+def rastrear(nome, **atributos):
+    """
+    Raiz da árvore de uma requisição. Ao terminar, exibe a árvore se a
+    requisição foi lenta e caiu na amostra.
+    """
+    atual, token = _abrir(nome, atributos, raiz=True)
+    token_raiz = _raiz_atual.set(atual)
+    try:
+        yield atual
+    except BaseException as e:
+        _fechar(atual, token, e)
+        raise
+    else:
+        _fechar(atual, token)
+    finally:
+        _raiz_atual.reset(token_raiz)
+        if LIMITE_LENTAS and atual.duracao >= LIMITE_LENTAS and random.random() < AMOSTRA_LENTAS:
+            logger.warning("Requisição lenta:\n%s", '\n'.join(atual.arvore(1)))
+
+
+def marcar_erro(erro):
+    """Registra na requisição atual um erro tratado (ex: devolvido como JSON com status 200)"""
+    raiz = _raiz_atual.get()
+    if raiz is not None:
+        raiz.marcar(erro=type(erro).__name__)
+
+
+def registrar_requisicao(rota, atual, status):
+    """Métricas de uma requisição terminada (atual é o trecho de rastrear())"""
+    duracao_requisicoes.observar((rota,), atual.duracao)
+    requisicoes.somar((rota, str(status)))
+    if 'erro' in atual.atributos:
+        erros_requisicoes.somar((rota, atual.atributos['erro']))
+    elif status >= 500:
+        erros_requisicoes.somar((rota, str(status)))
+
+
+async def medir_requisicao(request, call_next):
+    """
+    Middleware HTTP dos apps FastAPI: rastreia a requisição e registra
+    suas métricas pela rota. Nas respostas em streaming, mede até o início
+    da resposta.
+    """
+    status = 500
+    try:
+        with rastrear(f"{request.method} {request.url.path}") as raiz:
+            response = await call_next(request)
+            status = response.status_code
+            raiz.marcar(status=status)
+            return response
+    finally:
+        # A rota (ex: /consulta/{pl:path}), não o caminho, para não criar uma série por proposição
+        rota = getattr(request.scope.get('route'), 'path', None) or 'sem rota'
+        registrar_requisicao(rota, raiz, status)
+
+
+def registrar_cache(evento):
+    """
+    Para o parâmetro ao_contar de CacheRespostas: conta o evento e, dentro
+    de um trecho 'cache', marca nele o resultado da consulta
+    """
+    eventos_cache.somar((evento,))
+    atual = _trecho_atual.get()
+    if atual is None or atual.nome != 'cache':
+        return
+    if evento == 'acertos_disco':
+        atual.marcar(disco=True)
+    elif evento in RESULTADOS_CACHE:
+        atual.marcar(resultado=RESULTADOS_CACHE[evento])
+
+
+def metricas_prometheus():
+    """Todas as métricas no formato de texto do Prometheus"""
+    return '\n'.join(linha for metrica in METRICAS for linha in metrica.linhas()) + '\n'
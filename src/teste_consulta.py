@@ -1,7 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import logging
+import os
 import re
-from datetime import datetime
+import time
+from functools import partial
+
+import httpx
+
+try:
+    from . import cliente_http
+    from .grafo import GrafoExecucao
+    from .busca_textual import buscar_texto
+    from .indice_local import obter_indice
+    from .modelos import Autor, Links, OpcaoBusca, Orgao, Proposicao, ResultadoConsulta, Status, Tramitacao
+    from .referencia import referencia
+    from .renderizacao import formatar_data_hora, renderizar_texto
+    from .tramitacao_web import consultar_tramitacoes_web
+    from .tramitacoes import armazem_tramitacoes
+except ImportError:
+    import cliente_http
+    from grafo import GrafoExecucao
+    from busca_textual import buscar_texto
+    from indice_local import obter_indice
+    from modelos import Autor, Links, OpcaoBusca, Orgao, Proposicao, ResultadoConsulta, Status, Tramitacao
+    from referencia import referencia
+    from renderizacao import formatar_data_hora, renderizar_texto
+    from tramitacao_web import consultar_tramitacoes_web
+    from tramitacoes import armazem_tramitacoes
+
+logger = logging.getLogger(__name__)
 
 # Lista completa de tipos comuns
 TIPOS_PROPOSICOES = [
@@ -17,9 +44,77 @@ TIPOS_PROPOSICOES = [
     'PDC',  # Projeto de Decreto Legislativo
 ]
 
-def buscar_proposicoes(termo):
+# Máximo de consultas simultâneas quando o tipo não é informado
+MAX_CONCORRENCIA_BUSCA = int(os.environ.get("IZILEG_CONCORRENCIA_BUSCA", str(len(TIPOS_PROPOSICOES))))
+
+# Resultados de uma busca por termo livre
+MAX_RESULTADOS_TEXTO = int(os.environ.get("IZILEG_MAX_RESULTADOS_TEXTO", "10"))
+
+def _resultado_busca(dado):
+    return {
+        'titulo': f"{dado['siglaTipo']} {dado['numero']}/{dado['ano']}",
+        'id': dado['id'],
+        'link': f"https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={dado['id']}"
+    }
+
+def _buscar_no_indice(siglas, numero, ano):
     """
-    Busca proposições na API da Câmara
+    Busca no índice local. Retorna None quando o ano não está no índice
+    e é preciso consultar a API.
+    """
+    indice = obter_indice()
+    if indice is None or not indice.cobre(ano, numero):
+        return None
+    
+    resultados = []
+    for sigla in siglas:
+        id_prop = indice.buscar(sigla, numero, ano)
+        if id_prop is not None:
+            resultados.append(_resultado_busca({'siglaTipo': sigla, 'numero': int(numero), 'ano': int(ano), 'id': id_prop}))
+    return resultados
+
+async def _buscar_por_tipo(tipo, numero, ano):
+    params = {
+        'siglaTipo': tipo,
+        'numero': numero,
+        'ano': ano
+    }
+    dados = await cliente_http.get_dados_async("proposicoes", params)
+    return _resultado_busca(dados[0]) if dados else None
+
+async def _buscar_todos_tipos(numero, ano, primeiro, max_concorrencia):
+    """
+    Consulta todos os tipos ao mesmo tempo, limitado a max_concorrencia
+    requisições simultâneas
+    """
+    limite = asyncio.Semaphore(max(1, max_concorrencia))
+    
+    async def buscar(tipo):
+        async with limite:
+            return await _buscar_por_tipo(tipo, numero, ano)
+    
+    tarefas = [asyncio.ensure_future(buscar(tipo)) for tipo in TIPOS_PROPOSICOES]
+    try:
+        if primeiro:
+            # Retorna o primeiro tipo que responder com resultado
+            for proxima in asyncio.as_completed(tarefas):
+                resultado = await proxima
+                if resultado:
+                    return [resultado]
+            return []
+        
+        # Mantém a ordem de TIPOS_PROPOSICOES
+        return [r for r in await asyncio.gather(*tarefas) if r]
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+async def buscar_proposicoes_async(termo, primeiro=False, max_concorrencia=MAX_CONCORRENCIA_BUSCA):
+    """
+    Busca proposições no índice local ou, para anos que não estão nele,
+    na API da Câmara. Termos que não são um identificador (ex: "fake news")
+    são buscados no índice textual local, sem chamar a API.
+    Com primeiro=True, a busca só por número para no primeiro tipo encontrado.
     """
     try:
         # Remove espaços extras e formata o termo
@@ -28,223 +123,263 @@ def buscar_proposicoes(termo):
         # Se for apenas números e barra (ex: "2306/2020")
         if re.match(r'^\d+/\d+$', termo):
             numero, ano = termo.split('/')
-            resultados = []
-            for tipo in TIPOS_PROPOSICOES:
-                url = "https://dadosabertos.camara.leg.br/api/v2/proposicoes"
-                params = {
-                    'siglaTipo': tipo,
-                    'numero': numero,
-                    'ano': ano
-                }
-                response = requests.get(url, params=params)
-                dados = response.json()['dados']
-                if dados:
-                    resultados.append({
-                        'titulo': f"{dados[0]['siglaTipo']} {dados[0]['numero']}/{dados[0]['ano']}",
-                        'id': dados[0]['id'],
-                        'link': f"https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={dados[0]['id']}"
-                    })
-            return resultados
+            resultados = _buscar_no_indice(TIPOS_PROPOSICOES, numero, ano)
+            if resultados is not None:
+                return resultados[:1] if primeiro else resultados
+            return await _buscar_todos_tipos(numero, ano, primeiro, max_concorrencia)
             
         # Se já vier com o tipo (ex: "PL 2306/2020")
-        elif ' ' in termo:
-            sigla, numero_ano = termo.split(' ')
-            numero, ano = numero_ano.split('/')
-            url = "https://dadosabertos.camara.leg.br/api/v2/proposicoes"
-            params = {
-                'siglaTipo': sigla.upper(),
-                'numero': numero,
-                'ano': ano
-            }
-            response = requests.get(url, params=params)
-            dados = response.json()['dados']
-            if dados:
-                return [{
-                    'titulo': f"{dados[0]['siglaTipo']} {dados[0]['numero']}/{dados[0]['ano']}",
-                    'id': dados[0]['id'],
-                    'link': f"https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={dados[0]['id']}"
-                }]
-        
+        identificador = re.match(r'^([A-Za-z]+)\s+(\d+)/(\d+)$', termo)
+        if identificador:
+            sigla, numero, ano = identificador.groups()
+            resultados = _buscar_no_indice([sigla.upper()], numero, ano)
+            if resultados is not None:
+                return resultados
+            resultado = await _buscar_por_tipo(sigla.upper(), numero, ano)
+            return [resultado] if resultado else []
+        
+        # Termo livre (ex: "fake news"): busca nas ementas e temas do índice textual.
+        # Em outra thread: a primeira busca (e a verificação periódica de
+        # segmentos novos) lê o índice do disco e não pode segurar o event loop
+        if termo:
+            return await asyncio.to_thread(buscar_texto, termo, limite=1 if primeiro else MAX_RESULTADOS_TEXTO)
         return []
         
     except Exception as e:
         print(f"Erro ao buscar proposições: {str(e)}")
         return []
 
-def formatar_erro_busca():
-    return """
-[TITULO]Como pesquisar proposições[/TITULO]
-
-[INFO]
-Digite o tipo e número da proposição ou apenas o número para ver todas as opções.
-
-Exemplos de busca:
-• PL 2306/2020 (Projeto de Lei)
-• PEC 45/2019 (Proposta de Emenda à Constituição)
-• REQ 123/2024 (Requerimento)
-• MPV 1172/2023 (Medida Provisória)
-• 2306/2020 (busca em todos os tipos)
-
-Tipos disponíveis:
-• PL  - Projeto de Lei
-• PLP - Projeto de Lei Complementar
-• PEC - Proposta de Emenda à Constituição
-• MPV - Medida Provisória
-• PDL - Projeto de Decreto Legislativo
-• PRC - Projeto de Resolução
-• REQ - Requerimento
-• INC - Indicação
-• RIC - Requerimento de Informação
-[/INFO]
-"""
+def buscar_proposicoes(termo, primeiro=False, max_concorrencia=MAX_CONCORRENCIA_BUSCA):
+    """
+    Versão síncrona de buscar_proposicoes_async()
+    """
+    return cliente_http.executar_sincrono(buscar_proposicoes_async(termo, primeiro, max_concorrencia))
 
-def consultar_proposicao_completa(pl):
+# Autores consultados individualmente (os demais aparecem como "e outros")
+MAX_AUTORES_DETALHADOS = 2
+
+async def _consultar_orgao(prop):
+    """Busca o órgão onde a proposição se encontra"""
+    if 'statusProposicao' in prop and 'siglaOrgao' in prop['statusProposicao']:
+        orgao = referencia.orgao(prop['statusProposicao']['siglaOrgao'])
+        if orgao:
+            return orgao
+        orgaos = await cliente_http.get_dados_async("orgaos", {'sigla': prop['statusProposicao']['siglaOrgao']})
+        if orgaos:
+            return orgaos[0]
+    return None
+
+async def _consultar_ultima_tramitacao(id_prop):
+    """Retorna a tramitação mais recente da proposição"""
+    ultimas = await armazem_tramitacoes.ultimas_async(id_prop, 1)
+    return ultimas[0] if ultimas else None
+
+async def _consultar_partido_uf(autores, indice):
+    """Busca (partido, UF) do autor na posição indice"""
+    if indice >= len(autores) or not autores[indice].get('uri'):
+        return '', ''
+    
+    id_deputado = autores[indice]['uri'].split('/')[-1]
+    deputado = referencia.deputado(id_deputado)
+    if deputado and deputado.get('siglaPartido') and deputado.get('siglaUf'):
+        return deputado['siglaPartido'], deputado['siglaUf']
+    
+    try:
+        deputado = await cliente_http.get_dados_async(f"deputados/{id_deputado}")
+    except httpx.HTTPStatusError:
+        return '', ''
+    ultimo_status = deputado.get('ultimoStatus', {})
+    return ultimo_status.get('siglaPartido', ''), ultimo_status.get('siglaUf', '')
+
+def _montar_grafo_proposicao(id_prop):
+    """
+    Monta o grafo de consultas de uma proposição. Detalhes, tramitações e
+    autores dependem só do id; órgão e deputados esperam apenas a etapa
+    que fornece os seus dados.
+    """
+    grafo = GrafoExecucao()
+    grafo.adicionar('proposicao', lambda: cliente_http.get_dados_async(f"proposicoes/{id_prop}"))
+    grafo.adicionar('tramitacao', lambda: _consultar_ultima_tramitacao(id_prop))
+    grafo.adicionar('autores', lambda: cliente_http.get_dados_async(f"proposicoes/{id_prop}/autores"))
+    grafo.adicionar('orgao', _consultar_orgao, ['proposicao'])
+    for i in range(MAX_AUTORES_DETALHADOS):
+        grafo.adicionar(f'deputado_{i}', partial(_consultar_partido_uf, indice=i), ['autores'])
+    return grafo
+
+def _montar_status(prop):
+    status = prop.get('statusProposicao') or {}
+    return Status(
+        situacao=status.get('descricaoSituacao') or '',
+        regime=status.get('regime') or '',
+        sigla_orgao=status.get('siglaOrgao') or '',
+    )
+
+def _montar_orgao(orgao):
+    return Orgao(orgao['sigla'], orgao.get('nome') or '', orgao.get('tipoOrgao') or '') if orgao else None
+
+def _montar_tramitacao(tramitacao):
+    if not tramitacao:
+        return None
+    return Tramitacao(
+        data_hora=tramitacao['dataHora'],
+        sigla_orgao=tramitacao.get('siglaOrgao') or '',
+        despacho=tramitacao.get('despacho') or '',
+        descricao=tramitacao.get('descricaoTramitacao') or '',
+    )
+
+def _montar_autores(etapas):
+    autores = []
+    for i, autor in enumerate(etapas['autores'][:MAX_AUTORES_DETALHADOS]):
+        partido, uf = etapas[f'deputado_{i}']
+        autores.append(Autor(autor.get('nome', 'N/A'), partido, uf))
+    return autores
+
+def _montar_proposicao(link, etapas):
+    """Monta o resultado estruturado a partir das etapas do grafo"""
+    prop = etapas['proposicao']
+    return Proposicao(
+        id=prop['id'],
+        sigla_tipo=prop['siglaTipo'],
+        numero=prop['numero'],
+        ano=prop['ano'],
+        ementa=prop['ementa'],
+        status=_montar_status(prop),
+        links=Links(link, prop.get('urlInteiroTeor') or ''),
+        autores=_montar_autores(etapas),
+        mais_autores=len(etapas['autores']) > MAX_AUTORES_DETALHADOS,
+        orgao=_montar_orgao(etapas['orgao']),
+        ultima_tramitacao=_montar_tramitacao(etapas['tramitacao']),
+    )
+
+def _resultado_sem_detalhes(resultados):
+    """Resultado para buscas sem nenhuma ou com mais de uma proposição"""
+    if not resultados:
+        return ResultadoConsulta('nao_encontrada')
+    return ResultadoConsulta('opcoes', opcoes=[
+        OpcaoBusca(res['titulo'], res['id'], res['link'], res.get('ementa', '')) for res in resultados
+    ])
+
+async def consultar_proposicao_estruturada_async(pl):
+    """
+    Consulta detalhes completos de uma proposição e retorna um
+    ResultadoConsulta. Erros da API são propagados.
+    """
+    inicio = time.perf_counter()
+    resultados = await buscar_proposicoes_async(pl)
+    if len(resultados) != 1:
+        return _resultado_sem_detalhes(resultados)
+    
+    id_prop = resultados[0]['id']
+    duracao_busca = time.perf_counter() - inicio
+    
+    grafo = _montar_grafo_proposicao(id_prop)
+    etapas = await grafo.executar()
+    logger.info("Caminho crítico de %s: busca (%.0fms) → %s",
+                pl, duracao_busca * 1000, grafo.descrever_caminho_critico())
+    
+    return ResultadoConsulta('proposicao', proposicao=_montar_proposicao(resultados[0]['link'], etapas))
+
+# Etapas necessárias para montar a lista de autores
+_ETAPAS_AUTORES = ['autores'] + [f'deputado_{i}' for i in range(MAX_AUTORES_DETALHADOS)]
+
+def _evento_etapa(nome, etapas, link):
+    """Evento (nome, dados) liberado pela conclusão da etapa, ou None"""
+    if nome == 'proposicao':
+        prop = etapas['proposicao']
+        return 'cabecalho', {
+            'id': prop['id'],
+            'titulo': f"{prop['siglaTipo']} {prop['numero']}/{prop['ano']}",
+            'ementa': prop['ementa'],
+            'status': _montar_status(prop).para_dict(),
+            'links': Links(link, prop.get('urlInteiroTeor') or '').para_dict(),
+        }
+    if nome == 'orgao':
+        orgao = _montar_orgao(etapas['orgao'])
+        return 'orgao', orgao.para_dict() if orgao else None
+    if nome == 'tramitacao':
+        tramitacao = _montar_tramitacao(etapas['tramitacao'])
+        return 'tramitacao', tramitacao.para_dict() if tramitacao else None
+    if nome in _ETAPAS_AUTORES and all(etapa in etapas for etapa in _ETAPAS_AUTORES):
+        return 'autores', {
+            'autores': [autor.para_dict() for autor in _montar_autores(etapas)],
+            'mais_autores': len(etapas['autores']) > MAX_AUTORES_DETALHADOS,
+        }
+    return None
+
+async def consultar_proposicao_eventos_async(pl):
     """
-    Consulta detalhes completos de uma proposição
+    Consulta uma proposição gerando (evento, dados) à medida que cada parte
+    fica pronta: 'cabecalho' (ementa, status, links), 'tramitacao', 'orgao'
+    e 'autores', em qualquer ordem, e por último 'resultado' com o
+    ResultadoConsulta completo.
     """
+    inicio = time.perf_counter()
+    resultados = await buscar_proposicoes_async(pl)
+    if len(resultados) != 1:
+        yield 'resultado', _resultado_sem_detalhes(resultados).para_dict()
+        return
+    
+    link = resultados[0]['link']
+    duracao_busca = time.perf_counter() - inicio
+    fila = asyncio.Queue()
+    etapas = {}
+    
+    def ao_concluir(nome, valor):
+        etapas[nome] = valor
+        evento = _evento_etapa(nome, etapas, link)
+        if evento:
+            fila.put_nowait(evento)
+    
+    grafo = _montar_grafo_proposicao(resultados[0]['id'])
+    tarefa = asyncio.ensure_future(grafo.executar(ao_concluir))
+    tarefa.add_done_callback(lambda _: fila.put_nowait(None))
     try:
-        resultados = buscar_proposicoes(pl)
-        if not resultados:
-            return formatar_erro_busca()
-        
-        if len(resultados) > 1:
-            # Formata múltiplos resultados
-            resposta = "[TITULO]Proposições encontradas[/TITULO]\n"
-            resposta += "Encontramos várias proposições com este número:\n\n"
-            for res in resultados:
-                resposta += f"• {res['titulo']}\n"
-            resposta += "\nPor favor, especifique o tipo (ex: PL, PEC, etc)"
-            return resposta
-            
-        id_prop = resultados[0]['id']
-        
-        # Consulta detalhes via API
-        url = f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{id_prop}"
-        response = requests.get(url)
-        prop = response.json()['dados']
-        
-        # Consulta órgão atual
-        orgao_atual = None
-        if 'statusProposicao' in prop and 'siglaOrgao' in prop['statusProposicao']:
-            response = requests.get("https://dadosabertos.camara.leg.br/api/v2/orgaos", 
-                                 params={'sigla': prop['statusProposicao']['siglaOrgao']})
-            orgaos = response.json()['dados']
-            if orgaos:
-                orgao_atual = orgaos[0]
-        
-        # Consulta tramitações
-        url_tram = f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{id_prop}/tramitacoes"
-        response = requests.get(url_tram)
-        trams = response.json()['dados']
-        
-        # Ordena tramitações por data mais recente
-        trams.sort(key=lambda x: x['dataHora'], reverse=True)
-        ultima_tramitacao = trams[0] if trams else None
-        
-        # Busca autores
-        url_autores = f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{id_prop}/autores"
-        response = requests.get(url_autores)
-        autores = response.json()['dados']
-        
-        # Processa autores
-        autores_info = []
-        
-        for i, autor in enumerate(autores):
-            if i >= 2:  # Se tiver mais de 2 autores
-                autores_info.append("e outros")
+        while True:
+            evento = await fila.get()
+            if evento is None:
                 break
-                
-            nome_autor = autor.get('nome', 'N/A')
-            partido_uf = "N/A"
-            
-            # Busca partido/UF de cada autor
-            if autor.get('uri'):
-                id_deputado = autor['uri'].split('/')[-1]
-                url_deputado = f"https://dadosabertos.camara.leg.br/api/v2/deputados/{id_deputado}"
-                response = requests.get(url_deputado)
-                if response.status_code == 200:
-                    deputado = response.json()['dados']
-                    ultimo_status = deputado.get('ultimoStatus', {})
-                    partido = ultimo_status.get('siglaPartido', '')
-                    uf = ultimo_status.get('siglaUf', '')
-                    if partido and uf:
-                        partido_uf = f"{partido}/{uf}"
-            
-            autores_info.append(f"{nome_autor} ({partido_uf})")
-        
-        # Formata os autores com seus respectivos partidos/UF
-        autores_formatado = ", ".join(autores_info)
-        
-        # Formata a resposta
-        resposta = f"""
-[TITULO]{prop['siglaTipo']} {prop['numero']}/{prop['ano']}[/TITULO]
-{prop['ementa']}
-
-[SUBTITULO]Informações[/SUBTITULO]
-• Autor{'es' if len(autores_info) > 1 else 'a' if 'Deputada' in autores[0].get('nome', '') else ''}: {autores_formatado}
-• Status: {prop['statusProposicao']['descricaoSituacao']}
-• Órgão: {prop['statusProposicao']['siglaOrgao']} - {orgao_atual['nome'] if orgao_atual else 'N/A'}
-• Regime: {prop['statusProposicao']['regime']}
-
-[SUBTITULO]Última atualização[/SUBTITULO]
-{datetime.strptime(ultima_tramitacao['dataHora'], '%Y-%m-%dT%H:%M').strftime('%d/%m/%Y às %H:%M') if ultima_tramitacao else 'N/A'}
-{ultima_tramitacao['despacho'] if ultima_tramitacao else 'N/A'}
-
-[SUBTITULO]Links[/SUBTITULO]
-Página da proposição: <a href="{resultados[0]['link']}" target="_blank">{resultados[0]['link']}</a>
-Texto completo: <a href="{prop.get('urlInteiroTeor', '#')}" target="_blank">{prop.get('urlInteiroTeor', 'N/A')}</a>
-"""
-        return resposta
-        
+            yield evento
+        
+        etapas = tarefa.result()
+        logger.info("Caminho crítico de %s: busca (%.0fms) → %s",
+                    pl, duracao_busca * 1000, grafo.descrever_caminho_critico())
+        yield 'resultado', ResultadoConsulta('proposicao', proposicao=_montar_proposicao(link, etapas)).para_dict()
+    finally:
+        tarefa.cancel()
+
+def consultar_proposicao_estruturada(pl):
+    """
+    Versão síncrona de consultar_proposicao_estruturada_async()
+    """
+    return cliente_http.executar_sincrono(consultar_proposicao_estruturada_async(pl))
+
+async def consultar_proposicao_completa_async(pl):
+    """
+    Consulta detalhes completos de uma proposição, formatados como texto
+    """
+    try:
+        return renderizar_texto(await consultar_proposicao_estruturada_async(pl))
     except Exception as e:
         return f"Erro ao consultar proposição: {str(e)}"
 
+def consultar_proposicao_completa(pl):
+    """
+    Versão síncrona de consultar_proposicao_completa_async()
+    """
+    return cliente_http.executar_sincrono(consultar_proposicao_completa_async(pl))
+
 def consultar_tramitacao_web(id_proposicao):
     """
     Consulta a página web de tramitação de uma proposição
     """
-    url = f"https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={id_proposicao}"
-    
     try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Busca a tabela de tramitação
-        tabela_tramitacao = soup.find('table', {'id': 'content-tramitacao'}) or \
-                           soup.find('table', class_='table')
-        
-        tramitacoes = []
-        if tabela_tramitacao:
-            for linha in tabela_tramitacao.find_all('tr')[1:]:  # Pula o cabeçalho
-                colunas = linha.find_all('td')
-                if len(colunas) >= 3:
-                    data_str = colunas[0].text.strip()
-                    try:
-                        # Converte data para ordenação
-                        data_obj = datetime.strptime(data_str, '%d/%m/%Y')
-                        data = data_str
-                    except:
-                        data_obj = datetime.min
-                        data = data_str
-                    
-                    orgao = colunas[1].text.strip()
-                    despacho = colunas[2].text.strip()
-                    
-                    tramitacoes.append({
-                        'data': data,
-                        'data_obj': data_obj,
-                        'orgao': orgao,
-                        'despacho': despacho
-                    })
-        
-        # Ordena tramitações por data mais recente
-        tramitacoes.sort(key=lambda x: x['data_obj'], reverse=True)
+        tramitacoes = consultar_tramitacoes_web(id_proposicao)  # só as mais recentes
         
         # Formata a resposta apenas se tiver informações adicionais
         resposta = ""
         if tramitacoes:
             resposta += "\nHistórico de tramitações:"
-            for tram in tramitacoes[:5]:  # Mostra as 5 mais recentes
+            for tram in tramitacoes:
                 resposta += f"\n\n📅 {tram['data']}"
                 resposta += f"\n📍 {tram['orgao']}"
                 if tram['despacho'].strip():
@@ -261,8 +396,6 @@ def consultar_proposicao(id_ou_sigla):
     """
     Consulta detalhes de uma proposição específica.
     """
-    base_url = "https://dadosabertos.camara.leg.br/api/v2"
-    
     try:
         # Se receber uma sigla (ex: PL 1234/2023), precisa converter para ID
         if isinstance(id_ou_sigla, str):
@@ -275,8 +408,7 @@ def consultar_proposicao(id_ou_sigla):
                 'numero': numero,
                 'ano': ano
             }
-            response = requests.get(f"{base_url}/proposicoes", params=params)
-            dados = response.json()['dados']
+            dados = cliente_http.get_dados("proposicoes", params)
             if not dados:
                 return "Proposição não encontrada"
             id_prop = dados[0]['id']
@@ -284,29 +416,16 @@ def consultar_proposicao(id_ou_sigla):
             id_prop = id_ou_sigla
         
         # Busca detalhes da proposição
-        response = requests.get(f"{base_url}/proposicoes/{id_prop}")
-        prop = response.json()['dados']
-        
-        # Busca tramitações
-        response = requests.get(f"{base_url}/proposicoes/{id_prop}/tramitacoes")
-        trams = response.json()['dados']
-        
-        # Ordena tramitações por data
-        for tram in trams:
-            try:
-                data_obj = datetime.strptime(tram['dataHora'].split('T')[0], '%Y-%m-%d')
-                tram['data_obj'] = data_obj
-            except:
-                tram['data_obj'] = datetime.min
+        prop = cliente_http.get_dados(f"proposicoes/{id_prop}")
         
-        trams.sort(key=lambda x: x['data_obj'], reverse=True)
-        ultima_tramitacao = trams[0] if trams else None
+        # Tramitação mais recente (só as novas são buscadas na API)
+        ultimas = armazem_tramitacoes.ultimas(id_prop, 1)
+        ultima_tramitacao = ultimas[0] if ultimas else None
         
         # Busca informações do órgão atual
         orgao_atual = None
         if 'statusProposicao' in prop and 'siglaOrgao' in prop['statusProposicao']:
-            response = requests.get(f"{base_url}/orgaos", params={'sigla': prop['statusProposicao']['siglaOrgao']})
-            orgaos = response.json()['dados']
+            orgaos = cliente_http.get_dados("orgaos", {'sigla': prop['statusProposicao']['siglaOrgao']})
             if orgaos:
                 orgao_atual = orgaos[0]
         
@@ -327,7 +446,7 @@ Situação atual:
 {f"  Tipo: {orgao_atual['tipoOrgao']}" if orgao_atual else ""}
         
 Última tramitação:
-- Data: {datetime.strptime(ultima_tramitacao['dataHora'], '%Y-%m-%dT%H:%M').strftime('%d/%m/%Y às %H:%M') if ultima_tramitacao else 'N/A'}
+- Data: {formatar_data_hora(ultima_tramitacao['dataHora']) if ultima_tramitacao else 'N/A'}
 - Órgão: {ultima_tramitacao['siglaOrgao'] if ultima_tramitacao else 'N/A'}
 - Despacho: {ultima_tramitacao['despacho'] if ultima_tramitacao else 'N/A'}
 - Descrição: {ultima_tramitacao['descricaoTramitacao'] if ultima_tramitacao else 'N/A'}
@@ -0,0 +1,157 @@
+import os
+import re
+from heapq import nlargest
+from html.parser import HTMLParser
+
+try:
+    from . import cliente_http, telemetria
+    from .cache import montar_chave
+except ImportError:
+    import cliente_http
+    import telemetria
+    from cache import montar_chave
+
+URL_FICHA = "https://www.camara.leg.br/proposicoesWeb/fichadetramitacao"
+
+# Tramitações mais recentes extraídas da página
+MAX_TRAMITACOES_WEB = int(os.environ.get("IZILEG_MAX_TRAMITACOES_WEB", "5"))
+
+
+_DATA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+
+def _data_ordenavel(data):
+    """'DD/MM/AAAA' -> (ano, mês, dia); datas em outro formato ficam por último"""
+    partes = _DATA.fullmatch(data)
+    if partes is None:
+        return (0, 0, 0)
+    dia, mes, ano = partes.groups()
+    return (int(ano), int(mes), int(dia))
+
+
+class ExtratorTramitacoes(HTMLParser):
+    """
+    Lê a página da ficha de tramitação aos pedaços (feed) e guarda só as
+    linhas da tabela de tramitações: sem montar a árvore do documento, e
+    marcando 'concluido' assim que a tabela termina, para que o resto da
+    página nem precise ser baixado.
+
+    A tabela é a de id 'content-tramitacao' ou, se a página não tiver
+    uma, a primeira com a classe 'table'. A primeira linha (cabeçalho) e
+    as linhas com menos de 3 colunas são ignoradas.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.linhas = []
+        self.reserva = []           # linhas da primeira tabela de classe 'table'
+        self.achou_tabela = False   # a de id 'content-tramitacao'
+        self.concluido = False
+        self._destino = None        # lista que recebe as linhas da tabela atual
+        self._profundidade = 0      # tabelas abertas dentro da tabela atual
+        self._linha = None
+        self._celula = None
+        self._linhas_vistas = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            if self._destino is not None:
+                self._profundidade += 1
+                return
+            atributos = dict(attrs)
+            if atributos.get('id') == 'content-tramitacao':
+                self.achou_tabela = True
+                self._abrir_tabela(self.linhas)
+            elif not self.reserva and 'table' in (atributos.get('class') or '').split():
+                self._abrir_tabela(self.reserva)
+        elif self._destino is None or self._profundidade:
+            # Fora da tabela, ou dentro de uma tabela aninhada nela
+            return
+        elif tag == 'tr':
+            self._fechar_linha()
+            self._linha = []
+        elif tag in ('td', 'th') and self._linha is not None:
+            self._fechar_celula()
+            self._celula = [] if tag == 'td' else None
+
+    def handle_endtag(self, tag):
+        if self._destino is None:
+            return
+        if tag == 'table':
+            if self._profundidade:
+                self._profundidade -= 1
+                return
+            self._fechar_linha()
+            if self._destino is self.linhas:
+                self.concluido = True
+            self._destino = None
+        elif self._profundidade:
+            return
+        elif tag == 'tr':
+            self._fechar_linha()
+        elif tag == 'td':
+            self._fechar_celula()
+
+    def handle_data(self, data):
+        if self._celula is not None:
+            self._celula.append(data)
+
+    def _abrir_tabela(self, destino):
+        self._destino = destino
+        self._profundidade = 0
+        self._linhas_vistas = 0
+
+    def _fechar_celula(self):
+        if self._celula is not None:
+            self._linha.append(''.join(self._celula).strip())
+            self._celula = None
+
+    def _fechar_linha(self):
+        if self._linha is None:
+            return
+        self._fechar_celula()
+        colunas, self._linha = self._linha, None
+        self._linhas_vistas += 1
+        if self._linhas_vistas > 1 and len(colunas) >= 3:  # a primeira é o cabeçalho
+            self._destino.append(colunas[:3])
+
+    def feed(self, data):
+        if not self.concluido:
+            super().feed(data)
+
+    def tramitacoes(self, n=MAX_TRAMITACOES_WEB):
+        """As n tramitações mais recentes (data, órgão, despacho), da mais nova para a mais antiga"""
+        linhas = self.linhas if self.achou_tabela else self.reserva
+        # nlargest mantém a ordem da página entre datas iguais, como um sort estável
+        mais_recentes = nlargest(n, linhas, key=lambda colunas: _data_ordenavel(colunas[0]))
+        return [{'data': data, 'orgao': orgao, 'despacho': despacho} for data, orgao, despacho in mais_recentes]
+
+
+def extrair_tramitacoes(partes, n=MAX_TRAMITACOES_WEB):
+    """Tramitações mais recentes de uma página, lida de um iterável de trechos de texto"""
+    extrator = ExtratorTramitacoes()
+    for parte in partes:
+        extrator.feed(parte)
+        if extrator.concluido:
+            break
+    else:
+        extrator.close()
+    return extrator.tramitacoes(n)
+
+
+def consultar_tramitacoes_web(id_proposicao, n=MAX_TRAMITACOES_WEB):
+    """
+    As n tramitações mais recentes da página web da proposição. A página é
+    lida conforme chega e a conexão é encerrada ao fim da tabela; o
+    resultado fica no cache das respostas, como as consultas à API.
+    """
+    params = {'idProposicao': id_proposicao}
+
+    def carregar():
+        with cliente_http.get_stream(URL_FICHA, params) as response:
+            response.raise_for_status()
+            return extrair_tramitacoes(response.iter_text(), n)
+
+    chave = montar_chave(URL_FICHA, dict(params, n=n))
+    with telemetria.trecho('cache', endpoint=telemetria.endpoint(URL_FICHA)):
+        return cliente_http.cache_api.obter(chave, cliente_http.cache_api.ttl_para(URL_FICHA), carregar)
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future
+
+try:
+    from . import cliente_http, telemetria
+    from .cache_persistente import cache_disco
+except ImportError:
+    import cliente_http
+    import telemetria
+    from cache_persistente import cache_disco
+
+# Proposições com histórico guardado em memória
+MAX_PROPOSICOES = int(os.environ.get("IZILEG_TRAMITACOES_MAX", "1000"))
+
+# Intervalo mínimo (s) entre duas sincronizações da mesma proposição
+INTERVALO_SINCRONIZACAO = int(os.environ.get("IZILEG_TRAMITACOES_INTERVALO", str(cliente_http.TTL_PROPOSICAO)))
+
+
+def _chave(tramitacao):
+    # dataHora no formato ISO já ordena corretamente como texto
+    return (tramitacao['dataHora'], tramitacao.get('sequencia') or 0, tramitacao.get('descricaoTramitacao') or '')
+
+
+class HistoricoTramitacoes:
+    """
+    Tramitações conhecidas de uma proposição, em ordem cronológica.
+    Novas entradas são inseridas na posição certa, sem reordenar a lista.
+    """
+
+    __slots__ = ('itens', 'chaves', 'sincronizado_em')
+
+    def __init__(self):
+        self.itens = []
+        self.chaves = []
+        self.sincronizado_em = None
+
+    def mesclar(self, novas):
+        """Acrescenta tramitações ainda não conhecidas"""
+        for tramitacao in novas:
+            chave = _chave(tramitacao)
+            if not self.chaves or chave > self.chaves[-1]:
+                # Caso comum: a API devolve em ordem e tudo é mais novo
+                self.chaves.append(chave)
+                self.itens.append(tramitacao)
+                continue
+            posicao = bisect_left(self.chaves, chave)
+            if posicao < len(self.chaves) and self.chaves[posicao] == chave:
+                continue
+            self.chaves.insert(posicao, chave)
+            self.itens.insert(posicao, tramitacao)
+
+    @property
+    def ultima_data(self):
+        """Data (AAAA-MM-DD) da tramitação mais recente conhecida"""
+        return self.chaves[-1][0][:10] if self.chaves else None
+
+    def ultimas(self, n):
+        """As n tramitações mais recentes, da mais nova para a mais antiga"""
+        return self.itens[:-n - 1:-1] if n > 0 else []
+
+
+class ArmazemTramitacoes:
+    """
+    Guarda o histórico de tramitações por proposição e, a cada consulta,
+    pede à API só as entradas a partir da última data conhecida.
+    """
+
+    def __init__(self, max_proposicoes=MAX_PROPOSICOES, intervalo=INTERVALO_SINCRONIZACAO):
+        self.max_proposicoes = max_proposicoes
+        self.intervalo = intervalo
+        self._historicos = OrderedDict()
+        self._em_sincronizacao = {}
+        self._tarefas = set()
+        self._trava = threading.Lock()
+
+    def _em_memoria(self, chave):
+        with self._trava:
+            historico = self._historicos.get(chave)
+            if historico is not None:
+                self._historicos.move_to_end(chave)
+            return historico
+
+    def _obter_historico(self, id_prop):
+        chave = str(id_prop)
+        historico = self._em_memoria(chave)
+        if historico is not None:
+            return historico
+        # Fora da trava, para a leitura do disco não segurar as outras consultas
+        return self._adicionar(chave, self._restaurar(chave))
+
+    async def _obter_historico_async(self, id_prop):
+        chave = str(id_prop)
+        historico = self._em_memoria(chave)
+        if historico is not None:
+            return historico
+        # Em outra thread: o SQLite não pode segurar o event loop
+        return self._adicionar(chave, await asyncio.to_thread(self._restaurar, chave))
+
+    def _adicionar(self, chave, guardado):
+        with self._trava:
+            historico = self._historicos.get(chave)
+            if historico is None:
+                historico = guardado or HistoricoTramitacoes()
+                self._historicos[chave] = historico
+                while len(self._historicos) > self.max_proposicoes:
+                    self._historicos.popitem(last=False)
+            return historico
+
+    @staticmethod
+    def _restaurar(chave):
+        """Histórico guardado no cache em disco (ex: antes de um reinício), ou None"""
+        lida = cache_disco.ler(f"tramitacoes/{chave}")
+        if lida is None:
+            return None
+        dados, _ = lida
+        historico = HistoricoTramitacoes()
+        historico.mesclar(dados['itens'])
+        # O disco guarda o horário de parede; aqui a idade vale em monotonic
+        historico.sincronizado_em = time.monotonic() - (time.time() - dados['sincronizado_em'])
+        return historico
+
+    def _precisa_sincronizar(self, historico):
+        return historico.sincronizado_em is None or time.monotonic() - historico.sincronizado_em >= self.intervalo
+
+    def _parametros(self, historico):
+        # A API filtra por dia, então o dia da última entrada é pedido de novo
+        return {'dataInicio': historico.ultima_data} if historico.ultima_data else None
+
+    def _entrar(self, id_prop):
+        """Retorna (futuro, lider). Só o líder consulta a API."""
+        with self._trava:
+            futuro = self._em_sincronizacao.get(id_prop)
+            if futuro is not None:
+                return futuro, False
+            futuro = Future()
+            self._em_sincronizacao[id_prop] = futuro
+            return futuro, True
+
+    def _concluir(self, id_prop, historico, futuro, novas=None, erro=None):
+        with self._trava:
+            if erro is None:
+                historico.mesclar(novas)
+                historico.sincronizado_em = time.monotonic()
+                itens = list(historico.itens)
+            self._em_sincronizacao.pop(id_prop, None)
+        if erro is None:
+            cache_disco.gravar(f"tramitacoes/{id_prop}", {'itens': itens, 'sincronizado_em': time.time()}, self.intervalo)
+            futuro.set_result(None)
+        elif isinstance(erro, Exception):
+            futuro.set_exception(erro)
+        else:
+            futuro.cancel()
+
+    async def _sincronizar_async(self, id_prop, historico, futuro):
+        try:
+            novas = await cliente_http.get_dados_async(
+                f"proposicoes/{id_prop}/tramitacoes", self._parametros(historico), usar_cache=False)
+        except BaseException as e:
+            self._concluir(id_prop, historico, futuro, erro=e)
+            raise
+        self._concluir(id_prop, historico, futuro, novas)
+        return novas
+
+    def _tarefa_concluida(self, tarefa):
+        self._tarefas.discard(tarefa)
+        if not tarefa.cancelled():
+            tarefa.exception()  # já entregue pelo futuro; evita o aviso de exceção não lida
+
+    async def ultimas_async(self, id_prop, n=1):
+        """As n tramitações mais recentes da proposição, sincronizando se preciso"""
+        with telemetria.trecho('tramitacoes', resultado='memoria') as trecho:
+            historico = await self._obter_historico_async(id_prop)
+            if self._precisa_sincronizar(historico):
+                futuro, lider = self._entrar(id_prop)
+                if not lider:
+                    trecho.marcar(resultado='agrupada')
+                    # shield: um seguidor cancelado não cancela o futuro compartilhado
+                    await asyncio.shield(asyncio.wrap_future(futuro))
+                else:
+                    # A sincronização continua se o líder for cancelado, e quem
+                    # espera por ela recebe o resultado, não o cancelamento
+                    tarefa = asyncio.ensure_future(self._sincronizar_async(id_prop, historico, futuro))
+                    self._tarefas.add(tarefa)
+                    tarefa.add_done_callback(self._tarefa_concluida)
+                    novas = await asyncio.shield(tarefa)
+                    trecho.marcar(resultado='sincronizada', novas=len(novas))
+            return historico.ultimas(n)
+
+    def limpar(self):
+        """Esquece os históricos em memória (os do cache em disco continuam)"""
+        with self._trava:
+            self._historicos.clear()
+
+    def ultimas(self, id_prop, n=1):
+        """Versão síncrona de ultimas_async()"""
+        with telemetria.trecho('tramitacoes', resultado='memoria') as trecho:
+            historico = self._obter_historico(id_prop)
+            if self._precisa_sincronizar(historico):
+                futuro, lider = self._entrar(id_prop)
+                if not lider:
+                    trecho.marcar(resultado='agrupada')
+                    futuro.result()
+                else:
+                    try:
+                        novas = cliente_http.get_dados(
+                            f"proposicoes/{id_prop}/tramitacoes", self._parametros(historico), usar_cache=False)
+                    except BaseException as e:
+                        self._concluir(id_prop, historico, futuro, erro=e)
+                        raise
+                    self._concluir(id_prop, historico, futuro, novas)
+                    trecho.marcar(resultado='sincronizada', novas=len(novas))
+            return historico.ultimas(n)
+
+
+armazem_tramitacoes = ArmazemTramitacoes()
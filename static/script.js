@@ -1,4 +1,11 @@
-async function consultarPL() {
+let consultaAtual = null;
+let sugestaoAtual = null;      // AbortController do pedido de sugestões em andamento
+let temporizadorSugestao = null;
+
+// Tempo (ms) sem digitar antes de pedir sugestões
+const ESPERA_SUGESTAO = 150;
+
+function consultarPL() {
     const input = document.getElementById('pl-input');
     const resultado = document.getElementById('resultado');
     const pl = input.value.trim();
@@ -8,20 +15,78 @@ async function consultarPL() {
         return;
     }
 
+    cancelarSugestoes();
+    resultado.innerHTML = '<div class="loading">Consultando...</div>';
+    console.log('Consultando:', pl); // Debug
+
+    // Remove espaços extras e formata a URL
+    const plFormatado = encodeURIComponent(pl.replace(/\s+/g, ' ').trim());
+    if (window.EventSource) {
+        consultarPLStream(plFormatado);
+    } else {
+        consultarPLCompleto(plFormatado);
+    }
+}
+
+// Mostra cada parte do resultado assim que o servidor a envia
+function consultarPLStream(plFormatado) {
+    const resultado = document.getElementById('resultado');
+    if (consultaAtual) consultaAtual.close();
+
+    const fonte = new EventSource(`/consulta/stream/${plFormatado}`);
+    consultaAtual = fonte;
+    let recebeuEvento = false;
+
+    const ouvir = (evento, tratar) => fonte.addEventListener(evento, e => {
+        recebeuEvento = true;
+        tratar(JSON.parse(e.data));
+    });
+
+    // Partes que chegam antes do cabeçalho ficam guardadas até ele chegar
+    const partes = {};
+    const exibir = (id, html) => {
+        partes[id] = html;
+        preencher(id, html);
+    };
+
+    ouvir('cabecalho', cabecalho => {
+        resultado.innerHTML = formatarEsqueleto(cabecalho);
+        Object.entries(partes).forEach(([id, html]) => preencher(id, html));
+    });
+    ouvir('autores', dados => exibir('campo-autores', formatarAutores(dados)));
+    ouvir('orgao', orgao => exibir('campo-orgao', escaparHtml(orgao ? orgao.nome : 'N/A')));
+    ouvir('tramitacao', tramitacao => exibir('secao-tramitacao', formatarTramitacao(tramitacao)));
+    ouvir('resultado', dados => {
+        fonte.close();
+        resultado.innerHTML = formatarResultado(dados);
+    });
+    ouvir('erro', dados => {
+        fonte.close();
+        resultado.innerHTML = `<div class="error">${escaparHtml(dados.message)}</div>`;
+    });
+
+    fonte.onerror = () => {
+        fonte.close();
+        // Sem suporte a streaming (ex: proxy): consulta tudo de uma vez
+        if (!recebeuEvento) {
+            consultarPLCompleto(plFormatado);
+        } else {
+            resultado.innerHTML = '<div class="error">Erro ao consultar proposição</div>';
+        }
+    };
+}
+
+async function consultarPLCompleto(plFormatado) {
+    const resultado = document.getElementById('resultado');
     try {
-        resultado.innerHTML = '<div class="loading">Consultando...</div>';
-        console.log('Consultando:', pl); // Debug
-        
-        // Remove espaços extras e formata a URL
-        const plFormatado = pl.replace(/\s+/g, ' ').trim();
-        const response = await fetch(`/consulta/${encodeURIComponent(plFormatado)}`);
+        const response = await fetch(`/consulta/${plFormatado}`);
         const data = await response.json();
         console.log('Resposta:', data); // Debug
 
         if (data.status === 'success') {
             resultado.innerHTML = formatarResultado(data.data);
         } else {
-            resultado.innerHTML = `<div class="error">${data.message}</div>`;
+            resultado.innerHTML = `<div class="error">${escaparHtml(data.message)}</div>`;
         }
     } catch (error) {
         console.error('Erro:', error); // Debug
@@ -29,25 +94,171 @@ async function consultarPL() {
     }
 }
 
-function formatarResultado(texto) {
-    // Formata seções especiais
-    texto = texto
-        .replace(/\[TITULO\](.*?)\[\/TITULO\]/g, '<h2 class="resultado-titulo">$1</h2>')
-        .replace(/\[SUBTITULO\](.*?)\[\/SUBTITULO\]/g, '<h3 class="resultado-subtitulo">$1</h3>')
-        .replace(/\[INFO\](.*?)\[\/INFO\]/g, '<div class="info-box">$1</div>')
-        .replace(/\[LINKS\](.*?)\[\/LINKS\]/g, '<div class="links-container">$1</div>')
-        .replace(/\[LINK_PAGINA\](.*?)\[\/LINK_PAGINA\]/g, '<a href="$1" target="_blank" class="link-proposicao">📄 Página da proposição</a>')
-        .replace(/\[LINK_TEXTO\](.*?)\[\/LINK_TEXTO\]/g, '<a href="$1" target="_blank" class="link-texto">📑 Texto completo</a>');
-    
-    // Formata o resto do texto
-    return texto
-        .replace(/\n/g, '<br>')
-        .replace(/•\s([^:]+):/g, '<span class="item">$1:</span>');
+function preencher(id, html) {
+    const elemento = document.getElementById(id);
+    if (elemento) elemento.innerHTML = html;
+}
+
+function escaparHtml(texto) {
+    return String(texto ?? '')
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;');
+}
+
+// Converte 'AAAA-MM-DDTHH:MM' para 'DD/MM/AAAA às HH:MM'
+function formatarDataHora(dataHora) {
+    if (!dataHora) return 'N/A';
+    const [data, hora] = dataHora.split('T');
+    const [ano, mes, dia] = data.split('-');
+    return `${dia}/${mes}/${ano} às ${(hora || '').slice(0, 5)}`;
+}
+
+function formatarAutores(prop) {
+    // Recebe a proposição ou o evento 'autores' (ambos têm autores e mais_autores)
+    const autores = prop.autores.map(autor =>
+        `${autor.nome} (${autor.partido && autor.uf ? `${autor.partido}/${autor.uf}` : 'N/A'})`);
+    if (prop.mais_autores) autores.push('e outros');
+
+    let rotulo = 'Autor';
+    if (autores.length > 1) rotulo = 'Autores';
+    else if (prop.autores.length && prop.autores[0].nome.includes('Deputada')) rotulo = 'Autora';
+    return `<span class="item">${rotulo}:</span> ${escaparHtml(autores.join(', '))}`;
+}
+
+function formatarAjuda() {
+    return `
+        <h2 class="resultado-titulo">Como pesquisar proposições</h2>
+        <div class="info-box">
+            Digite o tipo e número da proposição ou apenas o número para ver todas as opções.<br><br>
+            Exemplos de busca:<br>
+            • PL 2306/2020 (Projeto de Lei)<br>
+            • PEC 45/2019 (Proposta de Emenda à Constituição)<br>
+            • REQ 123/2024 (Requerimento)<br>
+            • MPV 1172/2023 (Medida Provisória)<br>
+            • 2306/2020 (busca em todos os tipos)
+        </div>`;
+}
+
+function formatarOpcoes(opcoes) {
+    const itens = opcoes.map(opcao =>
+        `• <a href="#" onclick="consultarOpcao('${escaparHtml(opcao.titulo)}'); return false;">${escaparHtml(opcao.titulo)}</a>` +
+        (opcao.ementa ? ` - ${escaparHtml(opcao.ementa)}` : ''));
+    return `
+        <h2 class="resultado-titulo">Proposições encontradas</h2>
+        Encontramos várias proposições com este número:<br><br>
+        ${itens.join('<br>')}<br><br>
+        Por favor, especifique o tipo (ex: PL, PEC, etc)`;
+}
+
+function consultarOpcao(titulo) {
+    document.getElementById('pl-input').value = titulo;
+    consultarPL();
+}
+
+function formatarCabecalho(prop) {
+    return `
+        <h2 class="resultado-titulo">${escaparHtml(prop.titulo)}</h2>
+        ${escaparHtml(prop.ementa)}`;
+}
+
+function formatarInformacoes(prop, autores, orgao) {
+    return `
+        <h3 class="resultado-subtitulo">Informações</h3>
+        <span id="campo-autores">${autores}</span><br>
+        <span class="item">Status:</span> ${escaparHtml(prop.status.situacao)}<br>
+        <span class="item">Órgão:</span> ${escaparHtml(prop.status.sigla_orgao)} - <span id="campo-orgao">${orgao}</span><br>
+        <span class="item">Regime:</span> ${escaparHtml(prop.status.regime)}`;
+}
+
+// Estrutura exibida ao chegar o cabeçalho; as demais partes preenchem os campos
+function formatarEsqueleto(cabecalho) {
+    const carregando = '<span class="item">Carregando...</span>';
+    return [
+        formatarCabecalho(cabecalho),
+        formatarInformacoes(cabecalho, carregando, '...'),
+        `<div id="secao-tramitacao"><h3 class="resultado-subtitulo">Última atualização</h3>${carregando}</div>`,
+        formatarLinks(cabecalho.links),
+    ].join('');
+}
+
+function formatarTramitacao(tramitacao) {
+    return `
+        <h3 class="resultado-subtitulo">Última atualização</h3>
+        ${tramitacao ? formatarDataHora(tramitacao.data_hora) : 'N/A'}<br>
+        ${tramitacao ? escaparHtml(tramitacao.despacho) : 'N/A'}`;
+}
+
+function formatarLinks(links) {
+    const teor = links.inteiro_teor
+        ? `<a href="${escaparHtml(links.inteiro_teor)}" target="_blank" class="link-texto">📑 Texto completo</a>`
+        : '';
+    return `
+        <h3 class="resultado-subtitulo">Links</h3>
+        <div class="links-container">
+            <a href="${escaparHtml(links.pagina)}" target="_blank" class="link-proposicao">📄 Página da proposição</a>
+            ${teor}
+        </div>`;
+}
+
+function formatarResultado(resultado) {
+    if (resultado.tipo === 'nao_encontrada') return formatarAjuda();
+    if (resultado.tipo === 'opcoes') return formatarOpcoes(resultado.opcoes);
+
+    const prop = resultado.proposicao;
+    return [
+        formatarCabecalho(prop),
+        formatarInformacoes(prop, formatarAutores(prop), escaparHtml(prop.orgao ? prop.orgao.nome : 'N/A')),
+        `<div id="secao-tramitacao">${formatarTramitacao(prop.ultima_tramitacao)}</div>`,
+        formatarLinks(prop.links),
+    ].join('');
+}
+
+// Sugestões de identificador: só pede ao servidor quando o usuário para de
+// digitar, e cancela o pedido anterior se ainda não tiver respondido
+function pedirSugestoes() {
+    clearTimeout(temporizadorSugestao);
+    const texto = document.getElementById('pl-input').value.trim();
+    if (texto.length < 2) {
+        cancelarSugestoes();
+        return;
+    }
+    temporizadorSugestao = setTimeout(() => buscarSugestoes(texto), ESPERA_SUGESTAO);
+}
+
+async function buscarSugestoes(texto) {
+    if (sugestaoAtual) sugestaoAtual.abort();
+    const controle = new AbortController();
+    sugestaoAtual = controle;
+    try {
+        const response = await fetch(`/autocomplete?q=${encodeURIComponent(texto)}`, { signal: controle.signal });
+        const data = await response.json();
+        if (data.status === 'success') exibirSugestoes(data.data);
+    } catch (error) {
+        if (error.name !== 'AbortError') console.error('Erro:', error); // Debug
+    } finally {
+        if (sugestaoAtual === controle) sugestaoAtual = null;
+    }
+}
+
+function cancelarSugestoes() {
+    clearTimeout(temporizadorSugestao);
+    if (sugestaoAtual) sugestaoAtual.abort();
+    sugestaoAtual = null;
+    exibirSugestoes([]);
 }
 
+function exibirSugestoes(sugestoes) {
+    document.getElementById('sugestoes').innerHTML = sugestoes.map(sugestao =>
+        `<option value="${escaparHtml(sugestao.titulo)}">${escaparHtml(sugestao.ementa)}</option>`).join('');
+}
+
+document.getElementById('pl-input').addEventListener('input', pedirSugestoes);
+
 // Permite consultar ao pressionar Enter
 document.getElementById('pl-input').addEventListener('keypress', function(e) {
     if (e.key === 'Enter') {
         consultarPL();
     }
-}); 
\ No newline at end of file
+});
@@ -0,0 +1,89 @@
+"""
+Downloads interrompidos de arquivos anuais (seu_arquivo.CamaraDownloader),
+contra um servidor local que não envia ETag nem Last-Modified.
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seu_arquivo import CamaraDownloader  # noqa: E402
+
+# JSON de ~4,3 MB, cortado no meio nas primeiras respostas
+CORPO = b'[' + b','.join(b'{"id": %d, "ementa": "Proposta de teste"}' % i for i in range(100000)) + b']'
+
+
+class ServidorSemValidadores(ThreadingHTTPServer):
+    def __init__(self, cortes):
+        super().__init__(('127.0.0.1', 0), Tratador)
+        self.cortes = cortes  # respostas que ainda vão ser interrompidas
+        self.requisicoes = []  # cabeçalhos recebidos
+
+
+class Tratador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requisicoes.append(dict(self.headers))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(CORPO)))
+        self.end_headers()
+        if self.server.cortes > 0:
+            self.server.cortes -= 1
+            self.wfile.write(CORPO[:len(CORPO) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(CORPO)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    servidores = []
+
+    def iniciar(cortes):
+        atual = ServidorSemValidadores(cortes)
+        threading.Thread(target=atual.serve_forever, daemon=True).start()
+        servidores.append(atual)
+        return atual
+
+    yield iniciar
+    for atual in servidores:
+        atual.shutdown()
+        atual.server_close()
+
+
+def _downloader(servidor, pasta):
+    downloader = CamaraDownloader(pasta=str(pasta))
+    downloader.base_url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return downloader
+
+
+def test_download_interrompido_sem_validadores_recomeca_do_zero(servidor, tmp_path):
+    atual = servidor(cortes=1)
+    caminho = _downloader(atual, tmp_path).baixar_proposicoes(2024)
+
+    assert caminho == os.path.join(str(tmp_path), 'proposicoes-2024.json')
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+    assert not os.path.exists(caminho + '.part')
+    assert len(atual.requisicoes) == 2
+    assert all('Range' not in cabecalhos and 'If-Range' not in cabecalhos for cabecalhos in atual.requisicoes)
+
+
+def test_parte_guardada_sem_validadores_nao_impede_execucao_seguinte(servidor, tmp_path):
+    # Todas as tentativas da primeira execução são interrompidas
+    atual = servidor(cortes=3)
+    assert _downloader(atual, tmp_path).baixar_proposicoes(2024) is None
+    assert os.path.exists(os.path.join(str(tmp_path), 'proposicoes-2024.json.part'))
+
+    caminho = _downloader(atual, tmp_path).baixar_proposicoes(2024)
+    with open(caminho, 'rb') as f:
+        assert f.read() == CORPO
+    assert all('Range' not in cabecalhos for cabecalhos in atual.requisicoes)